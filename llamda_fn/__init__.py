@@ -7,7 +7,7 @@ from .functions import (
     LlamdaFunctions,
 )
 
-from .llamda import Llamda
+from .llamda import Llamda, RunSummary
 
 
-__all__: list[str] = ["Llamda", "LlamdaFunctions", "llamda_classes"]
+__all__: list[str] = ["Llamda", "LlamdaFunctions", "RunSummary", "llamda_classes"]
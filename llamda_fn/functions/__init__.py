@@ -1,8 +1,22 @@
 """Tools to create Llamda functions."""
 
-from .llamda_classes import LlamdaFunction, LlamdaPydantic, LlamdaCallable, OaiToolParam
-from .llamda_functions import LlamdaFunctions
+from llamda_fn.utils.lazy import lazy_getattr
+
+from .llamda_classes import LlamdaFunction, LlamdaPydantic, LlamdaCallable
+from .llamda_functions import (
+    LlamdaFunctions,
+    RegistrationReport,
+    ToolPayload,
+    ToolRegistrationError,
+)
 from .process_fields import process_fields
+from .result_cache import ResultCache
+from .schema_store import SchemaStore
+from .tool_index import ToolIndex
+
+__getattr__ = lazy_getattr(
+    __name__, {"OaiToolParam": "llamda_fn.llms.api_types:OaiToolParam"}
+)
 
 __all__ = [
     "LlamdaFunction",
@@ -11,4 +25,10 @@ __all__ = [
     "OaiToolParam",
     "LlamdaPydantic",
     "LlamdaFunctions",
+    "ToolPayload",
+    "ToolIndex",
+    "RegistrationReport",
+    "ToolRegistrationError",
+    "SchemaStore",
+    "ResultCache",
 ]
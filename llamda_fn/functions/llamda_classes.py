@@ -1,18 +1,68 @@
-from typing import Any, Callable, Dict, Generic, TypeVar, Type
+import json
+from inspect import isasyncgenfunction, iscoroutinefunction
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Literal,
+    Optional,
+    TypeVar,
+    Type,
+)
 from pydantic import BaseModel, Field, create_model, ConfigDict
 
-from llamda_fn.llms.api_types import OaiToolParam
+from llamda_fn.utils.lazy import lazy_getattr
+
+if TYPE_CHECKING:
+    from llamda_fn.llms.api_types import OaiToolParam
+
+__getattr__ = lazy_getattr(
+    __name__, {"OaiToolParam": "llamda_fn.llms.api_types:OaiToolParam"}
+)
 
 R = TypeVar("R")
 
+ExecutionMode = Literal["thread", "process"]
+
 
 class LlamdaCallable(Generic[R]):
     def run(self, **kwargs: Any) -> R:
         raise NotImplementedError
 
-    def to_tool_schema(self) -> OaiToolParam:
+    def run_json(self, arguments: str) -> R:
+        """Run the callable with a JSON-encoded argument object."""
+        return self.run(**json.loads(arguments or "{}"))
+
+    def validate_json(self, arguments: str) -> tuple[tuple[Any, ...], Dict[str, Any]]:
+        """Validate JSON arguments into the positional and keyword call arguments."""
         raise NotImplementedError
 
+    def to_tool_schema(self) -> "OaiToolParam":
+        raise NotImplementedError
+
+    @property
+    def is_built(self) -> bool:
+        return True
+
+    @property
+    def parameter_names(self) -> List[str]:
+        return []
+
+    @property
+    def is_async(self) -> bool:
+        return iscoroutinefunction(getattr(self, "call_func", None))
+
+    @property
+    def is_async_generator(self) -> bool:
+        return isasyncgenfunction(getattr(self, "call_func", None))
+
+    def build(self) -> Any:
+        """Create any deferred state needed to run the callable."""
+        return None
+
     @classmethod
     def create(
         cls,
@@ -30,6 +80,10 @@ class LlamdaBase(BaseModel, LlamdaCallable[R]):
     name: str
     description: str
     call_func: Callable[..., R]
+    executor: ExecutionMode = "thread"
+    timeout: Optional[float] = None
+    max_output: Optional[int] = None
+    dedupe: bool = True
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -37,7 +91,7 @@ class LlamdaBase(BaseModel, LlamdaCallable[R]):
         """Get the JSON schema for the Llamda function."""
         raise NotImplementedError
 
-    def to_tool_schema(self) -> OaiToolParam:
+    def to_tool_schema(self) -> "OaiToolParam":
         """Get the JSON schema for the LlamdaPydantic."""
         schema = self.to_schema()
         return {
@@ -57,7 +111,8 @@ class LlamdaBase(BaseModel, LlamdaCallable[R]):
 class LlamdaFunction(LlamdaBase[R]):
     """A Llamda function that uses a simple function model as the input."""
 
-    parameter_model: Type[BaseModel]
+    parameters: Dict[str, tuple[Any, Any]] = {}
+    parameter_model: Optional[Type[BaseModel]] = None
 
     @classmethod
     def create(
@@ -66,36 +121,69 @@ class LlamdaFunction(LlamdaBase[R]):
         name: str = "",
         description: str = "",
         fields: Dict[str, tuple[type, Any]] = {},
+        lazy: bool = False,
         **kwargs: Any,
     ) -> "LlamdaFunction[R]":
-        """Create a new LlamdaFunction from a function."""
-        model_fields = {}
-        for field_name, (field_type, field_default) in fields.items():
-            print(field_name, field_default, field_type)
-            if field_default is ...:
-                model_fields[field_name] = (field_type, Field(...))
-            else:
-                model_fields[field_name] = (field_type, Field(default=field_default))
-
-        parameter_model: type[BaseModel] = create_model(
-            f"{name}Parameters", **model_fields
-        )
+        """Create a new LlamdaFunction from a function.
 
-        return cls(
+        With `lazy`, the parameter model is only built on first use.
+        """
+        llamda_func = cls(
             name=name,
             description=description,
-            parameter_model=parameter_model,
+            parameters=fields,
             call_func=call_func,
+            **kwargs,
         )
+        if not lazy:
+            llamda_func.build()
+        return llamda_func
+
+    @property
+    def is_built(self) -> bool:
+        """Whether the parameter model has been created."""
+        return self.parameter_model is not None
+
+    @property
+    def parameter_names(self) -> List[str]:
+        """The names of the function's parameters."""
+        return list(self.parameters)
+
+    def build(self) -> Type[BaseModel]:
+        """Create the parameter model if needed and return it."""
+        if self.parameter_model is None:
+            model_fields: Dict[str, Any] = {}
+            for field_name, (field_type, field_default) in self.parameters.items():
+                if field_default is ...:
+                    model_fields[field_name] = (field_type, Field(...))
+                else:
+                    model_fields[field_name] = (
+                        field_type,
+                        Field(default=field_default),
+                    )
+
+            self.parameter_model = create_model(
+                f"{self.name}Parameters", **model_fields
+            )
+        return self.parameter_model
 
     def run(self, **kwargs: Any) -> R:
         """Run the LlamdaFunction with the given parameters."""
-        validated_params = self.parameter_model(**kwargs)
-        return self.call_func(**validated_params.model_dump())
+        return self.call_func(**dict(self.build()(**kwargs)))
+
+    def run_json(self, arguments: str) -> R:
+        """Validate raw JSON arguments in a single pass and run the function."""
+        args, kwargs = self.validate_json(arguments)
+        return self.call_func(*args, **kwargs)
+
+    def validate_json(self, arguments: str) -> tuple[tuple[Any, ...], Dict[str, Any]]:
+        """Validate raw JSON arguments into the function's keyword arguments."""
+        validated_params = self.build().model_validate_json(arguments or "{}")
+        return (), dict(validated_params)
 
     def to_schema(self) -> Dict[str, Any]:
         """Get the JSON schema for the LlamdaFunction."""
-        schema = self.parameter_model.model_json_schema()
+        schema = self.build().model_json_schema()
         schema["title"] = self.name
         schema["description"] = self.description
         return schema
@@ -106,6 +194,11 @@ class LlamdaPydantic(LlamdaBase[R]):
 
     model: Type[BaseModel]
 
+    @property
+    def parameter_names(self) -> List[str]:
+        """The names of the model's fields."""
+        return list(self.model.model_fields)
+
     @classmethod
     def create(
         cls,
@@ -122,6 +215,7 @@ class LlamdaPydantic(LlamdaBase[R]):
             description=description,
             call_func=call_func,
             model=model,
+            **kwargs,
         )
 
     def run(self, **kwargs: Any) -> R:
@@ -129,6 +223,14 @@ class LlamdaPydantic(LlamdaBase[R]):
         validated_params = self.model(**kwargs)
         return self.call_func(validated_params)
 
+    def run_json(self, arguments: str) -> R:
+        """Validate raw JSON arguments in a single pass and run the function."""
+        return self.call_func(self.model.model_validate_json(arguments or "{}"))
+
+    def validate_json(self, arguments: str) -> tuple[tuple[Any, ...], Dict[str, Any]]:
+        """Validate raw JSON arguments into the model instance to pass."""
+        return (self.model.model_validate_json(arguments or "{}"),), {}
+
     def to_schema(self) -> dict[str, Any]:
         """Get the JSON schema for the LlamdaPydantic."""
         schema: dict[str, Any] = self.model.model_json_schema(mode="serialization")
@@ -1,6 +1,15 @@
+import asyncio
+import importlib
+import inspect
 import json
+import pkgutil
+import time
+from contextlib import nullcontext
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from inspect import Parameter, isclass, signature
+from types import ModuleType
 from typing import (
+    TYPE_CHECKING,
     Any,
     Callable,
     Dict,
@@ -10,19 +19,102 @@ from typing import (
     ParamSpec,
     Sequence,
     Iterator,
+    NamedTuple,
+    FrozenSet,
+    Iterable,
+    Tuple,
+    Union,
 )
 
 from pydantic import BaseModel, ValidationError
-from llamda_fn.llms.api_types import LlToolCall, ToolResponse, OaiToolParam
-from .llamda_classes import LlamdaFunction, LlamdaPydantic, LlamdaCallable
+from llamda_fn.llms.api_types import LlToolCall, ToolResponse
+from llamda_fn.utils.cache import CacheInfo, LRUCache
+from llamda_fn.utils.concurrency import LimitStats, Limiter
+from .llamda_classes import (
+    ExecutionMode,
+    LlamdaBase,
+    LlamdaFunction,
+    LlamdaPydantic,
+    LlamdaCallable,
+)
+from .result_cache import CacheOption, ResultCache
+from .schema_store import SchemaStore, tool_fingerprint
+from .tool_index import ToolIndex
+from .tool_output import DEFAULT_MAX_OUTPUT, acollect_output, collect_output
+
+if TYPE_CHECKING:
+    from llamda_fn.llms.api_types import OaiToolParam
 
 R = TypeVar("R")
 P = ParamSpec("P")
 
+SchemaEntry = tuple[LlamdaCallable[Any], str, str, "OaiToolParam"]
+
+
+class ToolPayload(NamedTuple):
+    """An immutable, pre-encoded tool list for a subset of the registry.
+
+    The schema dicts are shared with the schema cache and must not be mutated.
+    """
+
+    names: Tuple[str, ...]
+    tools: Tuple["OaiToolParam", ...]
+    encoded: bytes
+    version: int
+
+
+def _call_in_process(
+    module: str, qualname: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]
+) -> str:
+    """Runs a tool's function inside a worker process and JSON-encodes the result"""
+    target: Any = importlib.import_module(module)
+    for attribute in qualname.split("."):
+        target = getattr(target, attribute)
+    func = getattr(target, "call_func", target)
+
+    result = func(*args, **kwargs)
+    if inspect.iscoroutine(result):
+        result = asyncio.run(result)
+    return json.dumps(result)
+
+
+class ToolRegistrationError(Exception):
+    """Raised when one or more tools in a bulk registration could not be created."""
+
+    def __init__(self, errors: List[Tuple[str, Exception]]) -> None:
+        self.errors = errors
+        details = "; ".join(f"{name}: {error}" for name, error in errors)
+        super().__init__(f"Failed to register {len(errors)} tool(s): {details}")
+
+
+class RegistrationReport(BaseModel):
+    """Timings of a bulk registration, in seconds."""
+
+    timings: Dict[str, float]
+    total: float
+
+
+ToolSource = Union[ModuleType, Iterable[Callable[..., Any]]]
+
 
 class LlamdaFunctions:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        payload_cache_size: int = 32,
+        lazy: bool = False,
+        schema_store: Optional[SchemaStore] = None,
+    ) -> None:
+        self.lazy = lazy
+        self.schema_store = schema_store
         self._tools: Dict[str, LlamdaCallable[Any]] = {}
+        self._result_caches: Dict[str, ResultCache] = {}
+        self._limiters: Dict[str, Limiter] = {}
+        self._version = 0
+        self._index: Optional[ToolIndex] = None
+        self._schemas: LRUCache[str, SchemaEntry] = LRUCache(maxsize=None)
+        self._payloads: LRUCache[Optional[FrozenSet[str]], ToolPayload] = LRUCache(
+            maxsize=payload_cache_size
+        )
 
     @property
     def tools(self) -> Dict[str, LlamdaCallable[Any]]:
@@ -32,74 +124,583 @@ class LlamdaFunctions:
         self,
         name: Optional[str] = None,
         description: Optional[str] = None,
+        lazy: Optional[bool] = None,
+        executor: ExecutionMode = "thread",
+        timeout: Optional[float] = None,
+        cache: CacheOption = None,
+        max_output: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        burst: Optional[int] = None,
+        dedupe: bool = True,
     ) -> Callable[[Callable[P, R]], LlamdaCallable[R]]:
+        """Registers a function as a tool.
+
+        Lazy tools record their signature and only build the parameter model
+        and schema on first use; `lazy` defaults to the registry setting.
+
+        With `executor="process"`, calls are validated here and run in a
+        process pool; the function must be importable by its qualified name.
+
+        Calls running longer than `timeout` seconds, counted from when they
+        begin running rather than from when they are queued, are answered
+        with a timeout result instead of waiting for them. Threads cannot be
+        interrupted: a timed-out sync tool keeps running in the background
+        and its result is discarded.
+
+        For pure functions, `cache` memoizes successful results by their
+        arguments: True or a size for an in-memory LRU, or a store such as
+        `LRUCache(ttl=...)` or `SQLiteCache(path)`.
+
+        Generator and async generator tools are consumed chunk by chunk; only
+        up to `max_output` characters of encoded chunks are kept for the model
+        and the rest are counted and discarded.
+
+        For tools wrapping fragile services, at most `max_concurrency` calls
+        run at once and they start at no more than `rate_limit` per second
+        (after a `burst`), across every exchange using this registry.
+
+        Identical calls to a tool (same arguments) requested together run
+        once and share the result. Pass `dedupe=False` for tools with side
+        effects, such as sending a message, so each call runs.
+        """
+        limited = max_concurrency is not None or rate_limit is not None
+
         def decorator(func: Callable[P, R]) -> LlamdaCallable[R]:
-            func_name: str = name or func.__name__
-            func_description: str = description or func.__doc__ or ""
-
-            sig = signature(func)
-            if len(sig.parameters) == 1:
-                param = next(iter(sig.parameters.values()))
-                if isclass(param.annotation) and issubclass(
-                    param.annotation, BaseModel
-                ):
-                    llamda_func = LlamdaPydantic.create(
-                        call_func=func,
-                        name=func_name,
-                        description=func_description,
-                        model=param.annotation,
+            llamda_func = self._create(
+                func,
+                name,
+                description,
+                lazy,
+                executor=executor,
+                timeout=timeout,
+                max_output=max_output,
+                dedupe=dedupe,
+            )
+            self._register(
+                llamda_func.name,
+                llamda_func,
+                ResultCache.from_option(llamda_func.name, cache),
+                Limiter(max_concurrency, rate_limit, burst) if limited else None,
+            )
+            return llamda_func
+
+        return decorator
+
+    def _create(
+        self,
+        func: Callable[P, R],
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        lazy: Optional[bool] = None,
+        **options: Any,
+    ) -> LlamdaBase[R]:
+        """Creates a tool from a function without registering it"""
+        if options.get("executor") == "process":
+            if "<locals>" in func.__qualname__ or "<lambda>" in func.__qualname__:
+                raise ValueError(
+                    f"Tool '{func.__qualname__}' cannot run in a process pool: "
+                    "it must be defined at module level"
+                )
+            if inspect.isgeneratorfunction(func) or inspect.isasyncgenfunction(func):
+                raise ValueError(
+                    f"Tool '{func.__qualname__}' cannot run in a process pool: "
+                    "generator tools must run in this process"
+                )
+
+        func_name: str = name or func.__name__
+        func_description: str = description or func.__doc__ or ""
+
+        sig = signature(func)
+        if len(sig.parameters) == 1:
+            param = next(iter(sig.parameters.values()))
+            if isclass(param.annotation) and issubclass(param.annotation, BaseModel):
+                return LlamdaPydantic.create(
+                    call_func=func,
+                    name=func_name,
+                    description=func_description,
+                    model=param.annotation,
+                    **options,
+                )
+
+        fields: Dict[str, tuple[type, Any]] = {
+            param_name: (
+                param.annotation if param.annotation != Parameter.empty else Any,
+                param.default if param.default != Parameter.empty else ...,
+            )
+            for param_name, param in sig.parameters.items()
+        }
+
+        return LlamdaFunction.create(
+            call_func=func,
+            fields=fields,
+            name=func_name,
+            description=func_description,
+            lazy=self.lazy if lazy is None else lazy,
+            **options,
+        )
+
+    def register_all(
+        self,
+        source: ToolSource,
+        lazy: Optional[bool] = None,
+        max_workers: Optional[int] = None,
+        fail_fast: bool = False,
+    ) -> RegistrationReport:
+        """Registers every eligible callable from a module, package or iterable.
+
+        Tools are created concurrently; nothing is registered if any of them
+        fails, and all failures are raised together as a ToolRegistrationError.
+        With `fail_fast`, the first failure is raised at once instead: no
+        further modules are imported and pending tools are not created.
+        """
+        started = time.perf_counter()
+        errors: List[Tuple[str, Exception]] = []
+        candidates = self._collect(source, errors, fail_fast)
+        build = not (self.lazy if lazy is None else lazy)
+
+        def create(func: Callable[..., Any]) -> Tuple[LlamdaCallable[Any], Any, float]:
+            func_started = time.perf_counter()
+            tool = (
+                func
+                if isinstance(func, LlamdaCallable)
+                else self._create(func, lazy=lazy)
+            )
+            schema = self._generate_schema(tool) if build else None
+            return tool, schema, time.perf_counter() - func_started
+
+        created: Dict[str, Tuple[LlamdaCallable[Any], Any, float]] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(func, executor.submit(create, func)) for func in candidates]
+            for func, future in futures:
+                label = getattr(func, "__qualname__", None) or getattr(
+                    func, "name", repr(func)
+                )
+                try:
+                    tool, schema, elapsed = future.result()
+                except Exception as e:
+                    errors.append((label, e))
+                else:
+                    tool_name: str = getattr(tool, "name", label)
+                    if tool_name not in created:
+                        created[tool_name] = (tool, schema, elapsed)
+                        continue
+                    errors.append(
+                        (label, ValueError(f"Duplicate tool name '{tool_name}'"))
                     )
-                    self._tools[func_name] = llamda_func
-                    return llamda_func
+                if fail_fast:
+                    executor.shutdown(cancel_futures=True)
+                    raise ToolRegistrationError(errors)
 
-            fields: Dict[str, tuple[type, Any]] = {
-                param_name: (
-                    param.annotation if param.annotation != Parameter.empty else Any,
-                    param.default if param.default != Parameter.empty else ...,
+        if errors:
+            raise ToolRegistrationError(errors)
+
+        for tool_name, (tool, schema, _) in created.items():
+            self._register(tool_name, tool)
+            if schema is not None:
+                self._schemas.put(
+                    tool_name,
+                    (tool, tool_name, getattr(tool, "description", ""), schema),
                 )
-                for param_name, param in sig.parameters.items()
-            }
-
-            llamda_func: LlamdaCallable[R] = LlamdaFunction.create(
-                call_func=func,
-                fields=fields,
-                name=func_name,
-                description=func_description,
+
+        return RegistrationReport(
+            timings={tool_name: entry[2] for tool_name, entry in created.items()},
+            total=time.perf_counter() - started,
+        )
+
+    @staticmethod
+    def _collect(
+        source: ToolSource,
+        errors: List[Tuple[str, Exception]],
+        fail_fast: bool = False,
+    ) -> List[Callable[..., Any]]:
+        """Lists the eligible callables of a module, package or iterable
+
+        Callables are only collected from the module that defines them, and
+        each one only once, however many modules re-export it. With
+        `fail_fast`, the first module that fails to import is raised.
+        """
+        if not isinstance(source, ModuleType):
+            return list({id(func): func for func in source}.values())
+
+        modules: List[ModuleType] = [source]
+        if hasattr(source, "__path__"):
+            for info in pkgutil.walk_packages(source.__path__, f"{source.__name__}."):
+                try:
+                    modules.append(importlib.import_module(info.name))
+                except Exception as e:
+                    errors.append((info.name, e))
+                    if fail_fast:
+                        raise ToolRegistrationError(errors) from e
+
+        candidates: Dict[int, Callable[..., Any]] = {}
+        for module in modules:
+            exported: Optional[List[str]] = getattr(module, "__all__", None)
+            for attr, value in vars(module).items():
+                if exported is not None:
+                    if attr not in exported:
+                        continue
+                elif attr.startswith("_"):
+                    continue
+                if isinstance(value, LlamdaCallable):
+                    defined_in = getattr(value.call_func, "__module__", None)
+                elif inspect.isfunction(value):
+                    defined_in = value.__module__
+                else:
+                    continue
+                if defined_in == module.__name__:
+                    candidates.setdefault(id(value), value)
+        return list(candidates.values())
+
+    def _register(
+        self,
+        name: str,
+        tool: LlamdaCallable[Any],
+        result_cache: Optional[ResultCache] = None,
+        limiter: Optional[Limiter] = None,
+    ) -> None:
+        """Adds a tool to the registry, dropping any schema cached under its name"""
+        self._tools[name] = tool
+        for options, option in (
+            (self._result_caches, result_cache),
+            (self._limiters, limiter),
+        ):
+            if option is not None:
+                options[name] = option
+            else:
+                options.pop(name, None)
+        self._version += 1
+        self._schemas.pop(name)
+        if self._index is not None:
+            self._index.add(name, self._index_text(name, tool))
+
+    @staticmethod
+    def _index_text(name: str, tool: LlamdaCallable[Any]) -> str:
+        return " ".join(
+            [
+                name,
+                getattr(tool, "description", ""),
+                *tool.parameter_names,
+            ]
+        )
+
+    def search(
+        self, query: str, k: int, names: Optional[List[str]] = None
+    ) -> List[str]:
+        """Returns up to k tool names ranked by BM25 relevance to the query.
+
+        The index is built on first use and then kept up to date on registration.
+        """
+        if self._index is None:
+            self._index = ToolIndex()
+            for tool_name, tool in self._tools.items():
+                self._index.add(tool_name, self._index_text(tool_name, tool))
+        return self._index.search(query, k, names)
+
+    def tool_schema(self, name: str) -> "OaiToolParam":
+        """Returns the tool spec for one function, generating it only when stale"""
+        tool = self._tools[name]
+        tool_name: str = getattr(tool, "name", name)
+        tool_description: str = getattr(tool, "description", "")
+
+        entry = self._schemas.get(
+            name,
+            is_valid=lambda entry: entry[0] is tool
+            and entry[1] == tool_name
+            and entry[2] == tool_description,
+        )
+        if entry is not None:
+            return entry[3]
+
+        schema = self._generate_schema(tool)
+        self._schemas.put(name, (tool, tool_name, tool_description, schema))
+        return schema
+
+    def _generate_schema(self, tool: LlamdaCallable[Any]) -> "OaiToolParam":
+        """Loads a tool spec from the schema store, or generates and stores it"""
+        if self.schema_store is None:
+            return tool.to_tool_schema()
+
+        fingerprint = tool_fingerprint(tool)
+        if fingerprint is None:
+            return tool.to_tool_schema()
+
+        schema = self.schema_store.get(fingerprint)
+        if schema is None:
+            schema = tool.to_tool_schema()
+            self.schema_store.put(fingerprint, schema)
+        return schema
+
+    def warm(self, names: Optional[List[str]] = None) -> None:
+        """Builds the models and schemas of some or all lazily registered tools"""
+        if names is None:
+            names = list(self._tools.keys())
+        for name in names:
+            self._tools[name].build()
+            self.tool_schema(name)
+
+    def schema_cache_info(self) -> CacheInfo:
+        """Returns the hit/miss counters of the tool schema cache"""
+        return self._schemas.info()
+
+    def clear_schema_cache(self) -> None:
+        """Drops every cached tool spec and resets the counters"""
+        self._schemas.clear()
+
+    def result_cache_info(self) -> Dict[str, CacheInfo]:
+        """Returns the result cache counters of every tool registered with one"""
+        return {name: cache.info() for name, cache in self._result_caches.items()}
+
+    def clear_result_cache(self, name: Optional[str] = None) -> None:
+        """Drops cached results for one tool, or for all of them"""
+        for cache_name, cache in self._result_caches.items():
+            if name is None or cache_name == name:
+                cache.clear()
+
+    def limiter_for(self, name: str) -> Optional[Limiter]:
+        """The limiter of a rate or concurrency limited tool, if it has one"""
+        return self._limiters.get(name)
+
+    def limit_stats(self) -> Dict[str, LimitStats]:
+        """Returns the load and queued-wait time of every rate or concurrency limited tool"""
+        return {name: limiter.stats() for name, limiter in self._limiters.items()}
+
+    def payload(self, names: Optional[List[str]] = None) -> ToolPayload:
+        """Returns the immutable, JSON-encoded tool list for some or all functions.
+
+        Payloads are kept in an LRU keyed by the set of requested names, so
+        repeated turns with the same subset reuse one object.
+        """
+        key = frozenset(names) if names is not None else None
+
+        def is_current(payload: ToolPayload) -> bool:
+            if payload.version != self._version:
+                return False
+            return all(
+                self.tool_schema(name) is tool
+                for name, tool in zip(payload.names, payload.tools)
             )
-            self._tools[func_name] = llamda_func
-            return llamda_func
 
-        return decorator
+        payload = self._payloads.get(key, is_valid=is_current)
+        if payload is not None:
+            return payload
+
+        ordered = names if names is not None else list(self._tools.keys())
+        ordered = [name for name in dict.fromkeys(ordered) if name in self._tools]
+        tools = tuple(self.tool_schema(name) for name in ordered)
+        payload = ToolPayload(
+            names=tuple(ordered),
+            tools=tools,
+            encoded=json.dumps(tools, separators=(",", ":")).encode(),
+            version=self._version,
+        )
+        self._payloads.put(key, payload)
+        return payload
+
+    def payload_cache_info(self) -> CacheInfo:
+        """Returns the hit/miss/eviction counters of the tool payload cache"""
+        return self._payloads.info()
 
-    def get(self, names: Optional[List[str]] = None) -> Sequence[OaiToolParam]:
+    def get(self, names: Optional[List[str]] = None) -> Sequence["OaiToolParam"]:
         """Returns the tool spec for some or all of the functions in the registry"""
         if names is None:
             names = list(self._tools.keys())
 
-        return [
-            self._tools[name].to_tool_schema() for name in names if name in self._tools
-        ]
+        return [self.tool_schema(name) for name in names if name in self._tools]
+
+    def execute_function(
+        self,
+        tool_call: LlToolCall,
+        process_pool: Optional[Executor] = None,
+        on_start: Optional[Callable[[], None]] = None,
+        limit: bool = True,
+    ) -> ToolResponse:
+        """Executes the function specified in the tool call with the required arguments
+
+        Coroutine tools are run to completion on a fresh event loop. Tools
+        registered with `executor="process"` run on `process_pool`, if given.
+        The chunks of generator tools are consumed as they are produced.
+        `on_start` is called once the tool's limits admit the call, just
+        before it runs. Pass `limit=False` when the caller already holds the
+        tool's limiter.
+        """
+        cache, key, cached = self._cached(tool_call)
+        if cached is not None:
+            return self._response(tool_call, cached, encoded=True)
 
-    def execute_function(self, tool_call: LlToolCall) -> ToolResponse:
-        """Executes the function specified in the tool call with the required arguments"""
         try:
-            if tool_call.name not in self._tools:
-                raise KeyError(f"Function '{tool_call.name}' not found")
-
-            parsed_args = json.loads(tool_call.arguments)
-            result = self._tools[tool_call.name].run(**parsed_args)
-        except KeyError as e:
-            result = {"error": f"Error: {str(e)}"}
-        except ValidationError as e:
-            result = {"error": f"Error: Validation failed - {str(e)}"}
+            tool = self._lookup(tool_call)
+            with self._limiter_for(tool_call) if limit else nullcontext():
+                if process_pool is not None and self._runs_in_process(tool):
+                    if on_start is not None:
+                        on_start()
+                    encoded = self._submit_to_process(tool, tool_call, process_pool)
+                    result = encoded.result()
+                else:
+                    result = json.dumps(self._run(tool, tool_call.arguments, on_start))
         except Exception as e:
-            result = {"error": f"Error: {str(e)}"}
+            return self._response(tool_call, self._error_result(e))
+
+        if cache is not None and key is not None:
+            cache.put(key, result)
+        return self._response(tool_call, result, encoded=True)
+
+    async def aexecute_function(
+        self,
+        tool_call: LlToolCall,
+        executor: Optional[Executor] = None,
+        process_pool: Optional[Executor] = None,
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> ToolResponse:
+        """Executes the tool call from a running event loop
+
+        Coroutine tools are awaited directly; plain tools run on `executor`,
+        or on the loop's default executor when none is given, and process
+        tools on `process_pool`. `on_start` is called, possibly from a worker
+        thread, just before the tool runs.
+        """
+        cache, key, cached = self._cached(tool_call)
+        if cached is not None:
+            return self._response(tool_call, cached, encoded=True)
+
+        try:
+            tool = self._lookup(tool_call)
+            async with self._limiter_for(tool_call):
+                if process_pool is not None and self._runs_in_process(tool):
+                    if on_start is not None:
+                        on_start()
+                    encoded = self._submit_to_process(tool, tool_call, process_pool)
+                    result = await asyncio.wrap_future(encoded)
+                elif tool.is_async or tool.is_async_generator:
+                    if on_start is not None:
+                        on_start()
+                    result = json.dumps(await self._arun(tool, tool_call.arguments))
+                else:
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        executor, self._run, tool, tool_call.arguments, on_start
+                    )
+                    result = json.dumps(result)
+        except Exception as e:
+            return self._response(tool_call, self._error_result(e))
+
+        if cache is not None and key is not None:
+            cache.put(key, result)
+        return self._response(tool_call, result, encoded=True)
+
+    @staticmethod
+    def _run(
+        tool: LlamdaCallable[Any],
+        arguments: str,
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> Any:
+        """Runs a tool to completion, collecting what generator tools yield"""
+        if on_start is not None:
+            on_start()
+        result = tool.run_json(arguments)
+        max_output = LlamdaFunctions._max_output(tool)
+        if inspect.iscoroutine(result):
+            return asyncio.run(result)
+        if inspect.isgenerator(result):
+            return collect_output(result, max_output).model_dump()
+        if inspect.isasyncgen(result):
+            return asyncio.run(acollect_output(result, max_output)).model_dump()
+        return result
+
+    @staticmethod
+    async def _arun(tool: LlamdaCallable[Any], arguments: str) -> Any:
+        """Awaits a coroutine tool, or collects what an async generator yields"""
+        result = tool.run_json(arguments)
+        if inspect.isasyncgen(result):
+            max_output = LlamdaFunctions._max_output(tool)
+            return (await acollect_output(result, max_output)).model_dump()
+        return await result
+
+    @staticmethod
+    def _max_output(tool: LlamdaCallable[Any]) -> int:
+        """The output cap of a generator tool; an explicit 0 keeps nothing"""
+        max_output = getattr(tool, "max_output", None)
+        return DEFAULT_MAX_OUTPUT if max_output is None else max_output
 
+    def _cached(
+        self, tool_call: LlToolCall
+    ) -> Tuple[Optional[ResultCache], Optional[str], Optional[str]]:
+        """Looks up a memoized result: the tool's cache, the key and any hit"""
+        cache = self._result_caches.get(tool_call.name)
+        if cache is None:
+            return None, None, None
+        key = cache.key(tool_call.arguments)
+        return cache, key, None if key is None else cache.get(key)
+
+    def _limiter_for(
+        self, tool_call: LlToolCall
+    ) -> Union[Limiter, "nullcontext[None]"]:
+        return self._limiters.get(tool_call.name) or nullcontext()
+
+    def _lookup(self, tool_call: LlToolCall) -> LlamdaCallable[Any]:
+        if tool_call.name not in self._tools:
+            raise KeyError(f"Function '{tool_call.name}' not found")
+        return self._tools[tool_call.name]
+
+    @staticmethod
+    def _error_result(error: Exception) -> Dict[str, str]:
+        if isinstance(error, ValidationError):
+            return {"error": f"Error: Validation failed - {str(error)}"}
+        return {"error": f"Error: {str(error)}"}
+
+    @staticmethod
+    def _response(
+        tool_call: LlToolCall, result: Any, encoded: bool = False
+    ) -> ToolResponse:
         return ToolResponse(
             id=tool_call.id,
             name=tool_call.name,
             arguments=tool_call.arguments,
-            result=json.dumps(result),
+            result=result if encoded else json.dumps(result),
+        )
+
+    def dedupes(self, name: str) -> bool:
+        """Whether identical calls to the named tool may share one execution"""
+        return getattr(self._tools.get(name), "dedupe", True)
+
+    def timeout_for(self, name: str) -> Optional[float]:
+        """The timeout in seconds the named tool was registered with, if any"""
+        return getattr(self._tools.get(name), "timeout", None)
+
+    def timed_out(self, tool_call: LlToolCall, seconds: float) -> ToolResponse:
+        """The response sent back for a tool call that ran out of time"""
+        return self._response(
+            tool_call,
+            {
+                "error": f"Error: Tool '{tool_call.name}' timed out after "
+                f"{seconds:g} seconds",
+                "timed_out": True,
+            },
+        )
+
+    def skipped(self, tool_call: LlToolCall, reason: str) -> ToolResponse:
+        """The response sent back for a tool call that was not run"""
+        return self._response(
+            tool_call,
+            {"error": f"Error: Tool call skipped: {reason}", "skipped": True},
+        )
+
+    def runs_in_process(self, name: str) -> bool:
+        """Whether the named tool was registered with `executor="process"`"""
+        return name in self._tools and self._runs_in_process(self._tools[name])
+
+    @staticmethod
+    def _runs_in_process(tool: LlamdaCallable[Any]) -> bool:
+        return getattr(tool, "executor", "thread") == "process"
+
+    @staticmethod
+    def _submit_to_process(
+        tool: LlamdaCallable[Any], tool_call: LlToolCall, process_pool: Executor
+    ) -> "Future[str]":
+        """Validates arguments here and ships them to a worker process"""
+        args, kwargs = tool.validate_json(tool_call.arguments)
+        func = getattr(tool, "call_func")
+        return process_pool.submit(
+            _call_in_process, func.__module__, func.__qualname__, args, kwargs
         )
 
     def __getitem__(self, key: str) -> LlamdaCallable[Any]:
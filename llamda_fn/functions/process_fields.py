@@ -1,14 +1,97 @@
 from ast import List
-from typing import Any, Dict, Union, get_args, get_origin
+from copy import deepcopy
+from typing import Any, Dict, Hashable, Optional, Union, get_args, get_origin
 from pydantic import BaseModel, Field, ValidationError, create_model
 from pydantic.fields import FieldInfo
 from pydantic_core import SchemaError
 
+from llamda_fn.utils.cache import CacheInfo, LRUCache
+
 JsonDict = Dict[str, Any]
 
+FIELD_CACHE_SIZE = 1024
+
+_FIELD_INFO_SLOTS: tuple[str, ...] = tuple(
+    slot for slot in getattr(FieldInfo, "__slots__", ()) if not slot.startswith("_")
+)
+
+_field_cache: LRUCache[Hashable, tuple[Any, JsonDict]] = LRUCache(
+    maxsize=FIELD_CACHE_SIZE
+)
+
+
+def _freeze(value: Any) -> Hashable:
+    """
+    Turn containers into hashable equivalents tagged with their type, so
+    `[]`, `()` and `{}` stay distinct; raises TypeError if impossible.
+    """
+    if isinstance(value, dict):
+        items = tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+        return (type(value), items)
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(_freeze(v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return (type(value), frozenset(_freeze(v) for v in value))
+    hash(value)
+    return (type(value), value)
+
+
+def _field_key(
+    field_type: Any, field_info: Union[JsonDict, FieldInfo]
+) -> Optional[Hashable]:
+    """
+    Build the cache key for a field, or None if the field cannot be hashed.
+    """
+    try:
+        if isinstance(field_info, FieldInfo):
+            info = tuple(
+                (slot, _freeze(getattr(field_info, slot, None)))
+                for slot in _FIELD_INFO_SLOTS
+            )
+            key = (field_type, FieldInfo, info)
+        else:
+            key = (field_type, dict, _freeze(field_info))
+        hash(key)
+        return key
+    except TypeError:
+        return None
+
 
 def process_field(
     field_type: Any, field_info: Union[JsonDict, FieldInfo]
+) -> tuple[Any, JsonDict]:
+    """
+    Process a field type and info, memoizing the result per (type, field info).
+    """
+    key = _field_key(field_type, field_info)
+    if key is None:
+        return _process_field(field_type, field_info)
+
+    cached = _field_cache.get(key)
+    if cached is None:
+        cached = _process_field(field_type, field_info)
+        _field_cache.put(key, cached)
+
+    processed_type, field_schema = cached
+    return processed_type, deepcopy(field_schema)
+
+
+def process_field_cache_info() -> CacheInfo:
+    """
+    Get the hit/miss counters of the process_field cache.
+    """
+    return _field_cache.info()
+
+
+def clear_process_field_cache() -> None:
+    """
+    Drop every memoized field schema.
+    """
+    _field_cache.clear()
+
+
+def _process_field(
+    field_type: Any, field_info: Union[JsonDict, FieldInfo]
 ) -> tuple[Any, JsonDict]:
     """
     Process a field type and info, using Pydantic's model_json_schema for schema generation.
@@ -0,0 +1,126 @@
+"""
+Opt-in memoization of tool results, keyed by tool name and arguments.
+"""
+
+import json
+from threading import Lock
+from typing import Optional, Protocol, Union
+
+from llamda_fn.utils.cache import CacheInfo, LRUCache
+
+DEFAULT_RESULT_CACHE_SIZE = 128
+
+
+class ResultStore(Protocol):
+    """
+    The storage a ResultCache keeps encoded results in, e.g. LRUCache or SQLiteCache.
+    """
+
+    def get(self, key: str) -> Optional[str]: ...
+
+    def put(self, key: str, value: str) -> None: ...
+
+    def clear_prefix(self, prefix: str) -> int: ...
+
+    def clear(self) -> None: ...
+
+    def info(self) -> CacheInfo: ...
+
+
+CacheOption = Union[bool, int, ResultStore, None]
+
+
+def canonical_arguments(arguments: str) -> Optional[str]:
+    """
+    Normalise a JSON argument object so equivalent calls share a key.
+
+    Returns None for arguments that are not valid JSON.
+    """
+    try:
+        decoded = json.loads(arguments or "{}")
+    except ValueError:
+        return None
+    return json.dumps(decoded, sort_keys=True, separators=(",", ":"))
+
+
+class ResultCache:
+    """
+    Caches one tool's JSON-encoded results by its canonical arguments.
+
+    The store may be shared between tools (and, for a SQLiteCache, between
+    processes); hits and misses are still counted per tool.
+    """
+
+    def __init__(self, name: str, store: ResultStore) -> None:
+        self.name = name
+        self.store = store
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def from_option(cls, name: str, option: CacheOption) -> Optional["ResultCache"]:
+        """
+        Build the cache for a `llamdafy(cache=...)` option.
+
+        True gives an in-memory LRU of the default size, an int an LRU of
+        that size, and any other value is used as the store itself.
+        """
+        if option is None or option is False:
+            return None
+        if option is True:
+            return cls(name, LRUCache(DEFAULT_RESULT_CACHE_SIZE))
+        if isinstance(option, int):
+            return cls(name, LRUCache(option))
+        return cls(name, option)
+
+    def key(self, arguments: str) -> Optional[str]:
+        """
+        The store key for a call's arguments, or None if they cannot be cached.
+        """
+        canonical = canonical_arguments(arguments)
+        return None if canonical is None else f"{self.name}\x00{canonical}"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached result for a key, counting the hit or miss.
+        """
+        result = self.store.get(key)
+        with self._lock:
+            if result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return result
+
+    def put(self, key: str, result: str) -> None:
+        """
+        Store an encoded result.
+        """
+        self.store.put(key, result)
+
+    def clear(self) -> None:
+        """
+        Drop this tool's entries from the store and reset its counters.
+        """
+        self.store.clear_prefix(f"{self.name}\x00")
+        with self._lock:
+            self._hits = self._misses = 0
+
+    def info(self) -> CacheInfo:
+        """
+        This tool's hits and misses, with the size counters of its store.
+        """
+        store_info = self.store.info()
+        with self._lock:
+            return store_info.model_copy(
+                update={"hits": self._hits, "misses": self._misses}
+            )
+
+
+__all__: list[str] = [
+    "CacheOption",
+    "ResultCache",
+    "ResultStore",
+    "canonical_arguments",
+]
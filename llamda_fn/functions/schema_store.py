@@ -0,0 +1,240 @@
+"""
+Persistent, content-addressed storage for generated tool schemas.
+
+Schemas are keyed by a hash of everything they are derived from (the
+function's qualified name, signature, annotations and docstring, plus the
+tool name and description), so unchanged tools can skip pydantic schema
+generation on cold start.
+
+Prebuild a store at deploy time with:
+
+    python -m llamda_fn.functions.schema_store tools.schemas.json my_app.tools
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import tempfile
+from inspect import signature
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Union, get_args
+
+import pydantic
+from pydantic import BaseModel
+
+from llamda_fn.utils.cache import CacheInfo
+
+from .llamda_classes import LlamdaCallable, LlamdaPydantic
+
+if TYPE_CHECKING:
+    from llamda_fn.llms.api_types import OaiToolParam
+
+SCHEMA_STORE_VERSION = 1
+
+
+def _describe(annotation: Any, seen: Set[int]) -> str:
+    """
+    Describe an annotation, expanding the fields of any pydantic models in it.
+    """
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        if id(annotation) in seen:
+            return annotation.__qualname__
+        seen.add(id(annotation))
+        fields = ", ".join(
+            f"{name}: {_describe(field.annotation, seen)} = {field!r}"
+            for name, field in annotation.model_fields.items()
+        )
+        return f"{annotation.__module__}.{annotation.__qualname__}({fields})"
+    args = get_args(annotation)
+    if args:
+        return f"{annotation!r}[{', '.join(_describe(arg, seen) for arg in args)}]"
+    return repr(annotation)
+
+
+def tool_fingerprint(tool: LlamdaCallable[Any]) -> Optional[str]:
+    """
+    Hash the inputs a tool's schema is generated from, or None if unknown.
+    """
+    func = getattr(tool, "call_func", None)
+    if func is None:
+        return None
+
+    seen: Set[int] = set()
+    try:
+        sig = signature(func)
+    except (TypeError, ValueError):
+        return None
+
+    parts: List[str] = [
+        str(SCHEMA_STORE_VERSION),
+        pydantic.VERSION,
+        type(tool).__name__,
+        getattr(tool, "name", ""),
+        getattr(tool, "description", ""),
+        f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', '')}",
+        str(sig),
+        func.__doc__ or "",
+    ]
+    parts.extend(
+        f"{name}: {_describe(param.annotation, seen)}"
+        for name, param in sig.parameters.items()
+    )
+    if isinstance(tool, LlamdaPydantic):
+        parts.append(_describe(tool.model, seen))
+
+    return hashlib.sha256("\x00".join(parts).encode()).hexdigest()
+
+
+class SchemaStore:
+    """
+    A JSON file of tool schemas keyed by tool fingerprint.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._entries: Dict[str, "OaiToolParam"] = {}
+        self._used: Set[str] = set()
+        self._lock = Lock()
+        self._dirty = False
+        self._reused = 0
+        self._generated = 0
+        self.load()
+
+    def load(self) -> None:
+        """
+        Load entries from disk, ignoring missing, stale or unreadable files.
+        """
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == SCHEMA_STORE_VERSION:
+            self._entries = dict(data.get("entries", {}))
+
+    def get(self, fingerprint: str) -> Optional["OaiToolParam"]:
+        """
+        Return the stored schema for a fingerprint, counting the reuse.
+        """
+        with self._lock:
+            schema = self._entries.get(fingerprint)
+            if schema is not None:
+                self._used.add(fingerprint)
+                self._reused += 1
+            return schema
+
+    def put(self, fingerprint: str, schema: "OaiToolParam") -> None:
+        """
+        Store a freshly generated schema.
+        """
+        with self._lock:
+            self._entries[fingerprint] = schema
+            self._used.add(fingerprint)
+            self._generated += 1
+            self._dirty = True
+
+    def save(self, prune: bool = False) -> None:
+        """
+        Atomically write the store to disk.
+
+        With `prune`, entries not used since the store was loaded are dropped.
+        """
+        with self._lock:
+            if prune:
+                unused = set(self._entries) - self._used
+                for fingerprint in unused:
+                    del self._entries[fingerprint]
+                self._dirty = self._dirty or bool(unused)
+            if not self._dirty and self.path.exists():
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as tmp:
+                    json.dump(
+                        {"version": SCHEMA_STORE_VERSION, "entries": self._entries},
+                        tmp,
+                    )
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._dirty = False
+
+    def info(self) -> CacheInfo:
+        """
+        Report how many schemas were reused from disk versus generated.
+        """
+        with self._lock:
+            return CacheInfo(
+                hits=self._reused,
+                misses=self._generated,
+                currsize=len(self._entries),
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _load_target(target: str, store: SchemaStore) -> Any:
+    """
+    Resolve `module` or `module:attribute` into a registry using the store.
+    """
+    from .llamda_functions import LlamdaFunctions
+
+    module_name, _, attribute = target.partition(":")
+    module = importlib.import_module(module_name)
+    if not attribute:
+        functions = LlamdaFunctions(lazy=True, schema_store=store)
+        functions.register_all(module)
+        return functions
+
+    functions = getattr(module, attribute)
+    functions = getattr(functions, "functions", functions)
+    if not isinstance(functions, LlamdaFunctions):
+        raise TypeError(f"{target} is not a Llamda or LlamdaFunctions instance")
+    functions.schema_store = store
+    functions.clear_schema_cache()
+    return functions
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Prebuild a schema store for the tools in the given modules or registries.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m llamda_fn.functions.schema_store",
+        description="Prebuild the persistent tool schema cache.",
+    )
+    parser.add_argument("path", help="schema store file to create or update")
+    parser.add_argument(
+        "targets",
+        nargs="+",
+        help="modules/packages to scan, or module:attribute of a Llamda instance",
+    )
+    parser.add_argument(
+        "--prune", action="store_true", help="drop entries for tools not seen"
+    )
+    args = parser.parse_args(argv)
+
+    store = SchemaStore(args.path)
+    tools = 0
+    for target in args.targets:
+        functions = _load_target(target, store)
+        tools += len(functions.get())
+    store.save(prune=args.prune)
+
+    info = store.info()
+    print(
+        f"{tools} tools: {info.hits} schemas reused, {info.misses} generated, "
+        f"{info.currsize} entries in {store.path}"
+    )
+
+
+__all__: list[str] = ["SchemaStore", "tool_fingerprint", "main"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+A small incremental BM25 index used to pick the tools relevant to a message.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+_TOKEN_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase terms, breaking snake_case and camelCase words.
+    """
+    return [token.lower() for token in _TOKEN_RE.findall(text)]
+
+
+class ToolIndex:
+    """
+    Okapi BM25 over tool documents, updated incrementally as tools change.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._docs: Dict[str, Counter[str]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+
+    def add(self, name: str, text: str) -> None:
+        """
+        Index a tool document, replacing any previous one with the same name.
+        """
+        self.remove(name)
+        terms = Counter(tokenize(text))
+        self._docs[name] = terms
+        self._lengths[name] = sum(terms.values())
+        self._total_length += self._lengths[name]
+        for term, freq in terms.items():
+            self._postings.setdefault(term, {})[name] = freq
+
+    def remove(self, name: str) -> None:
+        """
+        Drop a tool document from the index, if present.
+        """
+        terms = self._docs.pop(name, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(name)
+        for term in terms:
+            posting = self._postings[term]
+            del posting[name]
+            if not posting:
+                del self._postings[term]
+
+    def scores(
+        self, query: str, names: Optional[Iterable[str]] = None
+    ) -> Dict[str, float]:
+        """
+        Score every matching tool against the query, optionally within `names`.
+        """
+        n_docs = len(self._docs)
+        if not n_docs:
+            return {}
+        allowed = set(names) if names is not None else None
+        avg_length = self._total_length / n_docs or 1.0
+
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for name, freq in posting.items():
+                if allowed is not None and name not in allowed:
+                    continue
+                norm = self.k1 * (
+                    1 - self.b + self.b * self._lengths[name] / avg_length
+                )
+                scores[name] = scores.get(name, 0.0) + idf * freq * (self.k1 + 1) / (
+                    freq + norm
+                )
+        return scores
+
+    def search(
+        self, query: str, k: int, names: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """
+        Return up to k tool names ranked by relevance to the query.
+        """
+        scores = self.scores(query, names)
+        return sorted(scores, key=lambda name: (-scores[name], name))[:k]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._docs
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+
+__all__: list[str] = ["ToolIndex", "tokenize"]
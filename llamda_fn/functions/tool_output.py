@@ -0,0 +1,114 @@
+"""
+Bounded collection of the chunks yielded by generator tools.
+"""
+
+import json
+from typing import Any, AsyncIterable, Iterable, List
+
+from pydantic import BaseModel
+
+DEFAULT_MAX_OUTPUT = 65536
+
+
+class ToolOutput(BaseModel):
+    """
+    The chunks of a generator tool kept for the model, and what was dropped.
+
+    Sizes are in characters of JSON-encoded chunks.
+    """
+
+    chunks: List[Any] = []
+    truncated: bool = False
+    omitted_chunks: int = 0
+    omitted_chars: int = 0
+
+
+class OutputCollector:
+    """
+    Keeps chunks until `max_output` characters are used, then only counts them.
+
+    Only the chunk that first overflows is cut to the space left, and only if
+    it is a string; everything after it is counted, never kept.
+    """
+
+    def __init__(self, max_output: int = DEFAULT_MAX_OUTPUT) -> None:
+        self.max_output = max_output
+        self.output = ToolOutput()
+        self._size = 0
+
+    def add(self, chunk: Any) -> None:
+        """
+        Keep or count one chunk.
+        """
+        size = len(json.dumps(chunk))
+        if self.output.truncated:
+            self.output.omitted_chunks += 1
+            self.output.omitted_chars += size
+            return
+
+        space = self.max_output - self._size
+        if size <= space:
+            self.output.chunks.append(chunk)
+            self._size += size
+            return
+
+        self.output.truncated = True
+        if isinstance(chunk, str) and space > 2:
+            kept = _encoded_prefix(chunk, space)
+            kept_size = len(json.dumps(kept))
+            self.output.chunks.append(kept)
+            self._size += kept_size
+            self.output.omitted_chars += size - kept_size
+            return
+        self.output.omitted_chunks += 1
+        self.output.omitted_chars += size
+
+
+def _encoded_prefix(text: str, space: int) -> str:
+    """
+    The longest prefix of `text` whose JSON encoding fits in `space` characters.
+
+    Escapes and non-ASCII characters encode to several characters each, so
+    the cut is searched for rather than taken at `space`.
+    """
+    low, high = 0, min(len(text), space - 2)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if len(json.dumps(text[:mid])) <= space:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+
+def collect_output(
+    chunks: Iterable[Any], max_output: int = DEFAULT_MAX_OUTPUT
+) -> ToolOutput:
+    """
+    Consume a generator tool's chunks, keeping at most `max_output` characters.
+    """
+    collector = OutputCollector(max_output)
+    for chunk in chunks:
+        collector.add(chunk)
+    return collector.output
+
+
+async def acollect_output(
+    chunks: AsyncIterable[Any], max_output: int = DEFAULT_MAX_OUTPUT
+) -> ToolOutput:
+    """
+    Asynchronous collect_output() for async generator tools.
+    """
+    collector = OutputCollector(max_output)
+    async for chunk in chunks:
+        collector.add(chunk)
+    return collector.output
+
+
+__all__: list[str] = [
+    "DEFAULT_MAX_OUTPUT",
+    "OutputCollector",
+    "ToolOutput",
+    "acollect_output",
+    "collect_output",
+]
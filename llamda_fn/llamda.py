@@ -1,5 +1,31 @@
-from typing import Any, Callable, List, Optional, Sequence
-from concurrent.futures import ThreadPoolExecutor, as_completed, Future
+import asyncio
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from concurrent.futures import CancelledError, Executor, Future, InvalidStateError
+from queue import Queue
+from threading import Condition, Thread
+from types import TracebackType
+
+from pydantic import BaseModel
+
+from llamda_fn.utils.concurrency import SingleFlight
+from llamda_fn.utils.executor import ToolExecutor
 from llamda_fn.utils.logger import logger
 
 from llamda_fn.llms.api_types import (
@@ -7,13 +33,99 @@ from llamda_fn.llms.api_types import (
     LLMessage,
     LlToolCall,
     ToolResponse,
-    OaiToolParam,
 )
 
 from llamda_fn.functions import LlamdaFunctions
-from llamda_fn.llms.llm_manager import LLManager
+from llamda_fn.functions.result_cache import canonical_arguments
 from llamda_fn.llms.exchange import Exchange
 
+if TYPE_CHECKING:
+    from llamda_fn.llms.api_types import OaiToolParam
+    from llamda_fn.llms.llm_manager import AsyncLLManager
+    from llamda_fn.llms.routing import AsyncRoutingManager
+
+
+W = TypeVar("W")
+
+StopReason = Literal["done", "max_steps", "max_tool_calls", "deadline"]
+
+
+class StepTiming(BaseModel):
+    """
+    Timings of one completion and the tool round it requested, in seconds.
+    """
+
+    completion: float
+    tools: float = 0.0
+    tool_calls: int = 0
+
+
+class RunSummary(BaseModel):
+    """
+    The outcome of a run: its final message, why it stopped, and its cost.
+    """
+
+    message: LLMessage
+    stop_reason: StopReason
+    steps: List[StepTiming] = []
+    tool_calls: int = 0
+    elapsed: float = 0.0
+
+
+class _CallClock:
+    """
+    When the tool calls of one round began running, by the round's work keys.
+
+    A tool's timeout counts from this moment rather than from when the call
+    was queued. Sync waiters are woken through `changed`; async waiters await
+    started() on their event loop.
+    """
+
+    def __init__(self) -> None:
+        self.changed = Condition()
+        self._began: Dict[Hashable, float] = {}
+        self._started: Dict[Hashable, "asyncio.Future[None]"] = {}
+
+    def start(self, key: Hashable) -> None:
+        """
+        Record that the call for `key` began running; callable from any thread.
+        """
+        with self.changed:
+            self._began[key] = time.monotonic()
+            self.changed.notify_all()
+            started = self._started.get(key)
+        if started is not None:
+            started.get_loop().call_soon_threadsafe(_resolve, started)
+
+    def notify(self) -> None:
+        """
+        Wake the sync waiters, e.g. when a call finishes.
+        """
+        with self.changed:
+            self.changed.notify_all()
+
+    def began(self, key: Hashable) -> Optional[float]:
+        return self._began.get(key)
+
+    def started(self, key: Hashable) -> "asyncio.Future[None]":
+        """
+        A future on the running loop, resolved once the call for `key` began.
+        """
+        with self.changed:
+            started = self._started.get(key)
+            if started is None:
+                started = self._started[key] = (
+                    asyncio.get_running_loop().create_future()
+                )
+                if key in self._began:
+                    started.set_result(None)
+            return started
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
 
 class Llamda:
     """
@@ -23,11 +135,51 @@ class Llamda:
     def __init__(
         self,
         system: Optional[str] = None,
+        lazy: bool = False,
+        functions: Optional[LlamdaFunctions] = None,
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        max_processes: Optional[int] = None,
+        dedupe: Union[bool, SingleFlight[Tuple[str, str], ToolResponse]] = True,
         **kwargs: Any,
     ):
-        self.api = LLManager(**kwargs)
-        self.functions: LlamdaFunctions = LlamdaFunctions()
+        """
+        Tool calls run on a long-lived pool of `max_workers` threads, or on an
+        injected `executor` (which the caller remains responsible for). Tools
+        registered with `executor="process"` run on a pool of `max_processes`.
+
+        Identical tool calls in one assistant message run once and share the
+        result unless `dedupe` is False, or the tool was registered with
+        `dedupe=False`. Passing a SingleFlight also shares in-flight calls
+        with every exchange using it; share one only between instances with
+        the same tools.
+
+        Other arguments configure the LLM manager. Given `endpoints`, a list
+        of LlmApiConfig, completions are routed across them by a
+        RoutingManager instead.
+        """
+        from llamda_fn.llms.llm_manager import LLManager
+        from llamda_fn.llms.routing import RoutingManager
+
+        self.api: Union[LLManager, RoutingManager] = (
+            RoutingManager(**kwargs)
+            if kwargs.get("endpoints") is not None
+            else LLManager(**kwargs)
+        )
+        self.aapi: Optional[Union["AsyncLLManager", "AsyncRoutingManager"]] = None
+        self._api_kwargs = kwargs
+        self.functions: LlamdaFunctions = (
+            functions if functions is not None else LlamdaFunctions(lazy=lazy)
+        )
         self.exchange = Exchange(system=system)
+        self.last_summary: Optional[RunSummary] = None
+        self.dedupe = bool(dedupe)
+        self.single_flight: Optional[SingleFlight[Tuple[str, str], ToolResponse]] = (
+            dedupe if isinstance(dedupe, SingleFlight) else None
+        )
+        self.executor = ToolExecutor(
+            max_workers=max_workers, executor=executor, max_processes=max_processes
+        )
 
     def fy(self, *args: Any, **kwargs: Any) -> Callable[..., Any]:
         """
@@ -36,7 +188,7 @@ class Llamda:
         return self.functions.llamdafy(*args, **kwargs)
 
     @property
-    def tools(self) -> Sequence[OaiToolParam]:
+    def tools(self) -> Sequence["OaiToolParam"]:
         """
         Get the tools available to the Llamda instance.
         """
@@ -47,55 +199,784 @@ class Llamda:
         tool_names: Optional[List[str]] = None,
         exchange: Optional[Exchange] = None,
         llm_name: Optional[str] = None,
+        max_tools: Optional[int] = None,
+        deadline: Optional[float] = None,
+        max_steps: Optional[int] = None,
+        max_tool_calls: Optional[int] = None,
+        stream: bool = False,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> LLMessage:
         """
-        Run the OpenAI API with the prepared data.
+        Run the OpenAI API with the prepared data and return the final message.
+
+        See run_loop() for the arguments; its summary is kept in `last_summary`.
         """
+        return self.run_loop(
+            tool_names,
+            exchange,
+            llm_name,
+            max_tools,
+            deadline,
+            max_steps,
+            max_tool_calls,
+            stream,
+            on_token,
+        ).message
+
+    def run_loop(
+        self,
+        tool_names: Optional[List[str]] = None,
+        exchange: Optional[Exchange] = None,
+        llm_name: Optional[str] = None,
+        max_tools: Optional[int] = None,
+        deadline: Optional[float] = None,
+        max_steps: Optional[int] = None,
+        max_tool_calls: Optional[int] = None,
+        stream: bool = False,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> RunSummary:
+        """
+        Alternate completions and tool rounds until the model stops calling tools.
+
+        With `max_tools`, only the tools most relevant to the latest user
+        message (out of `tool_names`, if given) are sent.
+
+        The loop is bounded by `max_steps` completions, `max_tool_calls` tool
+        calls in total and a `deadline` in seconds: tool calls still running at
+        the deadline are answered with a timeout result, and no tool round
+        starts after it. Timed-out tools running in threads are not
+        interrupted; they finish in the background and their results are
+        dropped. Tool calls requested past a limit are answered as
+        skipped and the run stops.
+
+        With `stream`, completions are streamed: assistant text is passed to
+        `on_token` as it arrives, and each tool call starts as soon as its
+        arguments are complete, while the model is still generating the
+        rest, as long as the limits allow. If a limit then stops the run,
+        calls that have not begun running are cancelled; those already
+        running are waited for, up to the deadline, and answered with their
+        results.
+        """
+        started = time.monotonic()
+        expires = self._expires(deadline)
         current_exchange: Exchange = exchange or self.exchange
+        tool_names = self._select_tools(tool_names, current_exchange, max_tools)
+
+        steps: List[StepTiming] = []
+        tool_calls = 0
+        while True:
+            step_started = time.monotonic()
+            request: Dict[str, Any] = {
+                "messages": current_exchange,
+                "llm_name": llm_name or self.api.llm_name,
+                "tools": self.functions.payload(tool_names).tools,
+            }
+            early: Dict[Hashable, Future[ToolResponse]] = {}
+            clock = _CallClock()
+            if stream or on_token is not None:
+                budget = self._early_budget(
+                    len(steps), tool_calls, max_steps, max_tool_calls, expires
+                )
+                completion_stream = self.api.stream_completion(
+                    **request,
+                    on_tool_call=self._dispatcher(
+                        early,
+                        budget,
+                        expires,
+                        lambda call: self._submit(call, clock, expires),
+                    ),
+                )
+                for token in completion_stream:
+                    if on_token is not None:
+                        on_token(token)
+                ll_completion: LLCompletion = completion_stream.completion()
+            else:
+                ll_completion = self.api.chat_completion(**request)
+            message = self._record(ll_completion, current_exchange, steps, step_started)
+            stop_reason = self._stop_reason(
+                message, len(steps), tool_calls, max_steps, max_tool_calls, expires
+            )
+            run_calls = message.tool_calls or []
+            if stop_reason is not None:
+                for key in [key for key, work in early.items() if work.cancel()]:
+                    del early[key]
+                run_calls = self._started_early(run_calls, early)
+
+            tools_started = time.monotonic()
+            if run_calls:
+                self._handle_tool_calls(
+                    run_calls, current_exchange, expires, early, clock
+                )
+                steps[-1].tools = time.monotonic() - tools_started
+            tool_calls += len(run_calls)
+            if stop_reason is not None:
+                break
 
-        ll_completion: LLCompletion = self.api.chat_completion(
-            messages=current_exchange,
-            llm_name=llm_name or self.api.llm_name,
-            tools=self.functions.get(tool_names),
+        return self._summarize(
+            message,
+            current_exchange,
+            stop_reason,
+            steps,
+            tool_calls,
+            started,
+            run_calls,
         )
-        logger.msg(ll_completion.message)
-        current_exchange.append(ll_completion.message)
-        if ll_completion.message.tool_calls:
-            self._handle_tool_calls(ll_completion.message.tool_calls)
 
-        return current_exchange[-1]
+    async def arun(
+        self,
+        tool_names: Optional[List[str]] = None,
+        exchange: Optional[Exchange] = None,
+        llm_name: Optional[str] = None,
+        max_tools: Optional[int] = None,
+        deadline: Optional[float] = None,
+        max_steps: Optional[int] = None,
+        max_tool_calls: Optional[int] = None,
+        stream: bool = False,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> LLMessage:
+        """
+        Asynchronous run() built on AsyncOpenAI.
 
-    def _handle_tool_calls(self, tool_calls: List[LlToolCall]) -> None:
+        Coroutine tools run concurrently on the event loop, and are cancelled
+        when they time out; plain tools run on the instance's tool executor.
+        """
+        summary = await self.arun_loop(
+            tool_names,
+            exchange,
+            llm_name,
+            max_tools,
+            deadline,
+            max_steps,
+            max_tool_calls,
+            stream,
+            on_token,
+        )
+        return summary.message
 
-        tool_log = logger.tools(tool_calls)
-        with ThreadPoolExecutor() as executor:
-            futures: List[Future[ToolResponse]] = [
-                executor.submit(self._process_tool_call, tool_call, tool_log)
-                for tool_call in tool_calls
+    async def arun_loop(
+        self,
+        tool_names: Optional[List[str]] = None,
+        exchange: Optional[Exchange] = None,
+        llm_name: Optional[str] = None,
+        max_tools: Optional[int] = None,
+        deadline: Optional[float] = None,
+        max_steps: Optional[int] = None,
+        max_tool_calls: Optional[int] = None,
+        stream: bool = False,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> RunSummary:
+        """
+        Asynchronous run_loop().
+        """
+        if self.aapi is None and self._api_kwargs.get("endpoints") is not None:
+            from llamda_fn.llms.routing import AsyncRoutingManager
+
+            self.aapi = AsyncRoutingManager(**self._api_kwargs)
+        elif self.aapi is None:
+            from llamda_fn.llms.llm_manager import AsyncLLManager
+
+            self.aapi = AsyncLLManager(**self._api_kwargs)
+
+        started = time.monotonic()
+        expires = self._expires(deadline)
+        current_exchange: Exchange = exchange or self.exchange
+        tool_names = self._select_tools(tool_names, current_exchange, max_tools)
+
+        steps: List[StepTiming] = []
+        tool_calls = 0
+        while True:
+            step_started = time.monotonic()
+            request: Dict[str, Any] = {
+                "messages": current_exchange,
+                "llm_name": llm_name or self.aapi.llm_name,
+                "tools": self.functions.payload(tool_names).tools,
+            }
+            early: Dict[Hashable, "asyncio.Task[ToolResponse]"] = {}
+            clock = _CallClock()
+            if stream or on_token is not None:
+                budget = self._early_budget(
+                    len(steps), tool_calls, max_steps, max_tool_calls, expires
+                )
+                completion_stream = await self.aapi.stream_completion(
+                    **request,
+                    on_tool_call=self._dispatcher(
+                        early,
+                        budget,
+                        expires,
+                        lambda call: self._aspawn(call, clock),
+                    ),
+                )
+                async for token in completion_stream:
+                    if on_token is not None:
+                        on_token(token)
+                ll_completion: LLCompletion = await completion_stream.completion()
+            else:
+                ll_completion = await self.aapi.chat_completion(**request)
+            message = self._record(ll_completion, current_exchange, steps, step_started)
+            stop_reason = self._stop_reason(
+                message, len(steps), tool_calls, max_steps, max_tool_calls, expires
+            )
+            run_calls = message.tool_calls or []
+            if stop_reason is not None:
+                run_calls = self._started_early(run_calls, early)
+
+            tools_started = time.monotonic()
+            if run_calls:
+                await self._ahandle_tool_calls(
+                    run_calls, current_exchange, expires, early, clock
+                )
+                steps[-1].tools = time.monotonic() - tools_started
+            tool_calls += len(run_calls)
+            if stop_reason is not None:
+                break
+
+        return self._summarize(
+            message,
+            current_exchange,
+            stop_reason,
+            steps,
+            tool_calls,
+            started,
+            run_calls,
+        )
+
+    def _select_tools(
+        self,
+        tool_names: Optional[List[str]],
+        exchange: Exchange,
+        max_tools: Optional[int],
+    ) -> Optional[List[str]]:
+        if max_tools is None:
+            return tool_names
+        return self.functions.search(
+            self._latest_user_text(exchange), max_tools, tool_names
+        )
+
+    @staticmethod
+    def _record(
+        ll_completion: LLCompletion,
+        exchange: Exchange,
+        steps: List[StepTiming],
+        step_started: float,
+    ) -> LLMessage:
+        """
+        Add a completion to the exchange and start timing its step.
+        """
+        message = ll_completion.message
+        logger.msg(message)
+        exchange.append(message)
+        steps.append(
+            StepTiming(
+                completion=time.monotonic() - step_started,
+                tool_calls=len(message.tool_calls or []),
+            )
+        )
+        return message
+
+    @staticmethod
+    def _stop_reason(
+        message: LLMessage,
+        steps: int,
+        tool_calls: int,
+        max_steps: Optional[int],
+        max_tool_calls: Optional[int],
+        expires: Optional[float],
+    ) -> Optional[StopReason]:
+        if not message.tool_calls:
+            return "done"
+        if max_steps is not None and steps >= max_steps:
+            return "max_steps"
+        if max_tool_calls is not None:
+            if tool_calls + len(message.tool_calls) > max_tool_calls:
+                return "max_tool_calls"
+        if expires is not None and time.monotonic() >= expires:
+            return "deadline"
+        return None
+
+    @staticmethod
+    def _early_budget(
+        steps: int,
+        tool_calls: int,
+        max_steps: Optional[int],
+        max_tool_calls: Optional[int],
+        expires: Optional[float],
+    ) -> Optional[int]:
+        """
+        How many tool calls the next streamed completion may start early.
+        """
+        if max_steps is not None and steps + 1 >= max_steps:
+            return 0
+        if expires is not None and time.monotonic() >= expires:
+            return 0
+        if max_tool_calls is not None:
+            return max(0, max_tool_calls - tool_calls)
+        return None
+
+    def _dispatcher(
+        self,
+        early: Dict[Hashable, W],
+        budget: Optional[int],
+        expires: Optional[float],
+        start: Callable[[LlToolCall], W],
+    ) -> Callable[[LlToolCall], None]:
+        """
+        Start tool calls as a stream completes them, recording the work by key.
+
+        Nothing more is started once `budget` calls are or the deadline passes.
+        """
+
+        def dispatch(tool_call: LlToolCall) -> None:
+            key = self._group_key(tool_call)
+            if key in early or (budget is not None and len(early) >= budget):
+                return
+            if expires is not None and time.monotonic() >= expires:
+                return
+            early[key] = start(tool_call)
+
+        return dispatch
+
+    def _started_early(
+        self, tool_calls: List[LlToolCall], early: Dict[Hashable, Any]
+    ) -> List[LlToolCall]:
+        """
+        The tool calls whose work the stream already started.
+        """
+        return [call for call in tool_calls if self._group_key(call) in early]
+
+    def _summarize(
+        self,
+        message: LLMessage,
+        exchange: Exchange,
+        stop_reason: StopReason,
+        steps: List[StepTiming],
+        tool_calls: int,
+        started: float,
+        answered: List[LlToolCall],
+    ) -> RunSummary:
+        """
+        Answer any tool calls left unrun and record the run's summary.
+        """
+        if stop_reason != "done":
+            unrun = [
+                tool_call
+                for tool_call in message.tool_calls or []
+                if tool_call not in answered
             ]
-            for future in as_completed(futures):
-                result: ToolResponse = future.result()
-                self.exchange.append(LLMessage.from_execution(result))
-        self.run()
+            steps[-1].tool_calls = len(answered)
+            for tool_call in unrun:
+                result = self.functions.skipped(
+                    tool_call, f"the run reached its {stop_reason}"
+                )
+                exchange.append(LLMessage.from_execution(result))
+
+        self.last_summary = RunSummary(
+            message=message,
+            stop_reason=stop_reason,
+            steps=steps,
+            tool_calls=tool_calls,
+            elapsed=time.monotonic() - started,
+        )
+        return self.last_summary
+
+    @staticmethod
+    def _latest_user_text(exchange: Exchange) -> str:
+        for message in reversed(exchange):
+            if message.role == "user":
+                return message.content
+        return ""
+
+    @staticmethod
+    def _expires(deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else time.monotonic() + deadline
+
+    @staticmethod
+    def _left(expires: Optional[float]) -> Optional[float]:
+        return None if expires is None else expires - time.monotonic()
+
+    def _call_expires(
+        self, tool_call: LlToolCall, began: Optional[float], expires: Optional[float]
+    ) -> Optional[float]:
+        """
+        When a tool call runs out of time: the run deadline, or its own timeout
+        counted from when it `began` running, if it has.
+        """
+        timeout = self.functions.timeout_for(tool_call.name)
+        limits = [] if expires is None else [expires]
+        if timeout and began is not None:
+            limits.append(began + timeout)
+        return min(limits) if limits else None
+
+    def _timed_out(self, tool_call: LlToolCall, started: float) -> ToolResponse:
+        return self.functions.timed_out(tool_call, time.monotonic() - started)
+
+    @staticmethod
+    def _call_key(tool_call: LlToolCall) -> Tuple[str, str]:
+        arguments = canonical_arguments(tool_call.arguments)
+        return tool_call.name, tool_call.arguments if arguments is None else arguments
+
+    def _dedupes(self, tool_call: LlToolCall) -> bool:
+        return self.dedupe and self.functions.dedupes(tool_call.name)
+
+    def _group_key(self, tool_call: LlToolCall) -> Hashable:
+        return self._call_key(tool_call) if self._dedupes(tool_call) else tool_call.id
+
+    def _batch(self, tool_calls: List[LlToolCall]) -> List[List[LlToolCall]]:
+        """
+        Group identical calls (same tool, equivalent arguments) to run once,
+        except for tools that opted out.
+        """
+        groups: Dict[Hashable, List[LlToolCall]] = {}
+        for tool_call in tool_calls:
+            groups.setdefault(self._group_key(tool_call), []).append(tool_call)
+        return list(groups.values())
+
+    @staticmethod
+    def _fan_out(
+        group: List[LlToolCall],
+        result: ToolResponse,
+        exchange: Exchange,
+        tool_log: Callable[[LlToolCall, ToolResponse], None],
+    ) -> None:
+        """
+        Answer every call in a group with the one result.
+        """
+        for tool_call in group:
+            response = result.model_copy(update={"id": tool_call.id})
+            tool_log(tool_call, response)
+            exchange.append(LLMessage.from_execution(response))
+
+    def _submit(
+        self,
+        tool_call: LlToolCall,
+        clock: _CallClock,
+        expires: Optional[float] = None,
+    ) -> Future[ToolResponse]:
+        """
+        Run a tool call on the executor, starting its clock once it runs.
+
+        A rate or concurrency limited tool waits for its limiter before it
+        takes a worker, so waiting calls never hold threads other tools need.
+        Calls cancelled or past the deadline `expires` while waiting never run.
+        """
+        key = self._group_key(tool_call)
+        limiter = self.functions.limiter_for(tool_call.name)
+        if limiter is None:
+            future = self.executor.submit(
+                self._process_tool_call, tool_call, lambda: clock.start(key)
+            )
+            future.add_done_callback(lambda _: clock.notify())
+            return future
+
+        admitted: Future[ToolResponse] = Future()
+        admitted.add_done_callback(lambda _: clock.notify())
+
+        def begin() -> None:
+            if not admitted.set_running_or_notify_cancel():
+                raise CancelledError(f"Tool call {tool_call.id} was cancelled")
+            clock.start(key)
+
+        def settle(work: Future[ToolResponse]) -> None:
+            limiter.release()
+            if work.cancelled():
+                return
+            try:
+                error = work.exception()
+                if error is not None:
+                    admitted.set_exception(error)
+                else:
+                    admitted.set_result(work.result())
+            except InvalidStateError:
+                pass
+
+        def run() -> None:
+            if admitted.done():
+                limiter.release()
+                return
+            work = self.executor.submit(
+                self._process_tool_call, tool_call, begin, False
+            )
+            work.add_done_callback(settle)
+            admitted.add_done_callback(lambda _: admitted.cancelled() and work.cancel())
+
+        def admit() -> None:
+            if limiter.acquire(timeout=self._left(expires)):
+                run()
+
+        if limiter.acquire(timeout=0):
+            run()
+        else:
+            Thread(target=admit, daemon=True).start()
+        return admitted
+
+    def _aspawn(
+        self, tool_call: LlToolCall, clock: _CallClock
+    ) -> "asyncio.Task[ToolResponse]":
+        """
+        Asynchronous _submit(), running the tool call as a task.
+        """
+        key = self._group_key(tool_call)
+        return asyncio.ensure_future(
+            self._aprocess_tool_call(tool_call, lambda: clock.start(key))
+        )
+
+    def _handle_tool_calls(
+        self,
+        tool_calls: List[LlToolCall],
+        exchange: Exchange,
+        expires: Optional[float] = None,
+        early: Optional[Dict[Hashable, Future[ToolResponse]]] = None,
+        clock: Optional[_CallClock] = None,
+    ) -> None:
+        """
+        Run the tool calls, answering those that outlive their time limit.
+
+        Calls already started while streaming are taken from `early`. A tool's
+        timeout counts from when its call began running, not from when it was
+        queued; the run deadline applies to every call.
+
+        Timed-out calls that have not started are cancelled; running threads
+        cannot be interrupted and keep running in the background, though
+        their results are discarded.
+        """
+        tool_log = logger.tools(tool_calls)
+        started = time.monotonic()
+        clock = clock or _CallClock()
+        early = early or {}
+        pending: Dict[Future[ToolResponse], List[LlToolCall]] = {}
+        for group in self._batch(tool_calls):
+            work = early.pop(self._group_key(group[0]), None)
+            pending[work or self._submit(group[0], clock, expires)] = group
+
+        with clock.changed:
+            while pending:
+                for future in [f for f in pending if f.done()]:
+                    group = pending.pop(future)
+                    self._fan_out(group, future.result(), exchange, tool_log)
+
+                limits = {
+                    future: self._call_expires(
+                        group[0], clock.began(self._group_key(group[0])), expires
+                    )
+                    for future, group in pending.items()
+                }
+                now = time.monotonic()
+                for future, limit in limits.items():
+                    if limit is None or limit > now:
+                        continue
+                    future.cancel()
+                    group = pending.pop(future)
+                    began = clock.began(self._group_key(group[0]))
+                    result = self._timed_out(group[0], began or started)
+                    self._fan_out(group, result, exchange, tool_log)
+
+                if pending:
+                    nearest = min(
+                        (limits[f] for f in pending if limits[f] is not None),
+                        default=None,
+                    )
+                    clock.changed.wait(
+                        None if nearest is None else max(0.0, nearest - now)
+                    )
+
+    async def _ahandle_tool_calls(
+        self,
+        tool_calls: List[LlToolCall],
+        exchange: Exchange,
+        expires: Optional[float] = None,
+        early: Optional[Dict[Hashable, "asyncio.Task[ToolResponse]"]] = None,
+        clock: Optional[_CallClock] = None,
+    ) -> None:
+        tool_log = logger.tools(tool_calls)
+        started = time.monotonic()
+        call_clock = clock or _CallClock()
+        early = early or {}
+
+        async def process(
+            group: List[LlToolCall],
+        ) -> Tuple[List[LlToolCall], ToolResponse]:
+            key = self._group_key(group[0])
+            work = early.pop(key, None) or self._aspawn(group[0], call_clock)
+            while True:
+                began = call_clock.began(key)
+                waiting = (
+                    {work} if began is not None else {work, call_clock.started(key)}
+                )
+                limit = self._call_expires(group[0], began, expires)
+                done, _ = await asyncio.wait(
+                    waiting,
+                    timeout=self._left(limit),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if work in done:
+                    return group, work.result()
+                if not done:
+                    work.cancel()
+                    return group, self._timed_out(group[0], began or started)
+
+        for group, result in await asyncio.gather(
+            *map(process, self._batch(tool_calls))
+        ):
+            self._fan_out(group, result, exchange, tool_log)
 
     def _process_tool_call(
         self,
         tool_call: LlToolCall,
-        tool_log: Callable[[LlToolCall, ToolResponse], None],
+        on_start: Optional[Callable[[], None]] = None,
+        limit: bool = True,
     ) -> ToolResponse:
         """
         Process a single tool call and return the result.
+
+        `on_start` is called when the tool begins running; with `limit=False`
+        the caller already holds the tool's limiter. With a shared
+        SingleFlight, an identical call already running in another exchange
+        is waited for instead of run again, and counts as running meanwhile.
         """
-        result = self.functions.execute_function(tool_call=tool_call)
-        tool_log(tool_call, result)
-        return result
 
-    def __call__(self, text: str) -> LLMessage:
+        def execute() -> ToolResponse:
+            return self.functions.execute_function(
+                tool_call=tool_call,
+                process_pool=self._process_pool_for(tool_call),
+                on_start=on_start,
+                limit=limit,
+            )
+
+        if self.single_flight is None or not self._dedupes(tool_call):
+            return execute()
+        if on_start is not None:
+            on_start()
+        return self.single_flight.do(self._call_key(tool_call), execute)
+
+    async def _aprocess_tool_call(
+        self, tool_call: LlToolCall, on_start: Optional[Callable[[], None]] = None
+    ) -> ToolResponse:
         """
-        Send a message and get a response.
+        Asynchronous _process_tool_call().
         """
+
+        def execute() -> Awaitable[ToolResponse]:
+            return self.functions.aexecute_function(
+                tool_call,
+                self.executor,
+                self._process_pool_for(tool_call),
+                on_start=on_start,
+            )
+
+        if self.single_flight is None or not self._dedupes(tool_call):
+            return await execute()
+        if on_start is not None:
+            on_start()
+        return await self.single_flight.ado(self._call_key(tool_call), execute)
+
+    def _process_pool_for(self, tool_call: LlToolCall) -> Optional[Executor]:
+        """
+        The process pool, if the called tool runs in one; created on first use.
+        """
+        if self.functions.runs_in_process(tool_call.name):
+            return self.executor.process_pool
+        return None
+
+    def __call__(self, text: str, **kwargs: Any) -> LLMessage:
+        """
+        Send a message and get a response; keyword arguments are passed to run().
+        """
+        self.exchange.ask(text)
+        return self.run(**kwargs)
+
+    def close(self) -> None:
+        """
+        Shut down the tool executor and close the API client.
+        """
+        self.executor.shutdown()
+        self.api.close()
+
+    async def aclose(self) -> None:
+        """
+        Like close(), also closing the async API client if one was created.
+        """
+        self.close()
+        if self.aapi is not None:
+            await self.aapi.close()
+
+    def __enter__(self) -> "Llamda":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "Llamda":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
+
+    async def acall(self, text: str, **kwargs: Any) -> LLMessage:
+        """
+        Send a message and await a response; keyword arguments go to arun().
+        """
+        self.exchange.ask(text)
+        return await self.arun(**kwargs)
+
+    def stream(self, text: str, **kwargs: Any) -> Iterator[str]:
+        """
+        Send a message and iterate the assistant's text as it is generated.
+
+        The run streams on a background thread; keyword arguments go to
+        run_loop(), and its summary is in `last_summary` once iteration ends.
+        """
+        tokens: "Queue[Optional[str]]" = Queue()
+        errors: List[BaseException] = []
+
+        def run() -> None:
+            try:
+                self.run_loop(stream=True, on_token=tokens.put, **kwargs)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                tokens.put(None)
+
+        self.exchange.ask(text)
+        thread = Thread(target=run, name="llamda-stream", daemon=True)
+        thread.start()
+        while (token := tokens.get()) is not None:
+            yield token
+        thread.join()
+        if errors:
+            raise errors[0]
+
+    async def astream(self, text: str, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Asynchronous stream(), running arun_loop() as a task.
+        """
+        tokens: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+
+        async def run() -> RunSummary:
+            try:
+                return await self.arun_loop(
+                    stream=True, on_token=tokens.put_nowait, **kwargs
+                )
+            finally:
+                tokens.put_nowait(None)
+
         self.exchange.ask(text)
-        return self.run()
+        task = asyncio.ensure_future(run())
+        try:
+            while (token := await tokens.get()) is not None:
+                yield token
+        finally:
+            if not task.done():
+                task.cancel()
+        await task
 
 
-__all__: List[str] = ["Llamda"]  # Change list to List
+__all__: List[str] = ["Llamda", "RunSummary", "StepTiming"]  # Change list to List
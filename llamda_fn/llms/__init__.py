@@ -2,20 +2,49 @@
 LLM API types and functions
 """
 
-from .api_types import (
-    OaiToolParam,
-    OaiAssistantMessage,
-    OaiUserMessage,
-    OaiSystemMessage,
-    OaiToolFunction,
-    OaiToolCall,
-    OaiCompletion,
-    ToolResponse,
+from llamda_fn.utils.lazy import lazy_getattr
+
+from .api_types import ToolResponse
+
+# Everything else here depends on `openai`, which is imported on first use.
+__getattr__ = lazy_getattr(
+    __name__,
+    {
+        "LlmApiConfig": "llamda_fn.llms.api:LlmApiConfig",
+        "PoolConfig": "llamda_fn.llms.api:PoolConfig",
+        "ClientRegistry": "llamda_fn.llms.client_pool:ClientRegistry",
+        "ModelListCache": "llamda_fn.llms.model_list:ModelListCache",
+        "CompletionCache": "llamda_fn.llms.completion_cache:CompletionCache",
+        "Resilience": "llamda_fn.llms.resilience:Resilience",
+        "RetryPolicy": "llamda_fn.llms.resilience:RetryPolicy",
+        "HedgePolicy": "llamda_fn.llms.resilience:HedgePolicy",
+        "CircuitBreaker": "llamda_fn.llms.resilience:CircuitBreaker",
+        "CompletionError": "llamda_fn.llms.resilience:CompletionError",
+        "RoutingManager": "llamda_fn.llms.routing:RoutingManager",
+        "AsyncRoutingManager": "llamda_fn.llms.routing:AsyncRoutingManager",
+        "OaiToolParam": "llamda_fn.llms.api_types:OaiToolParam",
+        "OaiAssistantMessage": "llamda_fn.llms.api_types:OaiAssistantMessage",
+        "OaiUserMessage": "llamda_fn.llms.api_types:OaiUserMessage",
+        "OaiSystemMessage": "llamda_fn.llms.api_types:OaiSystemMessage",
+        "OaiToolFunction": "llamda_fn.llms.api_types:OaiToolFunction",
+        "OaiToolCall": "llamda_fn.llms.api_types:OaiToolCall",
+        "OaiCompletion": "llamda_fn.llms.api_types:OaiCompletion",
+    },
 )
-from .api import LlmApiConfig
 
 __all__: list[str] = [
     "LlmApiConfig",
+    "PoolConfig",
+    "ClientRegistry",
+    "ModelListCache",
+    "CompletionCache",
+    "Resilience",
+    "RetryPolicy",
+    "HedgePolicy",
+    "CircuitBreaker",
+    "CompletionError",
+    "RoutingManager",
+    "AsyncRoutingManager",
     "OaiToolParam",
     "OaiAssistantMessage",
     "OaiUserMessage",
@@ -1,13 +1,38 @@
 """Module to handle the LLM APIs."""
 
 from os import environ
-from typing import Any, Optional
-import dotenv
+from typing import TYPE_CHECKING, Any, Optional
 
-from pydantic import BaseModel, Field, field_validator
-from openai import OpenAI
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
-dotenv.load_dotenv()
+if TYPE_CHECKING:
+    import httpx
+    from openai import OpenAI
+
+_env_loaded = False
+
+
+def load_env() -> None:
+    """
+    Load variables from a .env file, once, the first time they are needed.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    try:
+        import dotenv
+    except ImportError:
+        return
+    dotenv.load_dotenv()
+
+
+def default_api_key() -> Optional[str]:
+    """
+    Read the OpenAI API key from the environment (or .env file).
+    """
+    load_env()
+    return environ.get("OPENAI_API_KEY")
 
 
 class LlmApiConfig(BaseModel):
@@ -19,7 +44,7 @@ class LlmApiConfig(BaseModel):
     api_key: Optional[str] = Field(
         exclude=True,
         alias="api_key",
-        default=environ.get("OPENAI_API_KEY"),
+        default_factory=default_api_key,
     )
     organization: Optional[str] = None
     timeout: Optional[float] = None
@@ -38,14 +63,63 @@ class LlmApiConfig(BaseModel):
             raise ValueError("API key is required when base_url is not provided")
         return v
 
-    def create_openai_client(self) -> OpenAI:
+    def create_openai_client(self) -> "OpenAI":
         """
         Create and return an OpenAI client with the configured settings.
         """
+        from openai import OpenAI
+
         config = {k: v for k, v in self.model_dump().items() if v is not None}
         return OpenAI(**config)
 
 
+class PoolConfig(BaseModel):
+    """
+    Connection pool settings for the HTTP client behind an LLM manager.
+
+    Every request made through one manager shares its pool, so a single
+    AsyncLLManager can serve many concurrent exchanges over a bounded number
+    of connections. `http2` needs the `h2` package (`httpx[http2]`).
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    max_connections: Optional[int] = 100
+    max_keepalive_connections: Optional[int] = 20
+    keepalive_expiry: Optional[float] = 5.0
+    http2: bool = False
+
+    def limits(self) -> "httpx.Limits":
+        """
+        The httpx pool limits for these settings.
+        """
+        import httpx
+
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def client(self, **kwargs: Any) -> "httpx.Client":
+        """
+        Create a pooled client for the synchronous OpenAI client.
+        """
+        from openai import DefaultHttpxClient
+
+        return DefaultHttpxClient(limits=self.limits(), http2=self.http2, **kwargs)
+
+    def async_client(self, **kwargs: Any) -> "httpx.AsyncClient":
+        """
+        Create a pooled client for AsyncOpenAI.
+        """
+        from openai import DefaultAsyncHttpxClient
+
+        return DefaultAsyncHttpxClient(limits=self.limits(), http2=self.http2, **kwargs)
+
+
 __all__: list[str] = [
     "LlmApiConfig",
+    "PoolConfig",
+    "load_env",
 ]
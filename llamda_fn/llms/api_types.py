@@ -1,18 +1,42 @@
 from ast import Dict
 import uuid
 from functools import cached_property
-from typing import Any, Literal, Self, List
-
-from openai.types.chat import ChatCompletion as OaiCompletion
-from openai.types.chat import ChatCompletionToolParam as OaiToolParam
-from openai.types.chat import ChatCompletionMessageParam as OaiRequestMessage
-from openai.types.chat import ChatCompletionAssistantMessageParam as OaiAssistantMessage
-from openai.types.chat import ChatCompletionUserMessageParam as OaiUserMessage
-from openai.types.chat import ChatCompletionSystemMessageParam as OaiSystemMessage
-from openai.types.chat import ChatCompletionMessageToolCall as OaiToolCall
-from openai.types.chat import ChatCompletionFunctionCallOptionParam as OaiToolFunction
+from typing import TYPE_CHECKING, Any, Literal, Self, List
+
 from pydantic import BaseModel, Field
 
+from llamda_fn.utils.lazy import lazy_getattr
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletion as OaiCompletion
+    from openai.types.chat import ChatCompletionToolParam as OaiToolParam
+    from openai.types.chat import ChatCompletionMessageParam as OaiRequestMessage
+    from openai.types.chat import (  # noqa: F401 - re-exported by __getattr__
+        ChatCompletionAssistantMessageParam as OaiAssistantMessage,
+        ChatCompletionUserMessageParam as OaiUserMessage,
+        ChatCompletionSystemMessageParam as OaiSystemMessage,
+    )
+    from openai.types.chat import ChatCompletionMessageToolCall as OaiToolCall
+    from openai.types.chat import (
+        ChatCompletionFunctionCallOptionParam as OaiToolFunction,
+    )
+
+# The OpenAI types are only needed for annotations; importing `openai` is
+# slow, so they are resolved on first attribute access.
+__getattr__ = lazy_getattr(
+    __name__,
+    {
+        "OaiCompletion": "openai.types.chat:ChatCompletion",
+        "OaiToolParam": "openai.types.chat:ChatCompletionToolParam",
+        "OaiRequestMessage": "openai.types.chat:ChatCompletionMessageParam",
+        "OaiAssistantMessage": "openai.types.chat:ChatCompletionAssistantMessageParam",
+        "OaiUserMessage": "openai.types.chat:ChatCompletionUserMessageParam",
+        "OaiSystemMessage": "openai.types.chat:ChatCompletionSystemMessageParam",
+        "OaiToolCall": "openai.types.chat:ChatCompletionMessageToolCall",
+        "OaiToolFunction": "openai.types.chat:ChatCompletionFunctionCallOptionParam",
+    },
+)
+
 Role = Literal["user", "system", "assistant", "tool"]
 
 
@@ -26,7 +50,7 @@ class LlToolCall(BaseModel):
     arguments: str
 
     @classmethod
-    def from_oai_tool_call(cls, call: OaiToolCall) -> Self:
+    def from_oai_tool_call(cls, call: "OaiToolCall") -> Self:
         """Gets data from the Openai Tool Call"""
         return cls(
             id=call.id,
@@ -57,7 +81,7 @@ def make_oai_role_message(
     name: str | None = None,
     tool_calls: List[LlToolCall] | None = None,
     **kwargs: Any,
-) -> OaiRequestMessage:
+) -> "OaiRequestMessage":
     message = {
         "role": role,
         "content": content,
@@ -67,18 +91,13 @@ def make_oai_role_message(
     return message
 
 
-OaiRoleMessage: dict[
-    Role, type[OaiUserMessage] | type[OaiSystemMessage] | type[OaiAssistantMessage]
-] = {
-    "user": OaiUserMessage,
-    "system": OaiSystemMessage,
-    "assistant": OaiAssistantMessage,
-}
+CacheStatus = Literal["hit", "miss"]
 
 
 class LLMessageMeta(BaseModel):
     choice: dict[str, Any] | None = Field(exclude=True)
     completion: dict[str, Any] | None = Field(exclude=True)
+    cache: CacheStatus | None = Field(default=None, exclude=True)
 
 
 class LLMessage(BaseModel):
@@ -115,7 +134,7 @@ class LLCompletion(BaseModel):
     meta: LLMessageMeta | None = None
 
     @classmethod
-    def from_completion(cls, completion: OaiCompletion) -> Self:
+    def from_completion(cls, completion: "OaiCompletion") -> Self:
         choice = completion.choices[0]
         message = choice.message
         tool_calls = None
@@ -138,11 +157,6 @@ class LLCompletion(BaseModel):
         )
 
 
-class OaiRequest(BaseModel):
-    messages: list[OaiRequestMessage]
-    tools: list[OaiToolParam]
-
-
 __all__ = [
     "LLMessage",
     "LLCompletion",
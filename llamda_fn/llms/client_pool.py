@@ -0,0 +1,217 @@
+"""
+A process-wide registry of pooled HTTP clients shared by LLM managers.
+"""
+
+import asyncio
+import hashlib
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+from weakref import WeakKeyDictionary, WeakValueDictionary
+
+from pydantic import BaseModel
+
+from .api import LlmApiConfig, PoolConfig
+
+if TYPE_CHECKING:
+    import httpx
+
+ClientKey = Tuple[Optional[str], str, Optional[str], Optional[float], PoolConfig]
+
+_CONNECT_EVENTS = (
+    "connection.connect_tcp.complete",
+    "connection.connect_unix_socket.complete",
+)
+
+
+class ClientStats(BaseModel):
+    """
+    Snapshot of one shared client: who holds it and how often it reused a connection.
+    """
+
+    base_url: Optional[str] = None
+    asynchronous: bool = False
+    users: int = 0
+    leases: int = 0
+    requests: int = 0
+    connections: int = 0
+    reused: int = 0
+
+
+class _SharedClient:
+    """
+    A pooled client with its lease and connection counters.
+    """
+
+    def __init__(self, key: ClientKey, asynchronous: bool) -> None:
+        self.key = key
+        self.asynchronous = asynchronous
+        self.users = 0
+        self.leases = 0
+        self.requests = 0
+        self.connections = 0
+        self._lock = Lock()
+        pool = key[-1]
+        if asynchronous:
+            self.client: Any = pool.async_client(
+                event_hooks={"request": [self._aon_request]}
+            )
+        else:
+            self.client = pool.client(event_hooks={"request": [self._on_request]})
+
+    def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name in _CONNECT_EVENTS:
+            with self._lock:
+                self.connections += 1
+
+    async def _atrace(self, event_name: str, info: Dict[str, Any]) -> None:
+        self._trace(event_name, info)
+
+    def _on_request(self, request: "httpx.Request") -> None:
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _aon_request(self, request: "httpx.Request") -> None:
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._atrace
+
+    def stats(self) -> ClientStats:
+        with self._lock:
+            return ClientStats(
+                base_url=self.key[0],
+                asynchronous=self.asynchronous,
+                users=self.users,
+                leases=self.leases,
+                requests=self.requests,
+                connections=self.connections,
+                reused=max(0, self.requests - self.connections),
+            )
+
+
+class ClientRegistry:
+    """
+    Hands out one pooled HTTP client per endpoint, so managers share connections.
+
+    Clients are keyed by base URL, credentials, organization, timeout and
+    pool settings. They stay open, keeping their idle connections, after
+    every manager using them is closed, until the registry is closed.
+    Asynchronous clients are also kept per event loop, since their
+    connections cannot move between loops; async managers lease one on
+    first use in each loop.
+    """
+
+    def __init__(self, pool: Optional[PoolConfig] = None) -> None:
+        self.pool = pool if pool is not None else PoolConfig()
+        self._lock = Lock()
+        self._clients: Dict[ClientKey, _SharedClient] = {}
+        self._async_clients: WeakKeyDictionary[
+            asyncio.AbstractEventLoop, Dict[ClientKey, _SharedClient]
+        ] = WeakKeyDictionary()
+        self._leased: WeakValueDictionary[int, _SharedClient] = WeakValueDictionary()
+
+    def key(self, config: LlmApiConfig, pool: Optional[PoolConfig] = None) -> ClientKey:
+        """
+        The registry key for an API configuration; credentials are only hashed.
+        """
+        credentials = hashlib.sha256((config.api_key or "").encode()).hexdigest()
+        return (
+            config.base_url,
+            credentials[:16],
+            config.organization,
+            config.timeout,
+            pool if pool is not None else self.pool,
+        )
+
+    def _lease(
+        self,
+        clients: Dict[ClientKey, _SharedClient],
+        key: ClientKey,
+        asynchronous: bool,
+    ) -> Any:
+        with self._lock:
+            shared = clients.get(key)
+            if shared is None:
+                shared = clients[key] = _SharedClient(key, asynchronous)
+            shared.users += 1
+            shared.leases += 1
+            self._leased[id(shared.client)] = shared
+            return shared.client
+
+    def client(
+        self, config: LlmApiConfig, pool: Optional[PoolConfig] = None
+    ) -> "httpx.Client":
+        """
+        Lease the shared client for `config`; give it back with release().
+        """
+        return self._lease(self._clients, self.key(config, pool), False)
+
+    def async_client(
+        self, config: LlmApiConfig, pool: Optional[PoolConfig] = None
+    ) -> "httpx.AsyncClient":
+        """
+        Lease the shared asynchronous client for `config` on the running loop.
+
+        Must be called from the loop the client will be used on.
+        """
+        loop = asyncio.get_running_loop()
+        clients = self._async_clients.setdefault(loop, {})
+        return self._lease(clients, self.key(config, pool), True)
+
+    def release(self, client: Union["httpx.Client", "httpx.AsyncClient"]) -> None:
+        """
+        Return a leased client; it stays open for the next manager.
+        """
+        with self._lock:
+            shared = self._leased.get(id(client))
+            if shared is not None and shared.users > 0:
+                shared.users -= 1
+
+    def _all(self) -> List[_SharedClient]:
+        with self._lock:
+            shared = list(self._clients.values())
+            for clients in self._async_clients.values():
+                shared.extend(clients.values())
+            return shared
+
+    def stats(self) -> List[ClientStats]:
+        """
+        Return the lease and connection-reuse counters of every client.
+        """
+        return [shared.stats() for shared in self._all()]
+
+    def close(self) -> None:
+        """
+        Close every synchronous client and forget all of them.
+
+        Asynchronous clients are dropped; close them with aclose() from their loop.
+        """
+        for shared in self._all():
+            if not shared.asynchronous:
+                shared.client.close()
+        with self._lock:
+            self._clients.clear()
+            self._async_clients.clear()
+            self._leased.clear()
+
+    async def aclose(self) -> None:
+        """
+        Close the asynchronous clients of the running loop, and forget them.
+        """
+        with self._lock:
+            clients = self._async_clients.pop(asyncio.get_running_loop(), {})
+            for shared in clients.values():
+                self._leased.pop(id(shared.client), None)
+        for shared in clients.values():
+            await shared.client.aclose()
+
+
+# Used by every manager created with `shared_client=True`.
+shared_clients = ClientRegistry()
+
+
+__all__: list[str] = [
+    "ClientRegistry",
+    "ClientStats",
+    "shared_clients",
+]
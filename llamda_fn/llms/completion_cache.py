@@ -0,0 +1,151 @@
+"""
+Content-addressed caching of chat completions for repeated, identical requests.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from llamda_fn.utils.cache import CacheInfo, LRUCache, SQLiteCache
+from llamda_fn.utils.concurrency import SingleFlight
+
+DEFAULT_COMPLETION_CACHE_SIZE = 256
+
+CompletionCacheOption = Union[bool, int, "CompletionCache", None]
+
+
+def _encode(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """
+    A stable hash of a completion request: messages, tools, model and options.
+
+    Key order and whitespace do not matter; any other difference does.
+    """
+    payload = json.dumps(
+        request, sort_keys=True, separators=(",", ":"), default=_encode
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CompletionCache:
+    """
+    Raw completions by request hash, in an in-memory LRU and optionally on disk.
+
+    With a `path` they are also kept in a SQLite file, shared by processes
+    and later runs. Identical requests made at the same time share one API
+    call. Use it only where replaying an earlier answer is acceptable, such
+    as evaluation runs or deterministic (temperature 0) prompts.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = DEFAULT_COMPLETION_CACHE_SIZE,
+        ttl: Optional[float] = None,
+        path: Union[str, Path, None] = None,
+    ) -> None:
+        self._memory: LRUCache[str, str] = LRUCache(maxsize, ttl)
+        self._disk = SQLiteCache(path, ttl=ttl) if path is not None else None
+        self._flight: SingleFlight[str, str] = SingleFlight()
+
+    @classmethod
+    def from_option(cls, option: CompletionCacheOption) -> Optional["CompletionCache"]:
+        """
+        Build the cache for a manager's `completion_cache` option.
+
+        True gives an in-memory cache of the default size and an int one of
+        that size; a CompletionCache is used, and can be shared, as is.
+        """
+        if option is None or option is False:
+            return None
+        if option is True:
+            return cls()
+        if isinstance(option, int):
+            return cls(option)
+        return option
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached completion JSON for `key`, or None on a miss.
+        """
+        value = self._memory.get(key)
+        if value is not None or self._disk is None:
+            return value
+        value = self._disk.get(key)
+        if value is not None:
+            self._memory.put(key, value)
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        """
+        Store a completion's JSON.
+        """
+        self._memory.put(key, value)
+        if self._disk is not None:
+            self._disk.put(key, value)
+
+    def fetch(self, key: str, request: Callable[[], str]) -> Tuple[str, bool]:
+        """
+        Return the completion for `key` and whether it came from the cache,
+        calling `request` only if it is neither cached nor in flight.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value, True
+        called = False
+
+        def fill() -> str:
+            nonlocal called
+            called = True
+            result = request()
+            self.put(key, result)
+            return result
+
+        return self._flight.do(key, fill), not called
+
+    async def afetch(
+        self, key: str, request: Callable[[], Awaitable[str]]
+    ) -> Tuple[str, bool]:
+        """
+        Asynchronous fetch().
+        """
+        value = self.get(key)
+        if value is not None:
+            return value, True
+        called = False
+
+        async def fill() -> str:
+            nonlocal called
+            called = True
+            result = await request()
+            self.put(key, result)
+            return result
+
+        return await self._flight.ado(key, fill), not called
+
+    def clear(self) -> None:
+        """
+        Drop every cached completion and reset the counters.
+        """
+        self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def info(self) -> CacheInfo:
+        """
+        Counters of the in-memory cache.
+        """
+        return self._memory.info()
+
+
+__all__: list[str] = [
+    "CompletionCache",
+    "CompletionCacheOption",
+    "DEFAULT_COMPLETION_CACHE_SIZE",
+    "request_key",
+]
@@ -1,4 +1,4 @@
-from llamda_fn.llms.api_types import LLMessage, Role
+from llamda_fn.llms.api_types import LLMessage
 from llamda_fn.utils.logger import logger
 
 from collections import UserList
@@ -17,7 +17,7 @@ class Exchange(UserList[LLMessage]):
     ) -> None:
         super().__init__()
         if system:
-            self.append(LLMessage(content=system, role=Role["system"]))
+            self.append(LLMessage(content=system, role="system"))
         if messages:
             for message in messages:
                 if not message.role:
@@ -1,14 +1,102 @@
-from typing import Any, Self
-from pydantic import Field, model_validator
-from openai import OpenAI
+import asyncio
+from contextlib import nullcontext
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Set,
+    TypeVar,
+    Union,
+)
+from pydantic import Field
+from openai import AsyncOpenAI, OpenAI
 from openai.types.chat import ChatCompletion
 
 from llamda_fn.llms.exchange import Exchange
-from .api_types import LLCompletion
-from .api import LlmApiConfig
+from .api_types import CacheStatus, LLCompletion, LLMessage
+from .api import LlmApiConfig, PoolConfig, load_env
+from .client_pool import ClientRegistry, shared_clients
+from .completion_cache import CompletionCache, CompletionCacheOption, request_key
+from .resilience import CompletionError, Resilience, resilience_for
+from .model_list import ModelIds, ModelListCache, check_model, model_list_cache
+from .streaming import AsyncCompletionStream, CompletionStream, ToolCallHandler
 from llamda_fn.utils.logger import logger
 
 
+def to_oai_messages(messages: Iterable[LLMessage]) -> list[dict[str, Any]]:
+    """Convert exchange messages into the OpenAI request format."""
+    oai_messages = []
+    for message in messages:
+        oai_message = message.get_oai_message()
+        oai_messages.append(
+            {
+                "role": oai_message["role"],
+                "content": oai_message["content"],
+            }
+        )
+        if oai_message.get("name"):
+            oai_messages[-1]["name"] = oai_message["name"]
+        if message.role == "tool":
+            oai_messages[-1]["tool_call_id"] = message.id
+        if message.tool_calls:
+            oai_messages[-1]["tool_calls"] = [
+                {
+                    "id": tool_call.id,
+                    "type": "function",
+                    "function": {
+                        "name": tool_call.name,
+                        "arguments": tool_call.arguments,
+                    },
+                }
+                for tool_call in message.tool_calls
+            ]
+    return oai_messages
+
+
+T = TypeVar("T")
+
+
+def client_registry(
+    shared_client: Union[bool, ClientRegistry],
+) -> Optional[ClientRegistry]:
+    """The registry a manager leases its HTTP client from, if any."""
+    if isinstance(shared_client, ClientRegistry):
+        return shared_client
+    return shared_clients if shared_client else None
+
+
+def client_config(kwargs: dict[str, Any]) -> LlmApiConfig:
+    """The parts of the client arguments that pick a shared HTTP client."""
+    config = {
+        name: kwargs[name]
+        for name in ("base_url", "api_key", "organization")
+        if kwargs.get(name) is not None
+    }
+    if "base_url" in config:
+        config["base_url"] = str(config["base_url"])
+    if isinstance(kwargs.get("timeout"), (int, float)):
+        config["timeout"] = kwargs["timeout"]
+    return LlmApiConfig(**config)
+
+
+def cached_completion(raw: str, status: CacheStatus) -> LLCompletion:
+    """Rebuild a completion from its cached JSON, recording the cache status."""
+    completion = LLCompletion.from_completion(ChatCompletion.model_validate_json(raw))
+    assert completion.message.meta is not None
+    completion.message.meta.cache = status
+    return completion
+
+
+def completion_kwargs(kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Drop request options the API rejects when empty."""
+    if not kwargs.get("tools"):
+        kwargs.pop("tools", None)
+    return kwargs
+
+
 class LLManager(OpenAI):
     api_config: dict[str, Any] = Field(default_factory=dict)
     llm_name: str = Field(default="gpt-4-0613")
@@ -16,63 +104,293 @@ class LLManager(OpenAI):
     def __init__(
         self,
         llm_name: str = "gpt-4-0613",
+        pool: PoolConfig | None = None,
+        validate_llm: bool = False,
+        model_cache: ModelListCache | None = None,
+        shared_client: Union[bool, ClientRegistry] = False,
+        resilience: Union[bool, Resilience] = False,
+        completion_cache: CompletionCacheOption = None,
         **kwargs: Any,
     ):
+        """
+        Construction makes no requests. With `validate_llm`, the model is
+        checked against the API's model list before its first completion;
+        the list comes from `model_cache`, shared by all managers by default.
+
+        With `shared_client`, the HTTP client and its connections are leased
+        from a ClientRegistry (the process-wide one for True) and given back,
+        still open, by close().
+
+        With `resilience`, requests are retried, hedged and circuit-broken by
+        a Resilience (a shared default one for True), which replaces the
+        OpenAI client's own retries unless `max_retries` is given.
+
+        With `completion_cache`, identical non-streamed requests are answered
+        from a CompletionCache; see CompletionCache.from_option().
+        """
         self.llm_name = llm_name
+        self.validate_llm = validate_llm
+        self.model_cache = model_cache if model_cache is not None else model_list_cache
+        self._validated: Set[str] = set()
+        load_env()
+        self.client_registry = client_registry(shared_client)
+        self.resilience = resilience_for(resilience)
+        self.completion_cache = CompletionCache.from_option(completion_cache)
+        if self.resilience is not None:
+            kwargs.setdefault("max_retries", 0)
+        self._leased: Any = None
+        if self.client_registry is not None and kwargs.get("http_client") is None:
+            self._leased = self.client_registry.client(client_config(kwargs), pool)
+            kwargs["http_client"] = self._leased
+        elif pool is not None and kwargs.get("http_client") is None:
+            kwargs["http_client"] = pool.client()
         super().__init__(**kwargs)
 
+    def close(self) -> None:
+        """Close the HTTP client, or give a shared one back to its registry."""
+        if self._leased is None:
+            super().close()
+        elif self.client_registry is not None:
+            self.client_registry.release(self._leased)
+            self.client_registry = None
+
     class Config:
         arbitrary_types_allowed = True
 
+    def available_models(self, refresh: bool = False) -> ModelIds:
+        """Ids of the models the API serves, listed at most once per cache TTL."""
+        key = ModelListCache.key(self.base_url, self.api_key)
+        if refresh:
+            self.model_cache.invalidate(key)
+        return self.model_cache.models(
+            key, lambda: [model.id for model in self.models.list()]
+        )
+
+    def validate_llm_name(self, llm_name: Optional[str] = None) -> None:
+        """Raise a ValueError if the API does not serve the model."""
+        name = llm_name or self.llm_name
+        if name not in self._validated:
+            check_model(name, self.available_models())
+            self._validated.add(name)
+
+    def _call(self, request: Callable[[], T], hedge: bool = True) -> T:
+        if self.resilience is None:
+            return request()
+        return self.resilience.call(str(self.base_url), request, hedge)
+
     def chat_completion(
         self, messages: Exchange, llm_name: str, **kwargs: Any
     ) -> LLCompletion:
-        oai_messages = []
-        for message in messages:
-            oai_message = message.get_oai_message()
-            oai_messages.append(
-                {
-                    "role": oai_message["role"],
-                    "content": oai_message["content"],
-                }
+        if self.validate_llm:
+            self.validate_llm_name(llm_name)
+        request = dict(
+            messages=to_oai_messages(messages),
+            model=llm_name or self.llm_name,
+            **completion_kwargs(kwargs),
+        )
+
+        def create() -> ChatCompletion:
+            return self._call(lambda: self.chat.completions.create(**request))
+
+        try:
+            if self.completion_cache is None:
+                return LLCompletion.from_completion(create())
+            raw, hit = self.completion_cache.fetch(
+                request_key(request), lambda: create().model_dump_json()
             )
-            if oai_message.get("name"):
-                oai_messages[-1]["name"] = oai_message["name"]
-            if oai_message.get("tool_calls"):
-                oai_messages[-1]["tool_calls"] = oai_message["tool_calls"]
+            return cached_completion(raw, "hit" if hit else "miss")
+        except Exception as e:
+            raise CompletionError(
+                f"Error in chat completion: {str(e)}", messages
+            ) from e
 
+    def stream_completion(
+        self,
+        messages: Exchange,
+        llm_name: str,
+        on_tool_call: Optional[ToolCallHandler] = None,
+        **kwargs: Any,
+    ) -> CompletionStream:
+        """Start a streamed completion; tool calls go to `on_tool_call` as they complete."""
+        if self.validate_llm:
+            self.validate_llm_name(llm_name)
+        request = dict(
+            messages=to_oai_messages(messages),
+            model=llm_name or self.llm_name,
+            stream=True,
+            **completion_kwargs(kwargs),
+        )
         try:
-            print(messages)
-            oai_completion: ChatCompletion = self.chat.completions.create(
-                messages=oai_messages,
-                model=llm_name or self.llm_name,
-                **kwargs,
+            chunks = self._call(
+                lambda: self.chat.completions.create(**request), hedge=False
             )
-            return LLCompletion.from_completion(oai_completion)
         except Exception as e:
-            raise Exception(f"Error in chat completion: {str(e)}", messages) from e
-
-    @model_validator(mode="after")
-    def validate_api_and_llm(self, data: Any) -> Any:
-        """Validate the API and model."""
-        api_config = data.get("api_config") or {}
-        api = (
-            data.get("api")
-            if isinstance(data.get("api"), OpenAI)
-            else LlmApiConfig(**api_config).create_openai_client()
+            raise CompletionError(
+                f"Error in chat completion: {str(e)}", messages
+            ) from e
+        return CompletionStream(chunks, on_tool_call)
+
+
+class AsyncLLManager(AsyncOpenAI):
+    """Asynchronous counterpart of LLManager, built on AsyncOpenAI.
+
+    All requests share one connection pool, tunable with `pool`, so a single
+    manager can drive many concurrent exchanges without a thread for each.
+    With a pool limited to `max_connections`, completions beyond it wait on a
+    semaphore rather than in httpcore's queue, which is rescanned on every
+    event; a stream holds its slot until it is read to the end or closed.
+    """
+
+    def __init__(
+        self,
+        llm_name: str = "gpt-4-0613",
+        pool: PoolConfig | None = None,
+        validate_llm: bool = False,
+        model_cache: ModelListCache | None = None,
+        shared_client: Union[bool, ClientRegistry] = False,
+        resilience: Union[bool, Resilience] = False,
+        completion_cache: CompletionCacheOption = None,
+        **kwargs: Any,
+    ):
+        self.llm_name = llm_name
+        self.validate_llm = validate_llm
+        self.model_cache = model_cache if model_cache is not None else model_list_cache
+        self._validated: Set[str] = set()
+        load_env()
+        self.client_registry = client_registry(shared_client)
+        self.resilience = resilience_for(resilience)
+        self.completion_cache = CompletionCache.from_option(completion_cache)
+        if self.resilience is not None:
+            kwargs.setdefault("max_retries", 0)
+        self._lease: Optional[tuple[LlmApiConfig, PoolConfig | None]] = None
+        self._loop_clients: Dict[asyncio.AbstractEventLoop, Any] = {}
+        if self.client_registry is not None and kwargs.get("http_client") is None:
+            self._lease = (client_config(kwargs), pool)
+        elif pool is not None and kwargs.get("http_client") is None:
+            kwargs["http_client"] = pool.async_client()
+        self._slots = (
+            asyncio.Semaphore(pool.max_connections)
+            if pool is not None and pool.max_connections is not None
+            else None
+        )
+        super().__init__(**kwargs)
+
+    @property
+    def _client(self) -> Any:
+        """
+        The HTTP client for the running loop.
+
+        A shared client is leased the first time the manager is used on each
+        loop, since async connections cannot move between loops.
+        """
+        if self._lease is not None and self.client_registry is not None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return self._own_client
+            client = self._loop_clients.get(loop)
+            if client is None:
+                client = self._loop_clients[loop] = self.client_registry.async_client(
+                    *self._lease
+                )
+            return client
+        return self._own_client
+
+    @_client.setter
+    def _client(self, client: Any) -> None:
+        self._own_client = client
+
+    async def close(self) -> None:
+        """Close the HTTP client, or give shared ones back to their registry."""
+        if self._lease is None:
+            await super().close()
+            return
+        self._lease = None
+        await self._own_client.aclose()
+        if self.client_registry is not None:
+            for client in self._loop_clients.values():
+                self.client_registry.release(client)
+            self.client_registry = None
+        self._loop_clients.clear()
+
+    async def available_models(self, refresh: bool = False) -> ModelIds:
+        """Ids of the models the API serves, listed at most once per cache TTL."""
+        key = ModelListCache.key(self.base_url, self.api_key)
+        if refresh:
+            self.model_cache.invalidate(key)
+
+        async def fetch() -> list[str]:
+            return [model.id async for model in self.models.list()]
+
+        return await self.model_cache.amodels(key, fetch)
+
+    async def validate_llm_name(self, llm_name: Optional[str] = None) -> None:
+        """Raise a ValueError if the API does not serve the model."""
+        name = llm_name or self.llm_name
+        if name not in self._validated:
+            check_model(name, await self.available_models())
+            self._validated.add(name)
+
+    async def _call(self, request: Callable[[], Awaitable[T]], hedge: bool = True) -> T:
+        if self.resilience is None:
+            return await request()
+        return await self.resilience.acall(str(self.base_url), request, hedge)
+
+    async def chat_completion(
+        self, messages: Exchange, llm_name: str, **kwargs: Any
+    ) -> LLCompletion:
+        if self.validate_llm:
+            await self.validate_llm_name(llm_name)
+        request = dict(
+            messages=to_oai_messages(messages),
+            model=llm_name or self.llm_name,
+            **completion_kwargs(kwargs),
         )
-        if not api or not isinstance(api, OpenAI):
-            raise ValueError("Unable to create OpenAI client.")
 
-        data.update({"api": api})
+        async def create() -> ChatCompletion:
+            async with self._slots or nullcontext():
+                return await self.chat.completions.create(**request)
 
-        if not data.get("llm_name"):
-            raise ValueError("No LLM API client or LLM name provided.")
+        async def encoded() -> str:
+            return (await self._call(create)).model_dump_json()
 
-        available_models: list[str] = [model.id for model in api.models.list()]
-        if data.get("llm_name") not in available_models:
-            raise ValueError(
-                f"Model '{data.get('llm_name')}' is not available. "
-                f"Available models: {', '.join(available_models)}"
+        try:
+            if self.completion_cache is None:
+                return LLCompletion.from_completion(await self._call(create))
+            raw, hit = await self.completion_cache.afetch(request_key(request), encoded)
+            return cached_completion(raw, "hit" if hit else "miss")
+        except Exception as e:
+            raise CompletionError(
+                f"Error in chat completion: {str(e)}", messages
+            ) from e
+
+    async def stream_completion(
+        self,
+        messages: Exchange,
+        llm_name: str,
+        on_tool_call: Optional[ToolCallHandler] = None,
+        **kwargs: Any,
+    ) -> AsyncCompletionStream:
+        """Start a streamed completion; tool calls go to `on_tool_call` as they complete."""
+        if self.validate_llm:
+            await self.validate_llm_name(llm_name)
+        request = dict(
+            messages=to_oai_messages(messages),
+            model=llm_name or self.llm_name,
+            stream=True,
+            **completion_kwargs(kwargs),
+        )
+        if self._slots is not None:
+            await self._slots.acquire()
+        release = self._slots.release if self._slots is not None else None
+        try:
+            chunks = await self._call(
+                lambda: self.chat.completions.create(**request), hedge=False
             )
-        return data
+        except Exception as e:
+            if release is not None:
+                release()
+            raise CompletionError(
+                f"Error in chat completion: {str(e)}", messages
+            ) from e
+        return AsyncCompletionStream(chunks, on_tool_call, release)
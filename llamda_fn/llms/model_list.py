@@ -0,0 +1,143 @@
+"""
+A TTL'd cache of the models each API endpoint serves, shared by LLM managers.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Optional, Tuple, Union
+
+from llamda_fn.utils.cache import CacheInfo, LRUCache, SQLiteCache
+from llamda_fn.utils.concurrency import SingleFlight
+
+DEFAULT_MODEL_LIST_TTL = 3600.0
+
+ModelIds = Tuple[str, ...]
+
+
+class ModelListCache:
+    """
+    Model ids per endpoint, kept in memory for `ttl` seconds.
+
+    With a `path` the lists are also kept in a SQLite file, so other
+    processes and restarts skip the request too. Concurrent lookups of a
+    missing list share one fetch.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = DEFAULT_MODEL_LIST_TTL,
+        path: Union[str, Path, None] = None,
+    ) -> None:
+        self.ttl = ttl
+        self._memory: LRUCache[str, ModelIds] = LRUCache(None, ttl)
+        self._file = SQLiteCache(path, ttl=ttl) if path is not None else None
+        self._flight: SingleFlight[str, ModelIds] = SingleFlight()
+
+    @staticmethod
+    def key(base_url: object, api_key: Optional[str]) -> str:
+        """
+        The cache key for an endpoint; the API key is stored only as a hash.
+        """
+        credentials = hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+        return f"{base_url}\x00{credentials}"
+
+    def get(self, key: str) -> Optional[ModelIds]:
+        """
+        Return the cached model ids for `key`, or None if they must be fetched.
+        """
+        models = self._memory.get(key)
+        if models is not None or self._file is None:
+            return models
+        stored = self._file.get(key)
+        if stored is None:
+            return None
+        models = tuple(json.loads(stored))
+        self._memory.put(key, models)
+        return models
+
+    def put(self, key: str, models: Iterable[str]) -> ModelIds:
+        """
+        Store the model ids served at `key`.
+        """
+        ids = tuple(models)
+        self._memory.put(key, ids)
+        if self._file is not None:
+            self._file.put(key, json.dumps(ids))
+        return ids
+
+    def models(self, key: str, fetch: Callable[[], Iterable[str]]) -> ModelIds:
+        """
+        Return the model ids for `key`, calling `fetch` only on a miss.
+        """
+        models = self.get(key)
+        if models is not None:
+            return models
+
+        def load() -> ModelIds:
+            models = self.get(key)
+            return self.put(key, fetch()) if models is None else models
+
+        return self._flight.do(key, load)
+
+    async def amodels(
+        self, key: str, fetch: Callable[[], Awaitable[Iterable[str]]]
+    ) -> ModelIds:
+        """
+        Asynchronous models() for an awaitable `fetch`.
+        """
+        models = self.get(key)
+        if models is not None:
+            return models
+
+        async def load() -> ModelIds:
+            models = self.get(key)
+            return self.put(key, await fetch()) if models is None else models
+
+        return await self._flight.ado(key, load)
+
+    def invalidate(self, key: str) -> None:
+        """
+        Forget the model ids for `key`, so the next lookup fetches them again.
+        """
+        self._memory.pop(key)
+        if self._file is not None:
+            self._file.pop(key)
+
+    def clear(self) -> None:
+        """
+        Forget every endpoint's models and reset the counters.
+        """
+        self._memory.clear()
+        if self._file is not None:
+            self._file.clear()
+
+    def info(self) -> CacheInfo:
+        """
+        Counters of the in-memory cache.
+        """
+        return self._memory.info()
+
+
+# Shared by every LLM manager not given its own cache.
+model_list_cache = ModelListCache()
+
+
+def check_model(llm_name: str, available: Iterable[str]) -> None:
+    """
+    Raise a ValueError if `llm_name` is not among the available models.
+    """
+    models = list(available)
+    if llm_name not in models:
+        raise ValueError(
+            f"Model '{llm_name}' is not available. "
+            f"Available models: {', '.join(models)}"
+        )
+
+
+__all__: list[str] = [
+    "DEFAULT_MODEL_LIST_TTL",
+    "ModelListCache",
+    "check_model",
+    "model_list_cache",
+]
@@ -0,0 +1,496 @@
+"""
+Retries, hedged requests and circuit breaking for calls to an LLM API.
+"""
+
+import asyncio
+import email.utils
+import random
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import (
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    FrozenSet,
+    Literal,
+    Optional,
+    Set,
+    TypeVar,
+    Union,
+)
+
+import openai
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CompletionError(Exception):
+    """
+    A chat completion failed; the cause is chained as `__cause__`.
+
+    `status_code` is the HTTP status of the last attempt, if it got one.
+    """
+
+    @property
+    def status_code(self) -> Optional[int]:
+        return getattr(self.__cause__, "status_code", None)
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an endpoint whose circuit breaker is open.
+    """
+
+
+class RetryPolicy(BaseModel):
+    """
+    Which failures to retry, how often, and how long to wait in between.
+
+    Waits grow exponentially from `base_delay` up to `max_delay`, with full
+    jitter. A Retry-After (or retry-after-ms) header from the server takes
+    precedence, up to `max_retry_after` seconds.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    jitter: bool = True
+    max_retry_after: float = 60.0
+    retry_statuses: FrozenSet[int] = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+    def retryable(self, error: BaseException) -> bool:
+        """
+        Whether a failed attempt is worth repeating.
+        """
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in self.retry_statuses
+        return isinstance(error, openai.APIConnectionError)
+
+    def retry_after(self, error: BaseException) -> Optional[float]:
+        """
+        The wait the server asked for, in seconds, if any.
+        """
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        milliseconds = response.headers.get("retry-after-ms")
+        if milliseconds:
+            try:
+                return float(milliseconds) / 1000
+            except ValueError:
+                pass
+        value = response.headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+
+    def delay(self, attempt: int, error: BaseException) -> float:
+        """
+        Seconds to wait after the `attempt`th (1-based) attempt failed.
+        """
+        requested = self.retry_after(error)
+        if requested is not None:
+            return max(0.0, min(requested, self.max_retry_after))
+        backoff = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+
+class HedgePolicy(BaseModel):
+    """
+    When to send a second, identical request while the first is still pending.
+
+    A fixed `delay` hedges after that many seconds; otherwise the request is
+    hedged once it is slower than the `quantile` of the endpoint's recent
+    latencies, as soon as `min_samples` of them are known.
+    """
+
+    delay: Optional[float] = None
+    quantile: float = 0.95
+    min_samples: int = 20
+    window: int = 200
+
+
+class CircuitBreaker:
+    """
+    Stops calls to an endpoint after `failure_threshold` failures in a row.
+
+    Once open, calls are refused for `reset_timeout` seconds; then a single
+    probe is let through, which closes the circuit again or re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = Lock()
+        self._state: CircuitState = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            if self._state == "open" and self._retry_in() <= 0:
+                return "half_open"
+            return self._state
+
+    def _retry_in(self) -> float:
+        return self._opened_at + self.reset_timeout - time.monotonic()
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go ahead now.
+        """
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open" and self._retry_in() > 0:
+                return False
+            if self._probing:
+                return False
+            self._state = "half_open"
+            self._probing = True
+            return True
+
+    def retry_in(self) -> float:
+        """
+        Seconds until an open circuit lets a probe through.
+        """
+        with self._lock:
+            return max(0.0, self._retry_in()) if self._state == "open" else 0.0
+
+    def release(self) -> None:
+        """
+        Give back a probe that ended without an outcome, e.g. when cancelled,
+        so the next call may probe instead.
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+
+class EndpointStats(BaseModel):
+    """
+    Snapshot of the resilience counters for one endpoint; latencies in seconds.
+    """
+
+    state: CircuitState = "closed"
+    calls: int = 0
+    attempts: int = 0
+    retries: int = 0
+    failures: int = 0
+    rejected: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    hedge_after: Optional[float] = None
+
+
+class _Endpoint:
+    """
+    The breaker, recent latencies and counters of one endpoint.
+    """
+
+    def __init__(self, breaker: Optional[CircuitBreaker], window: int) -> None:
+        self.breaker = breaker
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.stats = EndpointStats()
+        self.lock = Lock()
+
+    def count(self, **increments: int) -> None:
+        with self.lock:
+            for name, increment in increments.items():
+                setattr(self.stats, name, getattr(self.stats, name) + increment)
+
+    def hedge_after(self, policy: Optional[HedgePolicy]) -> Optional[float]:
+        if policy is None:
+            return None
+        if policy.delay is not None:
+            return policy.delay
+        with self.lock:
+            if len(self.latencies) < policy.min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(policy.quantile * len(ordered)))]
+
+
+class Resilience:
+    """
+    Wraps API calls in retries, hedging and a circuit breaker per endpoint.
+
+    One instance can be shared by many managers; each endpoint (base URL)
+    then gets one breaker and one latency history. Pass `hedge=None` or
+    `breaker=False` to turn those parts off.
+    """
+
+    def __init__(
+        self,
+        retry: Optional[RetryPolicy] = None,
+        hedge: Optional[HedgePolicy] = None,
+        breaker: Union[bool, Callable[[], CircuitBreaker]] = True,
+    ) -> None:
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.hedge = hedge
+        self._new_breaker: Optional[Callable[[], CircuitBreaker]] = (
+            CircuitBreaker if breaker is True else breaker or None
+        )
+        self._lock = Lock()
+        self._endpoints: Dict[str, _Endpoint] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _endpoint(self, endpoint: str) -> _Endpoint:
+        with self._lock:
+            state = self._endpoints.get(endpoint)
+            if state is None:
+                breaker = self._new_breaker() if self._new_breaker else None
+                window = self.hedge.window if self.hedge is not None else 1
+                state = self._endpoints[endpoint] = _Endpoint(breaker, window)
+            return state
+
+    def breaker(self, endpoint: str) -> Optional[CircuitBreaker]:
+        """
+        The circuit breaker of an endpoint, if breaking is on.
+        """
+        return self._endpoint(endpoint).breaker
+
+    def stats(self) -> Dict[str, EndpointStats]:
+        """
+        Return the counters of every endpoint called so far.
+        """
+        with self._lock:
+            endpoints = dict(self._endpoints)
+        snapshot = {}
+        for name, state in endpoints.items():
+            with state.lock:
+                stats = state.stats.model_copy()
+            if state.breaker is not None:
+                stats.state = state.breaker.state
+            stats.hedge_after = state.hedge_after(self.hedge)
+            snapshot[name] = stats
+        return snapshot
+
+    def _admit(self, endpoint: str, state: _Endpoint) -> None:
+        if state.breaker is not None and not state.breaker.allow():
+            state.count(rejected=1)
+            retry_in = state.breaker.retry_in()
+            if retry_in > 0:
+                raise CircuitOpenError(
+                    f"Circuit for {endpoint} is open; retry in {retry_in:.1f}s"
+                )
+            raise CircuitOpenError(
+                f"Circuit for {endpoint} is half open; a probe is in flight"
+            )
+
+    def _abandoned(self, state: _Endpoint) -> None:
+        """
+        Release the breaker after an attempt ended by cancellation or interrupt.
+        """
+        if state.breaker is not None:
+            state.breaker.release()
+
+    def _succeeded(self, state: _Endpoint, latency: float) -> None:
+        with state.lock:
+            state.latencies.append(latency)
+        if state.breaker is not None:
+            state.breaker.record_success()
+
+    def _failed(self, state: _Endpoint, error: BaseException, attempt: int) -> bool:
+        """
+        Record a failed attempt, returning whether to try again.
+        """
+        state.count(failures=1)
+        if state.breaker is not None:
+            if endpoint_failed(error):
+                state.breaker.record_failure()
+            else:
+                state.breaker.record_success()
+        return attempt < self.retry.max_attempts and self.retry.retryable(error)
+
+    def call(self, endpoint: str, request: Callable[[], T], hedge: bool = True) -> T:
+        """
+        Call `request()` until it succeeds or the retry policy gives up.
+        """
+        state = self._endpoint(endpoint)
+        state.count(calls=1)
+        attempt = 0
+        while True:
+            attempt += 1
+            self._admit(endpoint, state)
+            state.count(attempts=1)
+            start = time.monotonic()
+            try:
+                hedge_after = state.hedge_after(self.hedge) if hedge else None
+                if hedge_after is None:
+                    result = request()
+                else:
+                    result = self._hedged(state, request, hedge_after)
+            except Exception as e:
+                if not self._failed(state, e, attempt):
+                    raise
+                state.count(retries=1)
+                time.sleep(self.retry.delay(attempt, e))
+                continue
+            except BaseException:
+                self._abandoned(state)
+                raise
+            self._succeeded(state, time.monotonic() - start)
+            return result
+
+    def _hedged(self, state: _Endpoint, request: Callable[[], T], after: float) -> T:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="llamda-hedge")
+            executor = self._executor
+        first = executor.submit(request)
+        done, _ = wait([first], timeout=after)
+        if done:
+            return first.result()
+        state.count(hedges=1)
+        second = executor.submit(request)
+        pending: Set["Future[T]"] = {first, second}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        state.count(hedge_wins=1)
+                    return future.result()
+                error = error or future.exception()
+        assert error is not None
+        raise error
+
+    async def acall(
+        self,
+        endpoint: str,
+        request: Callable[[], Awaitable[T]],
+        hedge: bool = True,
+    ) -> T:
+        """
+        Asynchronous call(); the slower of two hedged requests is cancelled.
+        """
+        state = self._endpoint(endpoint)
+        state.count(calls=1)
+        attempt = 0
+        while True:
+            attempt += 1
+            self._admit(endpoint, state)
+            state.count(attempts=1)
+            start = time.monotonic()
+            try:
+                hedge_after = state.hedge_after(self.hedge) if hedge else None
+                if hedge_after is None:
+                    result = await request()
+                else:
+                    result = await self._ahedged(state, request, hedge_after)
+            except Exception as e:
+                if not self._failed(state, e, attempt):
+                    raise
+                state.count(retries=1)
+                await asyncio.sleep(self.retry.delay(attempt, e))
+                continue
+            except BaseException:
+                self._abandoned(state)
+                raise
+            self._succeeded(state, time.monotonic() - start)
+            return result
+
+    async def _ahedged(
+        self, state: _Endpoint, request: Callable[[], Awaitable[T]], after: float
+    ) -> T:
+        first = asyncio.ensure_future(request())
+        done, _ = await asyncio.wait({first}, timeout=after)
+        if done:
+            return first.result()
+        state.count(hedges=1)
+        second = asyncio.ensure_future(request())
+        pending: Set["asyncio.Future[T]"] = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    if future.exception() is None:
+                        if future is second:
+                            state.count(hedge_wins=1)
+                        return future.result()
+                    error = error or future.exception()
+        finally:
+            for future in pending:
+                future.cancel()
+        assert error is not None
+        raise error
+
+    def close(self) -> None:
+        """
+        Stop the threads used for synchronous hedging.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def endpoint_failed(error: BaseException) -> bool:
+    """
+    Whether an error means the endpoint is unwell: a server error or lost
+    connection, rather than an answer like 400 or 429.
+    """
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500
+    return isinstance(error, openai.APIConnectionError)
+
+
+# Used by every manager created with `resilience=True`.
+default_resilience = Resilience()
+
+
+def resilience_for(option: Union[bool, Resilience, None]) -> Optional[Resilience]:
+    """
+    The Resilience for a manager's `resilience` option.
+    """
+    if isinstance(option, Resilience):
+        return option
+    return default_resilience if option else None
+
+
+__all__: list[str] = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "CircuitState",
+    "CompletionError",
+    "EndpointStats",
+    "HedgePolicy",
+    "Resilience",
+    "RetryPolicy",
+    "default_resilience",
+    "endpoint_failed",
+    "resilience_for",
+]
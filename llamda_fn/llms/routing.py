@@ -0,0 +1,446 @@
+"""
+Routing completions across several OpenAI-compatible endpoints.
+"""
+
+import asyncio
+import threading
+import time
+from threading import Lock
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
+
+from pydantic import BaseModel
+
+from .api import LlmApiConfig
+from .api_types import LLCompletion
+from .exchange import Exchange
+from .llm_manager import AsyncLLManager, LLManager
+from .resilience import CircuitOpenError, endpoint_failed
+from .streaming import AsyncCompletionStream, CompletionStream, ToolCallHandler
+
+M = TypeVar("M", LLManager, AsyncLLManager)
+T = TypeVar("T")
+
+RoutingStrategy = Literal["least_outstanding", "ewma"]
+
+
+class RouteStats(BaseModel):
+    """
+    Snapshot of one endpoint's load and health; latencies are in seconds.
+    """
+
+    base_url: str
+    healthy: bool = True
+    outstanding: int = 0
+    requests: int = 0
+    failures: int = 0
+    failovers: int = 0
+    ewma_latency: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class _Route(Generic[M]):
+    """
+    One endpoint's manager and the load and health the router tracks for it.
+    """
+
+    def __init__(self, manager: M) -> None:
+        self.manager = manager
+        self.stats = RouteStats(base_url=str(manager.base_url))
+        self.down_until = 0.0
+
+    def healthy(self, now: float) -> bool:
+        return self.down_until <= now
+
+
+def manager_kwargs(config: LlmApiConfig) -> Dict[str, Any]:
+    """
+    The OpenAI client arguments for an endpoint's configuration.
+    """
+    kwargs = {
+        name: value
+        for name, value in config.model_dump(exclude={"http_client"}).items()
+        if value is not None
+    }
+    kwargs["api_key"] = config.api_key
+    if config.http_client is not None:
+        kwargs["http_client"] = config.http_client
+    return kwargs
+
+
+def fails_over(error: BaseException) -> bool:
+    """
+    Whether a failed completion should be tried on another endpoint.
+
+    Server errors, lost connections, rate limits and open circuits do; errors
+    in the request itself, which every endpoint would reject, do not.
+    """
+    cause = error.__cause__ or error
+    if isinstance(cause, CircuitOpenError) or endpoint_failed(cause):
+        return True
+    return getattr(cause, "status_code", None) == 429
+
+
+class _Router(Generic[M]):
+    """
+    Endpoint selection and bookkeeping shared by the sync and async routers.
+    """
+
+    def __init__(
+        self,
+        routes: List[_Route[M]],
+        llm_name: str,
+        strategy: RoutingStrategy,
+        ewma_alpha: float,
+        cooldown: float,
+    ) -> None:
+        if not routes:
+            raise ValueError("At least one endpoint is required")
+        if strategy not in ("least_outstanding", "ewma"):
+            raise ValueError(f"Unknown routing strategy: {strategy}")
+        self.routes = routes
+        self.llm_name = llm_name
+        self.strategy = strategy
+        self.ewma_alpha = ewma_alpha
+        self.cooldown = cooldown
+        self._lock = Lock()
+
+    def _score(self, route: _Route[M]) -> tuple[float, int]:
+        stats = route.stats
+        if self.strategy == "ewma":
+            return (stats.ewma_latency or 0.0) * (stats.outstanding + 1), stats.requests
+        return stats.outstanding, stats.requests
+
+    def ranked(self) -> List[_Route[M]]:
+        """
+        Endpoints in the order to try them: healthy ones by score, then the
+        ones cooling down after a failure, soonest back first.
+        """
+        now = time.monotonic()
+        with self._lock:
+            healthy = sorted(
+                (route for route in self.routes if route.healthy(now)), key=self._score
+            )
+            down = sorted(
+                (route for route in self.routes if not route.healthy(now)),
+                key=lambda route: route.down_until,
+            )
+        return healthy + down
+
+    def _started(self, route: _Route[M]) -> float:
+        with self._lock:
+            route.stats.outstanding += 1
+            route.stats.requests += 1
+        return time.monotonic()
+
+    def _finished(self, route: _Route[M]) -> None:
+        with self._lock:
+            route.stats.outstanding -= 1
+
+    def _succeeded(self, route: _Route[M], started: float) -> None:
+        latency = time.monotonic() - started
+        with self._lock:
+            stats = route.stats
+            stats.ewma_latency = (
+                latency
+                if stats.ewma_latency is None
+                else self.ewma_alpha * latency
+                + (1 - self.ewma_alpha) * stats.ewma_latency
+            )
+            route.down_until = 0.0
+
+    def _failed(self, route: _Route[M], error: BaseException) -> bool:
+        """
+        Record a failed request, returning whether to fail over.
+        """
+        failover = fails_over(error)
+        with self._lock:
+            stats = route.stats
+            stats.failures += 1
+            stats.last_error = str(error.__cause__ or error)
+            if failover:
+                stats.failovers += 1
+            if endpoint_failed(error.__cause__ or error):
+                route.down_until = time.monotonic() + self.cooldown
+        return failover
+
+    def _mark(self, route: _Route[M], healthy: bool, error: str = "") -> None:
+        with self._lock:
+            route.down_until = 0.0 if healthy else time.monotonic() + self.cooldown
+            if not healthy:
+                route.stats.last_error = error
+
+    def stats(self) -> List[RouteStats]:
+        """
+        Return the load, latency and health of every endpoint.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                route.stats.model_copy(update={"healthy": route.healthy(now)})
+                for route in self.routes
+            ]
+
+    def _route(self, request: Callable[[_Route[M]], T]) -> T:
+        error: Optional[BaseException] = None
+        for route in self.ranked():
+            started = self._started(route)
+            try:
+                result = request(route)
+            except Exception as e:
+                if not self._failed(route, e):
+                    raise
+                error = e
+                continue
+            finally:
+                self._finished(route)
+            self._succeeded(route, started)
+            return result
+        assert error is not None
+        raise error
+
+    async def _aroute(self, request: Callable[[_Route[M]], Awaitable[T]]) -> T:
+        error: Optional[BaseException] = None
+        for route in self.ranked():
+            started = self._started(route)
+            try:
+                result = await request(route)
+            except Exception as e:
+                if not self._failed(route, e):
+                    raise
+                error = e
+                continue
+            finally:
+                self._finished(route)
+            self._succeeded(route, started)
+            return result
+        assert error is not None
+        raise error
+
+
+class RoutingManager(_Router[LLManager]):
+    """
+    An LLManager spread over several endpoints serving the same models.
+
+    Each request goes to the endpoint with the fewest requests in flight
+    ("least_outstanding") or the lowest EWMA latency weighted by its load
+    ("ewma"). Endpoints that fail with a server or connection error are
+    skipped for `cooldown` seconds and the request fails over to the next
+    one. check_health() probes every endpoint, and does so every
+    `health_interval` seconds in the background if that is set.
+    Other arguments are passed to each endpoint's LLManager, with the
+    endpoint's own settings taking precedence.
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[Union[LlmApiConfig, Dict[str, Any]]],
+        llm_name: str = "gpt-4-0613",
+        strategy: RoutingStrategy = "least_outstanding",
+        ewma_alpha: float = 0.3,
+        cooldown: float = 10.0,
+        health_interval: Optional[float] = None,
+        **kwargs: Any,
+    ) -> None:
+        routes = [
+            _Route(
+                LLManager(
+                    llm_name=llm_name,
+                    **{**kwargs, **manager_kwargs(LlmApiConfig.model_validate(config))},
+                )
+            )
+            for config in endpoints
+        ]
+        super().__init__(routes, llm_name, strategy, ewma_alpha, cooldown)
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        if health_interval is not None:
+            self._health_thread = threading.Thread(
+                target=self._check_periodically,
+                args=(health_interval,),
+                name="llamda-health",
+                daemon=True,
+            )
+            self._health_thread.start()
+
+    def chat_completion(
+        self, messages: Exchange, llm_name: str, **kwargs: Any
+    ) -> LLCompletion:
+        return self._route(
+            lambda route: route.manager.chat_completion(messages, llm_name, **kwargs)
+        )
+
+    def stream_completion(
+        self,
+        messages: Exchange,
+        llm_name: str,
+        on_tool_call: Optional[ToolCallHandler] = None,
+        **kwargs: Any,
+    ) -> CompletionStream:
+        """Start a streamed completion; only opening the stream fails over."""
+        return self._route(
+            lambda route: route.manager.stream_completion(
+                messages, llm_name, on_tool_call, **kwargs
+            )
+        )
+
+    def check_health(self, timeout: float = 5.0) -> List[RouteStats]:
+        """
+        List each endpoint's models, marking it healthy or down accordingly.
+        """
+        for route in self.routes:
+            try:
+                route.manager.models.list(timeout=timeout)
+            except Exception as e:
+                self._mark(route, False, str(e))
+            else:
+                self._mark(route, True)
+        return self.stats()
+
+    def _check_periodically(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.check_health()
+
+    def close(self) -> None:
+        """Stop health checks and close every endpoint's manager."""
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+        for route in self.routes:
+            route.manager.close()
+
+    def __enter__(self) -> "RoutingManager":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class AsyncRoutingManager(_Router[AsyncLLManager]):
+    """
+    Asynchronous RoutingManager. With `health_interval`, check_health() runs
+    as a background task on the event loop the router is used from.
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[Union[LlmApiConfig, Dict[str, Any]]],
+        llm_name: str = "gpt-4-0613",
+        strategy: RoutingStrategy = "least_outstanding",
+        ewma_alpha: float = 0.3,
+        cooldown: float = 10.0,
+        health_interval: Optional[float] = None,
+        **kwargs: Any,
+    ) -> None:
+        routes = [
+            _Route(
+                AsyncLLManager(
+                    llm_name=llm_name,
+                    **{**kwargs, **manager_kwargs(LlmApiConfig.model_validate(config))},
+                )
+            )
+            for config in endpoints
+        ]
+        super().__init__(routes, llm_name, strategy, ewma_alpha, cooldown)
+        self.health_interval = health_interval
+        self._health_task: Optional["asyncio.Task[None]"] = None
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            self._start_health_checks()
+
+    def _start_health_checks(self) -> None:
+        """
+        Start the periodic health checks on the running loop, if not already.
+        """
+        if self.health_interval is None:
+            return
+        task = self._health_task
+        loop = asyncio.get_running_loop()
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._health_task = loop.create_task(
+                self._check_periodically(self.health_interval)
+            )
+
+    async def _check_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.check_health()
+
+    async def chat_completion(
+        self, messages: Exchange, llm_name: str, **kwargs: Any
+    ) -> LLCompletion:
+        self._start_health_checks()
+        return await self._aroute(
+            lambda route: route.manager.chat_completion(messages, llm_name, **kwargs)
+        )
+
+    async def stream_completion(
+        self,
+        messages: Exchange,
+        llm_name: str,
+        on_tool_call: Optional[ToolCallHandler] = None,
+        **kwargs: Any,
+    ) -> AsyncCompletionStream:
+        """Start a streamed completion; only opening the stream fails over."""
+        self._start_health_checks()
+        return await self._aroute(
+            lambda route: route.manager.stream_completion(
+                messages, llm_name, on_tool_call, **kwargs
+            )
+        )
+
+    async def check_health(self, timeout: float = 5.0) -> List[RouteStats]:
+        """
+        List each endpoint's models, marking it healthy or down accordingly.
+        """
+        for route in self.routes:
+            try:
+                await route.manager.models.list(timeout=timeout)
+            except Exception as e:
+                self._mark(route, False, str(e))
+            else:
+                self._mark(route, True)
+        return self.stats()
+
+    async def close(self) -> None:
+        """Stop health checks and close every endpoint's manager."""
+        task, self._health_task = self._health_task, None
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for route in self.routes:
+            await route.manager.close()
+
+    async def __aenter__(self) -> "AsyncRoutingManager":
+        self._start_health_checks()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+
+__all__: list[str] = [
+    "AsyncRoutingManager",
+    "RouteStats",
+    "RoutingManager",
+    "RoutingStrategy",
+    "fails_over",
+    "manager_kwargs",
+]
@@ -0,0 +1,219 @@
+"""
+Assembly of streamed chat completions, handing off tool calls as they complete.
+"""
+
+import inspect
+import json
+import uuid
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+)
+
+from .api_types import LLCompletion, LLMessage, LLMessageMeta, LlToolCall
+
+ToolCallHandler = Callable[[LlToolCall], None]
+
+
+class StreamAssembler:
+    """
+    Accumulates completion chunks into a message.
+
+    Each tool call is passed to `on_tool_call` as soon as its arguments form a
+    complete JSON object, or the model moves on to the next call, or the
+    stream finishes; whichever comes first.
+    """
+
+    def __init__(self, on_tool_call: Optional[ToolCallHandler] = None) -> None:
+        self.on_tool_call = on_tool_call
+        self.id = ""
+        self.model = ""
+        self.finish_reason: Optional[str] = None
+        self._content: List[str] = []
+        self._calls: Dict[int, Dict[str, str]] = {}
+        self._completed: Set[int] = set()
+
+    def add(self, chunk: Any) -> str:
+        """
+        Add a chunk, returning the assistant text it carries.
+        """
+        self.id = self.id or chunk.id
+        self.model = self.model or chunk.model
+        if not chunk.choices:
+            return ""
+        choice = chunk.choices[0]
+        delta = choice.delta
+
+        for tool_call in delta.tool_calls or []:
+            for index in list(self._calls):
+                if index < tool_call.index:
+                    self._complete(index)
+            call = self._calls.setdefault(
+                tool_call.index, {"id": "", "name": "", "arguments": ""}
+            )
+            call["id"] = tool_call.id or call["id"]
+            if tool_call.function is not None:
+                call["name"] += tool_call.function.name or ""
+                call["arguments"] += tool_call.function.arguments or ""
+            if self._has_complete_arguments(call):
+                self._complete(tool_call.index)
+
+        if choice.finish_reason:
+            self.finish_reason = choice.finish_reason
+            for index in list(self._calls):
+                self._complete(index)
+
+        if delta.content:
+            self._content.append(delta.content)
+            return delta.content
+        return ""
+
+    @staticmethod
+    def _has_complete_arguments(call: Dict[str, str]) -> bool:
+        if not (call["id"] and call["name"]):
+            return False
+        if not call["arguments"].rstrip().endswith("}"):
+            return False
+        try:
+            return isinstance(json.loads(call["arguments"]), dict)
+        except ValueError:
+            return False
+
+    def _complete(self, index: int) -> None:
+        if index in self._completed:
+            return
+        self._completed.add(index)
+        if self.on_tool_call is not None:
+            self.on_tool_call(self._tool_call(index))
+
+    def _tool_call(self, index: int) -> LlToolCall:
+        return LlToolCall(**self._calls[index])
+
+    def completion(self) -> LLCompletion:
+        """
+        The message assembled from every chunk added so far.
+        """
+        tool_calls = [self._tool_call(index) for index in sorted(self._calls)]
+        return LLCompletion(
+            message=LLMessage(
+                id=self.id or str(uuid.uuid4()),
+                meta=LLMessageMeta(
+                    choice={"index": 0, "finish_reason": self.finish_reason},
+                    completion={"id": self.id, "model": self.model},
+                ),
+                role="assistant",
+                content="".join(self._content),
+                tool_calls=tool_calls or None,
+            )
+        )
+
+
+class CompletionStream:
+    """
+    Iterates the assistant text of a streamed completion as it arrives.
+
+    Tool calls are handed to `on_tool_call` while the stream is read; the
+    whole message is returned by completion(), which reads what is left.
+    """
+
+    def __init__(
+        self, chunks: Iterable[Any], on_tool_call: Optional[ToolCallHandler] = None
+    ) -> None:
+        self._source = chunks
+        self._chunks = iter(chunks)
+        self._assembler = StreamAssembler(on_tool_call)
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self._chunks:
+            text = self._assembler.add(chunk)
+            if text:
+                yield text
+
+    def completion(self) -> LLCompletion:
+        """
+        Read the rest of the stream and return the assembled completion.
+        """
+        for _ in self:
+            pass
+        return self._assembler.completion()
+
+    def close(self) -> None:
+        """
+        Close the underlying response stream, if it can be closed.
+        """
+        close = getattr(self._source, "close", None)
+        if close is not None:
+            close()
+
+
+class AsyncCompletionStream:
+    """
+    Asynchronous CompletionStream.
+
+    `on_done` is called once, when the stream is read to the end, fails or
+    is closed.
+    """
+
+    def __init__(
+        self,
+        chunks: AsyncIterable[Any],
+        on_tool_call: Optional[ToolCallHandler] = None,
+        on_done: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._source = chunks
+        self._chunks = aiter(chunks)
+        self._assembler = StreamAssembler(on_tool_call)
+        self._on_done = on_done
+
+    def _done(self) -> None:
+        on_done, self._on_done = self._on_done, None
+        if on_done is not None:
+            on_done()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            async for chunk in self._chunks:
+                text = self._assembler.add(chunk)
+                if text:
+                    yield text
+        finally:
+            self._done()
+
+    async def completion(self) -> LLCompletion:
+        """
+        Read the rest of the stream and return the assembled completion.
+        """
+        async for _ in self:
+            pass
+        return self._assembler.completion()
+
+    async def close(self) -> None:
+        """
+        Close the underlying response stream, if it can be closed.
+        """
+        close = getattr(self._source, "close", None) or getattr(
+            self._source, "aclose", None
+        )
+        try:
+            if close is not None:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+        finally:
+            self._done()
+
+
+__all__: list[str] = [
+    "AsyncCompletionStream",
+    "CompletionStream",
+    "StreamAssembler",
+    "ToolCallHandler",
+]
@@ -2,6 +2,8 @@
 CLI for LlamdaFn
 """
 
-from . import logger as Llog
+from .lazy import lazy_getattr
+
+__getattr__ = lazy_getattr(__name__, {"Llog": "llamda_fn.utils.logger"})
 
 __all__: list[str] = ["Llog"]
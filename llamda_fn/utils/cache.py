@@ -0,0 +1,297 @@
+"""
+Caching helpers shared across llamda_fn.
+"""
+
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar, Union
+
+from pydantic import BaseModel
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class CacheInfo(BaseModel):
+    """
+    Snapshot of a cache's counters.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    evictions: int = 0
+    currsize: int = 0
+    maxsize: Optional[int] = None
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A thread-safe least-recently-used cache with hit/miss/eviction counters.
+
+    A `maxsize` of None makes the cache unbounded. With a `ttl`, entries
+    older than that many seconds are dropped on access and counted as
+    invalidations.
+    """
+
+    def __init__(
+        self, maxsize: Optional[int] = 128, ttl: Optional[float] = None
+    ) -> None:
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be None or a non-negative integer")
+        self.maxsize: Optional[int] = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._expires: Dict[K, float] = {}
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._evictions = 0
+
+    def get(
+        self,
+        key: K,
+        is_valid: Optional[Callable[[V], bool]] = None,
+    ) -> Optional[V]:
+        """
+        Return the value for `key`, or None on a miss.
+
+        Entries rejected by `is_valid` are dropped and counted as a miss.
+        """
+        with self._lock:
+            if key in self._data:
+                value = self._data[key]
+                expired = self._expires.get(key, float("inf")) <= time.monotonic()
+                if not expired and (is_valid is None or is_valid(value)):
+                    self._data.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._data[key]
+                self._expires.pop(key, None)
+                self._invalidations += 1
+            self._misses += 1
+            return None
+
+    def put(self, key: K, value: V) -> None:
+        """
+        Store `value` under `key`, evicting the least recently used entries.
+        """
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.ttl is not None:
+                self._expires[key] = time.monotonic() + self.ttl
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    evicted, _ = self._data.popitem(last=False)
+                    self._expires.pop(evicted, None)
+                    self._evictions += 1
+
+    def pop(self, key: K) -> Optional[V]:
+        """
+        Remove `key`, counting it as an invalidation if it was present.
+        """
+        with self._lock:
+            value = self._data.pop(key, None)
+            self._expires.pop(key, None)
+            if value is not None:
+                self._invalidations += 1
+            return value
+
+    def clear_prefix(self, prefix: str) -> int:
+        """
+        Remove the string keys starting with `prefix`, returning how many.
+        """
+        with self._lock:
+            keys = [
+                key
+                for key in self._data
+                if isinstance(key, str) and key.startswith(prefix)
+            ]
+            for key in keys:
+                del self._data[key]
+                self._expires.pop(key, None)
+            self._invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """
+        Drop every entry and reset the counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+            self._hits = self._misses = self._invalidations = self._evictions = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Return a snapshot of the cache counters.
+        """
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                invalidations=self._invalidations,
+                evictions=self._evictions,
+                currsize=len(self._data),
+                maxsize=self.maxsize,
+            )
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    A string-to-string cache in a SQLite file, shareable between processes.
+
+    Entries are evicted least recently used first once there are more than
+    `maxsize`, and expire `ttl` seconds after being stored. Hit and miss
+    counters are kept per instance.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        maxsize: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be None or a non-negative integer")
+        self.path = Path(path)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._evictions = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL, expires REAL, used REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the value for `key`, or None on a miss.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is not None and row[1] is not None and row[1] <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._invalidations += 1
+                row = None
+            if row is None:
+                self._misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET used = ? WHERE key = ?", (now, key))
+            self._hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        """
+        Store `value` under `key`, evicting the least recently used entries.
+        """
+        if self.maxsize == 0:
+            return
+        now = time.time()
+        expires = None if self.ttl is None else now + self.ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (key, value, expires, now),
+            )
+            if self.maxsize is not None:
+                evicted = self._conn.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries "
+                    "ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                    (self.maxsize,),
+                )
+                self._evictions += max(evicted.rowcount, 0)
+
+    def pop(self, key: str) -> Optional[str]:
+        """
+        Remove `key`, counting it as an invalidation if it was present.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._invalidations += 1
+            return row[0]
+
+    def clear_prefix(self, prefix: str) -> int:
+        """
+        Remove the keys starting with `prefix`, returning how many.
+        """
+        query = "DELETE FROM entries"
+        params: Tuple[str, ...] = ()
+        if prefix:
+            # A key range rather than LIKE or substr(), which stop at a NUL.
+            query += " WHERE key >= ? AND key < ?"
+            params = (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+        with self._lock:
+            removed = self._conn.execute(query, params)
+            count = max(removed.rowcount, 0)
+            self._invalidations += count
+            return count
+
+    def clear(self) -> None:
+        """
+        Drop every entry and reset the counters.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._hits = self._misses = self._invalidations = self._evictions = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Return a snapshot of the cache counters.
+        """
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                invalidations=self._invalidations,
+                evictions=self._evictions,
+                currsize=len(self),
+                maxsize=self.maxsize,
+            )
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self._conn.close()
+
+    def __contains__(self, key: str) -> bool:
+        return (
+            self._conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+            is not None
+        )
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+__all__: list[str] = ["CacheInfo", "LRUCache", "SQLiteCache"]
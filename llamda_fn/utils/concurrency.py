@@ -0,0 +1,376 @@
+"""
+Concurrency helpers for coordinating tool calls.
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Future
+from threading import Condition, Lock
+from types import TracebackType
+from typing import (
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Hashable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from pydantic import BaseModel
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class FlightCancelled(TimeoutError):
+    """
+    Raised to calls that shared a leading call which was cancelled.
+    """
+
+
+class FlightStats(BaseModel):
+    """
+    Snapshot of a SingleFlight's activity.
+    """
+
+    executed: int = 0
+    shared: int = 0
+    in_flight: int = 0
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for and share its result (or exception). Works across
+    threads and event loops.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._calls: Dict[K, "Future[V]"] = {}
+        self._executed = 0
+        self._shared = 0
+
+    def _join(self, key: K) -> Tuple["Future[V]", bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._shared += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self._executed += 1
+            return future, True
+
+    def _finish(self, key: K) -> None:
+        with self._lock:
+            del self._calls[key]
+
+    def do(self, key: K, fn: Callable[[], V]) -> V:
+        """
+        Run `fn`, or wait for the in-flight call with the same key.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key)
+        future.set_result(result)
+        return result
+
+    async def ado(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        """
+        Await `fn()`, or the in-flight call with the same key.
+
+        If the leading call is cancelled, calls sharing it raise FlightCancelled.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(FlightCancelled(f"Shared call {key!r} was cancelled"))
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key)
+        future.set_result(result)
+        return result
+
+    def stats(self) -> FlightStats:
+        """
+        Return how many calls ran, how many shared a result, and how many run now.
+        """
+        with self._lock:
+            return FlightStats(
+                executed=self._executed,
+                shared=self._shared,
+                in_flight=len(self._calls),
+            )
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket allowing `rate` calls per second on average.
+
+    Up to `burst` calls can run back to back. Callers reserve a token and are
+    told how long to wait for it, so waiting never holds the lock.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token, returning the seconds to wait before using it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def refund(self) -> None:
+        """
+        Give back a reserved token that went unused.
+        """
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+
+class LimitStats(BaseModel):
+    """
+    Snapshot of a Limiter's activity; waits are in seconds.
+    """
+
+    max_concurrency: Optional[int] = None
+    rate_limit: Optional[float] = None
+    active: int = 0
+    waiting: int = 0
+    calls: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+class Limiter:
+    """
+    Bounds how many calls run at once and how often they start.
+
+    Use as a context manager around each call, with `with` in threads or
+    `async with` on an event loop; both count against the same limits.
+    Threads wait on a condition and tasks on a future that release()
+    resolves, so neither polls.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        burst: Optional[int] = None,
+    ) -> None:
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be None or a positive integer")
+        self.max_concurrency = max_concurrency
+        self._bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+        self._lock = Lock()
+        self._freed = Condition(self._lock)
+        self._free = max_concurrency
+        self._async_waiters: Deque["asyncio.Future[None]"] = deque()
+        self._active = 0
+        self._waiting = 0
+        self._calls = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _queued(self) -> float:
+        with self._lock:
+            self._waiting += 1
+        return time.monotonic()
+
+    def _started(self, queued: float) -> None:
+        waited = time.monotonic() - queued
+        with self._lock:
+            self._waiting -= 1
+            self._active += 1
+            self._calls += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+    def _abandoned(self) -> None:
+        with self._lock:
+            self._waiting -= 1
+
+    def _take(self) -> bool:
+        """
+        Take a free slot, if there is one; the lock must be held.
+        """
+        if self._free is None:
+            return True
+        if self._free == 0:
+            return False
+        self._free -= 1
+        return True
+
+    def _give_back(self) -> None:
+        """
+        Free a slot and wake one thread and one task to race for it.
+        """
+        with self._lock:
+            if self._free is None:
+                return
+            self._free += 1
+            self._freed.notify()
+            self._wake_task()
+
+    def _wake_task(self) -> None:
+        while self._async_waiters:
+            woken = self._async_waiters.popleft()
+            try:
+                woken.get_loop().call_soon_threadsafe(_resolve, woken)
+                return
+            except RuntimeError:
+                continue
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a call may start, or `timeout` seconds pass.
+
+        Returns whether the call may start.
+        """
+        queued = self._queued()
+        expires = None if timeout is None else queued + timeout
+        with self._lock:
+            taken = self._freed.wait_for(self._take, timeout)
+        if not taken:
+            self._abandoned()
+            return False
+        if self._bucket is not None:
+            wait = self._bucket.reserve()
+            if expires is not None and queued + wait > expires:
+                self._bucket.refund()
+                self._give_back()
+                self._abandoned()
+                return False
+            time.sleep(wait)
+        self._started(queued)
+        return True
+
+    async def aacquire(self) -> None:
+        """
+        Wait on the event loop until a call may start.
+        """
+        queued = self._queued()
+        taken = False
+        try:
+            while not taken:
+                with self._lock:
+                    taken = self._take()
+                    if not taken:
+                        woken = asyncio.get_running_loop().create_future()
+                        self._async_waiters.append(woken)
+                if not taken:
+                    await self._await_wakeup(woken)
+            if self._bucket is not None:
+                await asyncio.sleep(self._bucket.reserve())
+        except BaseException:
+            if taken:
+                self._give_back()
+            self._abandoned()
+            raise
+        self._started(queued)
+
+    async def _await_wakeup(self, woken: "asyncio.Future[None]") -> None:
+        try:
+            await woken
+        except BaseException:
+            with self._lock:
+                if woken in self._async_waiters:
+                    self._async_waiters.remove(woken)
+                else:
+                    # Woken for a slot this task no longer wants; pass it on.
+                    self._wake_task()
+            raise
+
+    def release(self) -> None:
+        """
+        Mark a call as finished, freeing its slot.
+        """
+        with self._lock:
+            self._active -= 1
+        self._give_back()
+
+    def stats(self) -> LimitStats:
+        """
+        Return the limits, current load and queued-wait totals.
+        """
+        with self._lock:
+            return LimitStats(
+                max_concurrency=self.max_concurrency,
+                rate_limit=self._bucket.rate if self._bucket is not None else None,
+                active=self._active,
+                waiting=self._waiting,
+                calls=self._calls,
+                total_wait=self._total_wait,
+                max_wait=self._max_wait,
+            )
+
+    def __enter__(self) -> "Limiter":
+        self.acquire()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.release()
+
+    async def __aenter__(self) -> "Limiter":
+        await self.aacquire()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.release()
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+__all__: list[str] = [
+    "FlightCancelled",
+    "FlightStats",
+    "LimitStats",
+    "Limiter",
+    "SingleFlight",
+    "TokenBucket",
+]
@@ -0,0 +1,143 @@
+"""
+A long-lived, instrumented executor for running tool calls.
+"""
+
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from threading import Lock
+from typing import Any, Callable, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class ExecutorStats(BaseModel):
+    """
+    Snapshot of a ToolExecutor's activity.
+    """
+
+    max_workers: Optional[int] = None
+    submitted: int = 0
+    queued: int = 0
+    active: int = 0
+    completed: int = 0
+
+
+class ToolExecutor(Executor):
+    """
+    Wraps a thread pool (its own, or an injected one) and tracks queue depth.
+
+    An owned pool is created on first use and torn down by `shutdown`; an
+    injected executor is left for its owner to shut down. A separate process
+    pool for CPU-bound tools is likewise created on first use.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        max_processes: Optional[int] = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_processes = max_processes
+        self._executor: Optional[Executor] = executor
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._owned = executor is None
+        self._lock = Lock()
+        self._submitted = 0
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+
+    @property
+    def executor(self) -> Executor:
+        """
+        The underlying executor, created on first use if owned.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="llamda-tool"
+                )
+            return self._executor
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        """
+        The process pool for `executor="process"` tools, created on first use.
+        """
+        with self._lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.max_processes)
+            return self._process_pool
+
+    def submit(  # type: ignore[override]
+        self, fn: Callable[..., T], /, *args: Any, **kwargs: Any
+    ) -> "Future[T]":
+        """
+        Schedule `fn(*args, **kwargs)`, counting it as queued until it starts.
+        """
+        started = False
+
+        def run() -> T:
+            nonlocal started
+            with self._lock:
+                started = True
+                self._queued -= 1
+                self._active += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+
+        def on_done(future: "Future[T]") -> None:
+            if future.cancelled():
+                with self._lock:
+                    if not started:
+                        self._queued -= 1
+
+        with self._lock:
+            self._submitted += 1
+            self._queued += 1
+        future = self.executor.submit(run)
+        future.add_done_callback(on_done)
+        return future
+
+    def stats(self) -> ExecutorStats:
+        """
+        Return the current queue depth, active workers and totals.
+        """
+        with self._lock:
+            return ExecutorStats(
+                max_workers=self.max_workers
+                or getattr(self._executor, "_max_workers", None),
+                submitted=self._submitted,
+                queued=self._queued,
+                active=self._active,
+                completed=self._completed,
+            )
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """
+        Shut down the owned pools; they are recreated if used again.
+        """
+        with self._lock:
+            process_pool, self._process_pool = self._process_pool, None
+            executor, self._executor = self._executor, None
+            if not self._owned:
+                self._executor = executor
+                executor = None
+        if process_pool is not None:
+            process_pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+__all__: list[str] = ["ExecutorStats", "ToolExecutor"]
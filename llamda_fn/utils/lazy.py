@@ -0,0 +1,32 @@
+"""
+Helpers to defer expensive imports until an attribute is first used.
+"""
+
+import importlib
+import sys
+from typing import Any, Callable, Dict
+
+
+def lazy_getattr(module_name: str, attributes: Dict[str, str]) -> Callable[[str], Any]:
+    """
+    Build a module-level `__getattr__` resolving names on first access.
+
+    `attributes` maps exported names to `"module:attribute"` targets (or to a
+    bare module path); resolved values are cached on the importing module.
+    """
+
+    def __getattr__(name: str) -> Any:
+        target = attributes.get(name)
+        if target is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        target_module, _, attribute = target.partition(":")
+        value = importlib.import_module(target_module)
+        if attribute:
+            value = getattr(value, attribute)
+        setattr(sys.modules[module_name], name, value)
+        return value
+
+    return __getattr__
+
+
+__all__: list[str] = ["lazy_getattr"]
@@ -2,13 +2,13 @@
 This module contains the console utilities for the penger package.
 """
 
-from typing import Callable
-from rich.console import Console
-from rich.live import Live
-from rich.json import JSON
+from typing import TYPE_CHECKING, Callable, Optional
 
 from llamda_fn.llms.api_types import LLMessage, ToolResponse, LlToolCall
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
 
 actions: dict[str, str] = {
     "message": "💬",
@@ -28,16 +28,26 @@ emojis = {
 
 
 class Logger:
-    l: Console
+    _console: Optional["Console"]
 
     def __init__(self):
-        self.l = Console()
+        self._console = None
+        self.live = False
+
+    @property
+    def l(self) -> "Console":  # noqa: E743
+        """The rich console, created (and rich imported) on first use."""
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console()
+        return self._console
 
     def error(self, message: str) -> None:
         self.l.log(f"❌ {message}")
 
     def set_live(self, live_console: bool = False) -> None:
-        self.set_live(live_console)
+        self.live = live_console
 
     def msg(self, msg: LLMessage) -> None:
         role, content = msg.role, msg.content
@@ -52,6 +62,8 @@ class Logger:
     def tools(
         self, tool_calls: list[LlToolCall]
     ) -> Callable[[LlToolCall, ToolResponse], None]:
+        from rich.json import JSON
+
         calls: int = len(tool_calls)
         done = 0
         self.set_live()
@@ -0,0 +1,89 @@
+"""
+Benchmark: driving many concurrent exchanges through one pooled AsyncLLManager
+versus a pool of threads each blocking on the synchronous LLManager.
+
+Both run against the local fake OpenAI-compatible server used by the tests,
+which answers every request after a fixed latency.
+
+Run from the repository root with
+`PYTHONPATH=. python scripts/bench_async_pool.py [exchanges] [latency] [threads]`.
+"""
+
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tests"))
+
+from fake_openai import FakeOpenAI  # noqa: E402
+
+from llamda_fn.llms.api import PoolConfig  # noqa: E402
+from llamda_fn.llms.exchange import Exchange  # noqa: E402
+from llamda_fn.llms.llm_manager import AsyncLLManager, LLManager  # noqa: E402
+
+
+def make_exchanges(n: int) -> list[Exchange]:
+    exchanges = [Exchange() for _ in range(n)]
+    for i, exchange in enumerate(exchanges):
+        exchange.ask(f"Question {i}")
+    return exchanges
+
+
+def run_threads(base_url: str, n: int, threads: int) -> float:
+    api = LLManager(
+        llm_name="gpt-test",
+        pool=PoolConfig(max_connections=threads, max_keepalive_connections=threads),
+        base_url=base_url,
+        api_key="bench",
+    )
+    exchanges = make_exchanges(n)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda exchange: api.chat_completion(exchange, ""), exchanges))
+    elapsed = time.perf_counter() - start
+    api.close()
+    return elapsed
+
+
+async def run_async(base_url: str, n: int, connections: int) -> float:
+    pool = PoolConfig(
+        max_connections=connections, max_keepalive_connections=connections
+    )
+    api = AsyncLLManager(
+        llm_name="gpt-test", pool=pool, base_url=base_url, api_key="bench"
+    )
+    exchanges = make_exchanges(n)
+    async with api:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(api.chat_completion(exchange, "") for exchange in exchanges)
+        )
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+
+    with FakeOpenAI(latency=latency) as server:
+        threaded = run_threads(server.base_url, n, threads)
+        thread_connections = server.connections
+        server.connections = server.peak_active = 0
+        pooled = asyncio.run(run_async(server.base_url, n, threads))
+        print(f"{n} exchanges, {latency * 1000:.0f} ms server latency")
+        print(
+            f"sync, {threads} threads:      {threaded:.2f} s "
+            f"({n / threaded:.0f} req/s, {thread_connections} connections)"
+        )
+        print(
+            f"async, pooled:           {pooled:.2f} s "
+            f"({n / pooled:.0f} req/s, {server.connections} connections, "
+            f"{server.peak_active} in flight at peak)"
+        )
+
+
+if __name__ == "__main__":
+    main()
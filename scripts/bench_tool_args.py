@@ -0,0 +1,66 @@
+"""
+Microbenchmark: validating tool-call arguments from raw JSON in one pass
+versus json.loads -> model(**kwargs) -> model_dump().
+
+Run with `python scripts/bench_tool_args.py [n_fields] [iterations]`.
+"""
+
+import json
+import sys
+import timeit
+from typing import Any
+
+from llamda_fn.functions import LlamdaFunction
+
+
+def make_tool(n_fields: int) -> LlamdaFunction[Any]:
+    fields: dict[str, tuple[type, Any]] = {}
+    for i in range(n_fields):
+        fields[f"s{i}"] = (str, ...)
+        fields[f"i{i}"] = (int, 0)
+        fields[f"f{i}"] = (float, 0.0)
+        fields[f"l{i}"] = (list[int], [])
+
+    return LlamdaFunction.create(
+        call_func=lambda **kwargs: len(kwargs),
+        name="wide",
+        description="A tool with a wide argument object",
+        fields=fields,
+    )
+
+
+def make_arguments(n_fields: int) -> str:
+    arguments: dict[str, Any] = {}
+    for i in range(n_fields):
+        arguments[f"s{i}"] = f"value {i}"
+        arguments[f"i{i}"] = i
+        arguments[f"f{i}"] = i / 3
+        arguments[f"l{i}"] = list(range(8))
+    return json.dumps(arguments)
+
+
+def main() -> None:
+    n_fields = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    tool = make_tool(n_fields)
+    model = tool.build()
+    arguments = make_arguments(n_fields)
+
+    def three_pass() -> Any:
+        validated = model(**json.loads(arguments))
+        return tool.call_func(**validated.model_dump())
+
+    def single_pass() -> Any:
+        return tool.run_json(arguments)
+
+    assert three_pass() == single_pass()
+
+    print(f"{4 * n_fields} fields, {len(arguments)} bytes, {iterations} calls")
+    for label, func in (("loads+init+dump", three_pass), ("run_json", single_pass)):
+        best = min(timeit.repeat(func, number=iterations, repeat=5))
+        print(f"{label:>16}: {best / iterations * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
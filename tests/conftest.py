@@ -1,6 +1,11 @@
+import asyncio
+from typing import Any, AsyncIterator, Callable, Iterator, List
+
 import pytest
+from llamda_fn import Llamda
 from llamda_fn.functions import LlamdaFunctions
 from llamda_fn.llms.api_types import LLMessage, LLCompletion, LLMessageMeta, LlToolCall
+from llamda_fn.llms.streaming import AsyncCompletionStream, CompletionStream
 
 
 class MockLLManager:
@@ -122,3 +127,110 @@ def sample_messages():
         LLMessage(role="system", content="You are a helpful assistant."),
         LLMessage(role="user", content="Hello, how are you?"),
     ]
+
+
+def to_chunks(message: LLMessage, size: int = 4) -> Iterator[Any]:
+    """Split a message into streamed completion chunks of `size` characters."""
+    from openai.types.chat import ChatCompletionChunk
+
+    def chunk(delta: dict[str, Any], finish_reason: Any = None) -> Any:
+        return ChatCompletionChunk.model_validate(
+            {
+                "id": "chatcmpl-stream",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "gpt-test",
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+        )
+
+    yield chunk({"role": "assistant"})
+    for start in range(0, len(message.content), size):
+        yield chunk({"content": message.content[start : start + size]})
+    for index, call in enumerate(message.tool_calls or []):
+        function = {"name": call.name, "arguments": ""}
+        yield chunk(
+            {
+                "tool_calls": [
+                    {
+                        "index": index,
+                        "id": call.id,
+                        "type": "function",
+                        "function": function,
+                    }
+                ]
+            }
+        )
+        for start in range(0, len(call.arguments), size):
+            arguments = {"arguments": call.arguments[start : start + size]}
+            yield chunk({"tool_calls": [{"index": index, "function": arguments}]})
+    yield chunk({}, "tool_calls" if message.tool_calls else "stop")
+
+
+class ScriptedLLManager:
+    """Replays canned assistant messages and records every request."""
+
+    def __init__(self, responses: List[LLMessage]):
+        self.llm_name = "gpt-test"
+        self.responses = list(responses)
+        self.requests: List[dict[str, Any]] = []
+
+    def chat_completion(self, messages, llm_name, **kwargs):
+        self.requests.append(
+            {"messages": list(messages), "llm_name": llm_name, **kwargs}
+        )
+        return LLCompletion(message=self.responses.pop(0))
+
+    def next_chunks(self, messages, llm_name, **kwargs) -> Iterator[Any]:
+        """Record a streamed request; overridable to control chunk timing."""
+        self.requests.append(
+            {"messages": list(messages), "llm_name": llm_name, "stream": True, **kwargs}
+        )
+        return to_chunks(self.responses.pop(0))
+
+    def stream_completion(self, messages, llm_name, on_tool_call=None, **kwargs):
+        return CompletionStream(
+            self.next_chunks(messages, llm_name, **kwargs), on_tool_call
+        )
+
+    def close(self):
+        self.closed = True
+
+
+class ScriptedAsyncLLManager(ScriptedLLManager):
+    """Async variant of ScriptedLLManager."""
+
+    async def chat_completion(self, messages, llm_name, **kwargs):
+        return super().chat_completion(messages, llm_name, **kwargs)
+
+    async def stream_completion(self, messages, llm_name, on_tool_call=None, **kwargs):
+        chunks = self.next_chunks(messages, llm_name, **kwargs)
+
+        async def replay() -> AsyncIterator[Any]:
+            for chunk in chunks:
+                await asyncio.sleep(0)
+                yield chunk
+
+        return AsyncCompletionStream(replay(), on_tool_call)
+
+    async def close(self):
+        self.closed = True
+
+
+def assistant(content: str = "", *tool_calls: LlToolCall) -> LLMessage:
+    return LLMessage(
+        role="assistant", content=content, tool_calls=list(tool_calls) or None
+    )
+
+
+@pytest.fixture
+def make_llamda() -> Callable[..., Llamda]:
+    def factory(*responses: LLMessage, **kwargs: Any) -> Llamda:
+        ll = Llamda(api_key="test", **kwargs)
+        ll.api = ScriptedLLManager(list(responses))
+        ll.aapi = ScriptedAsyncLLManager(list(responses))
+        return ll
+
+    return factory
@@ -0,0 +1,238 @@
+"""
+A local, OpenAI-compatible chat completions server for tests and benchmarks.
+
+It speaks just enough HTTP/1.1 (with keep-alive) for the OpenAI client:
+`GET /v1/models` and `POST /v1/chat/completions`, streamed or not.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+Responder = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class FakeOpenAI:
+    """
+    Serves chat completions after `latency` seconds from a background thread.
+
+    Replies come from `responder(request) -> assistant message dict`; by
+    default the assistant says `reply`. Failures can be queued with fail_next
+    and slow answers with delay_next.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        reply: str = "ok",
+        responder: Optional[Responder] = None,
+        models: Tuple[str, ...] = ("gpt-test",),
+    ) -> None:
+        self.latency = latency
+        self.responder = responder or (
+            lambda request: {"role": "assistant", "content": reply}
+        )
+        self.models = models
+        self.requests: List[Dict[str, Any]] = []
+        self.model_list_requests = 0
+        self.connections = 0
+        self.active = 0
+        self.peak_active = 0
+        self._failures: Deque[Tuple[int, Dict[str, str]]] = deque()
+        self._delays: Deque[float] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self.port = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def fail_next(
+        self, status: int, count: int = 1, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Answer the next `count` requests with an error status.
+        """
+        for _ in range(count):
+            self._failures.append((status, headers or {}))
+
+    def delay_next(self, seconds: float, count: int = 1) -> None:
+        """
+        Answer the next `count` completions `seconds` later than usual.
+        """
+        self._delays.extend([seconds] * count)
+
+    def start(self) -> "FakeOpenAI":
+        ready = threading.Event()
+
+        def serve() -> None:
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=1024)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=serve, name="fake-openai", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None or self._server is None:
+            return
+        loop, server = self._loop, self._server
+
+        async def shutdown() -> None:
+            server.close()
+            handlers = [
+                task
+                for task in asyncio.all_tasks()
+                if task is not asyncio.current_task()
+            ]
+            for task in handlers:
+                task.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            loop.stop()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop)
+        if self._thread is not None:
+            self._thread.join()
+        self._loop = self._server = None
+
+    def __enter__(self) -> "FakeOpenAI":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers: Dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                self.active += 1
+                self.peak_active = max(self.peak_active, self.active)
+                try:
+                    status, extra, content_type, payload = await self._respond(
+                        method, path.split("?")[0], body
+                    )
+                finally:
+                    self.active -= 1
+
+                head = [
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(payload)}",
+                    "Connection: keep-alive",
+                    *(f"{name}: {value}" for name, value in extra.items()),
+                ]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + payload)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(
+        self, method: str, path: str, body: bytes
+    ) -> Tuple[int, Dict[str, str], str, bytes]:
+        if self._failures:
+            status, headers = self._failures.popleft()
+            error = {"error": {"message": f"Fake error {status}", "type": "fake"}}
+            return status, headers, "application/json", json.dumps(error).encode()
+
+        if method == "GET" and path == "/v1/models":
+            self.model_list_requests += 1
+            data = [
+                {"id": model, "object": "model", "created": 0, "owned_by": "fake"}
+                for model in self.models
+            ]
+            models = {"object": "list", "data": data}
+            return 200, {}, "application/json", json.dumps(models).encode()
+
+        if method != "POST" or path != "/v1/chat/completions":
+            return 404, {}, "application/json", b'{"error": {"message": "Not found"}}'
+
+        request = json.loads(body)
+        for message in request["messages"]:
+            if message["role"] == "tool" and not message.get("tool_call_id"):
+                error = {"error": {"message": "tool messages need a tool_call_id"}}
+                return 400, {}, "application/json", json.dumps(error).encode()
+        self.requests.append(request)
+        delay = self.latency + (self._delays.popleft() if self._delays else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        message = self.responder(request)
+
+        if request.get("stream"):
+            return 200, {}, "text/event-stream", self._events(request, message)
+        completion = {
+            "id": f"chatcmpl-{len(self.requests)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": (
+                        "tool_calls" if message.get("tool_calls") else "stop"
+                    ),
+                }
+            ],
+        }
+        return 200, {}, "application/json", json.dumps(completion).encode()
+
+    def _events(self, request: Dict[str, Any], message: Dict[str, Any]) -> bytes:
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+            data = {
+                "id": f"chatcmpl-{len(self.requests)}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request["model"],
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        events = [chunk({"role": "assistant", "content": ""})]
+        content = message.get("content") or ""
+        events.extend(
+            chunk({"content": content[i : i + 4]}) for i in range(0, len(content), 4)
+        )
+        for index, call in enumerate(message.get("tool_calls") or []):
+            events.append(chunk({"tool_calls": [dict(call, index=index)]}))
+        finish = "tool_calls" if message.get("tool_calls") else "stop"
+        events.append(chunk({}, finish))
+        events.append("data: [DONE]\n\n")
+        return "".join(events).encode()
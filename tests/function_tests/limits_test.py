@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from llamda_fn.functions import LlamdaFunctions
+from llamda_fn.llms.api_types import LlToolCall
+
+
+def call(i: int, name: str = "fragile") -> LlToolCall:
+    return LlToolCall(id=f"c{i}", name=name, arguments=f'{{"i": {i}}}')
+
+
+def test_max_concurrency_is_enforced_across_callers():
+    functions = LlamdaFunctions()
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    @functions.llamdafy(max_concurrency=2)
+    def fragile(i: int) -> int:
+        """Call a fragile service."""
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return i
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(functions.execute_function, map(call, range(8))))
+
+    assert [result.result for result in results] == [str(i) for i in range(8)]
+    assert peak == 2
+    stats = functions.limit_stats()["fragile"]
+    assert stats.calls == 8 and stats.max_concurrency == 2
+    assert stats.total_wait > 0
+
+
+def test_rate_limit_applies_to_async_calls():
+    functions = LlamdaFunctions()
+
+    @functions.llamdafy(rate_limit=20, burst=1)
+    async def fragile(i: int) -> int:
+        """Call a rate limited service."""
+        return i
+
+    @functions.llamdafy()
+    async def free(i: int) -> int:
+        """Call an unlimited service."""
+        return i
+
+    async def main() -> None:
+        await asyncio.gather(
+            *(functions.aexecute_function(call(i)) for i in range(5)),
+            *(functions.aexecute_function(call(i, "free")) for i in range(5)),
+        )
+
+    start = time.monotonic()
+    asyncio.run(main())
+    assert time.monotonic() - start >= 0.18
+    assert list(functions.limit_stats()) == ["fragile"]
+    assert functions.limit_stats()["fragile"].max_wait >= 0.18
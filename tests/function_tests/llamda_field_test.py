@@ -1,8 +1,13 @@
 import pytest
-from typing import Dict, List, Union, Optional, Any
+from typing import Annotated, Dict, List, Union, Optional, Any
 from pydantic import BaseModel, Field
 
-from llamda_fn.functions.process_fields import process_field, process_fields
+from llamda_fn.functions.process_fields import (
+    clear_process_field_cache,
+    process_field,
+    process_field_cache_info,
+    process_fields,
+)
 
 
 class TestProcessField:
@@ -84,5 +89,49 @@ class TestProcessFields:
         assert processed["optional_field"][1]["nullable"] is True
 
 
+class TestProcessFieldCache:
+    def test_repeated_fields_hit_cache(self):
+        clear_process_field_cache()
+        for _ in range(3):
+            process_field(Optional[float], {})
+            process_field(str, Field(description="A name"))
+
+        info = process_field_cache_info()
+        assert info.misses == 2
+        assert info.hits == 4
+
+    def test_distinct_field_info_is_not_shared(self):
+        clear_process_field_cache()
+        _, first = process_field(str, {"description": "first"})
+        _, second = process_field(str, {"description": "second"})
+        assert first["description"] == "first"
+        assert second["description"] == "second"
+        assert process_field_cache_info().misses == 2
+
+    def test_cached_schema_is_copied(self):
+        clear_process_field_cache()
+        _, schema = process_field(List[str], {})
+        schema["items"]["type"] = "integer"
+        _, schema = process_field(List[str], {})
+        assert schema == {"type": "array", "items": {"type": "string"}}
+
+    def test_empty_container_defaults_are_not_shared(self):
+        clear_process_field_cache()
+        defaults = [[], (), {}]
+        schemas = [process_field(Any, Field(default=value))[1] for value in defaults]
+        assert [schema["default"] for schema in schemas] == [[], [], {}]
+        assert process_field_cache_info().misses == 3
+
+    def test_unhashable_field_info_bypasses_cache(self):
+        clear_process_field_cache()
+
+        class Unhashable:
+            __hash__ = None
+
+        _, schema = process_field(Annotated[str, Unhashable()], {})
+        assert schema["type"] == "string"
+        assert process_field_cache_info().currsize == 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
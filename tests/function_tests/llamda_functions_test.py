@@ -170,6 +170,150 @@ class TestLlamdaFunctions:
         assert "error" in content
         assert "test error" in content["error"].lower()
 
+    def test_schema_cache(self, decorated_functions: LlamdaFunctions):
+        first = decorated_functions.get()
+        second = decorated_functions.get()
+        assert first == second
+        assert all(a is b for a, b in zip(first, second))
+
+        info = decorated_functions.schema_cache_info()
+        assert info.misses == 3
+        assert info.hits == 3
+        assert info.currsize == 3
+
+    def test_schema_cache_invalidation(self, decorated_functions: LlamdaFunctions):
+        decorated_functions.get(["subtract"])
+        decorated_functions.tools["subtract"].description = "Take b from a"
+        schema = decorated_functions.get(["subtract"])[0]
+        assert schema["function"].get("description") == "Take b from a"
+
+        @decorated_functions.llamdafy(name="subtract")
+        def sub_again(a: int, b: int, c: int = 0) -> int:
+            """Subtract two numbers and a third."""
+            return a - b - c
+
+        schema = decorated_functions.get(["subtract"])[0]
+        assert "c" in schema["function"]["parameters"]["properties"]
+
+        info = decorated_functions.schema_cache_info()
+        assert info.misses == 3
+        assert info.hits == 0
+        assert info.invalidations == 2
+
+    def test_payload_reuse(self, decorated_functions: LlamdaFunctions):
+        payload = decorated_functions.payload(["add_numbers", "subtract"])
+        assert payload.names == ("add_numbers", "subtract")
+        assert isinstance(payload.tools, tuple)
+        assert json.loads(payload.encoded) == list(payload.tools)
+
+        assert decorated_functions.payload(["subtract", "add_numbers"]) is payload
+        assert decorated_functions.payload() is not payload
+
+        @decorated_functions.llamdafy()
+        def multiply(a: int, b: int) -> int:
+            """Multiply two numbers."""
+            return a * b
+
+        assert decorated_functions.payload(["add_numbers", "subtract"]) is not payload
+        assert len(decorated_functions.payload().tools) == 4
+
+        info = decorated_functions.payload_cache_info()
+        assert info.hits == 1
+        assert info.invalidations == 2
+
+    def test_payload_eviction(self):
+        functions = LlamdaFunctions(payload_cache_size=2)
+
+        @functions.llamdafy()
+        def one() -> int:
+            return 1
+
+        @functions.llamdafy()
+        def two() -> int:
+            return 2
+
+        functions.payload(["one"])
+        functions.payload(["two"])
+        functions.payload(["one", "two"])
+        info = functions.payload_cache_info()
+        assert info.evictions == 1
+        assert info.currsize == 2
+        assert info.maxsize == 2
+
+    def test_run_json(self, decorated_functions: LlamdaFunctions):
+        func = decorated_functions.tools["create_user"]
+        assert func.run_json('{"name": "Alice", "age": "30"}') == {
+            "name": "Alice",
+            "age": 30,
+            "email": None,
+        }
+
+    def test_run_json_keeps_nested_models(self, decorated_functions: LlamdaFunctions):
+        class Point(BaseModel):
+            x: int
+            y: int
+
+        @decorated_functions.llamdafy()
+        def norm(point: Point, scale: int = 1) -> int:
+            """Manhattan norm of a point."""
+            assert isinstance(point, Point)
+            return (abs(point.x) + abs(point.y)) * scale
+
+        call = LlToolCall(id="6", name="norm", arguments='{"point": {"x": 3, "y": -4}}')
+        assert decorated_functions.execute_function(call).result == "7"
+
+    def test_run_json_invalid(self, decorated_functions: LlamdaFunctions):
+        call = LlToolCall(id="7", name="add_numbers", arguments='{"a": 1, "b":')
+        content = json.loads(decorated_functions.execute_function(call).result)
+        assert "validation failed" in content["error"].lower()
+
+
+class TestLazyLlamdaFunctions:
+    @pytest.fixture
+    def lazy_functions(self) -> LlamdaFunctions:
+        llamda = LlamdaFunctions(lazy=True)
+
+        @llamda.llamdafy()
+        def add_numbers(a: int, b: int) -> int:
+            """Add two numbers."""
+            return a + b
+
+        @llamda.llamdafy()
+        def shout(text: str) -> str:
+            """Shout some text."""
+            return text.upper()
+
+        @llamda.llamdafy(lazy=False)
+        def whisper(text: str) -> str:
+            """Whisper some text."""
+            return text.lower()
+
+        return llamda
+
+    def test_models_are_deferred(self, lazy_functions: LlamdaFunctions):
+        assert not lazy_functions["add_numbers"].is_built
+        assert not lazy_functions["shout"].is_built
+        assert lazy_functions["whisper"].is_built
+
+    def test_run_builds_model(self, lazy_functions: LlamdaFunctions):
+        assert lazy_functions["add_numbers"].run(a=1, b=2) == 3
+        assert lazy_functions["add_numbers"].is_built
+        assert not lazy_functions["shout"].is_built
+
+    def test_schema_builds_model(self, lazy_functions: LlamdaFunctions):
+        schema = lazy_functions.get(["shout"])[0]
+        assert schema["function"]["parameters"]["required"] == ["text"]
+        assert lazy_functions["shout"].is_built
+
+    def test_warm(self, lazy_functions: LlamdaFunctions):
+        lazy_functions.warm(["add_numbers"])
+        assert lazy_functions["add_numbers"].is_built
+        assert not lazy_functions["shout"].is_built
+        assert lazy_functions.schema_cache_info().currsize == 1
+
+        lazy_functions.warm()
+        assert all(lazy_functions[name].is_built for name in lazy_functions)
+
 
 def test_llamda_function_execution_without_tool_calls(
     llamda_functions: LlamdaFunctions, mock_ll_manager: Any
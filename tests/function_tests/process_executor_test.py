@@ -0,0 +1,71 @@
+import json
+import os
+from typing import Any
+
+import pytest
+from pydantic import BaseModel
+
+from llamda_fn.functions import LlamdaFunctions
+from llamda_fn.llms.api_types import LlToolCall
+from conftest import assistant
+
+registry = LlamdaFunctions()
+
+
+@registry.llamdafy(executor="process")
+def worker_pid(offset: int) -> int:
+    """Return the worker's process id plus an offset."""
+    return os.getpid() + offset
+
+
+class Point(BaseModel):
+    x: int
+    y: int
+
+
+@registry.llamdafy(executor="process")
+def norm(point: Point) -> int:
+    """Return the squared norm of a point."""
+    return point.x**2 + point.y**2
+
+
+def call(name: str, arguments: dict[str, Any]) -> LlToolCall:
+    return LlToolCall(id=f"call_{name}", name=name, arguments=json.dumps(arguments))
+
+
+def test_process_tools_run_in_another_process(make_llamda: Any):
+    ll = make_llamda(
+        assistant("", call("worker_pid", {"offset": 1})),
+        assistant("done"),
+        functions=registry,
+        max_processes=1,
+    )
+    with ll:
+        ll("which process?")
+    result = json.loads(ll.exchange[-2].content)
+    assert isinstance(result, int)
+    assert result - 1 != os.getpid()
+
+
+def test_pydantic_arguments_are_validated_before_shipping():
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        ok = registry.execute_function(call("norm", {"x": 3, "y": 4}), pool)
+        bad = registry.execute_function(call("norm", {"x": "three"}), pool)
+    assert json.loads(ok.result) == 25
+    assert "error" in json.loads(bad.result)
+
+
+def test_without_a_pool_process_tools_run_inline():
+    result = registry.execute_function(call("worker_pid", {"offset": 0}))
+    assert json.loads(result.result) == os.getpid()
+
+
+def test_process_tools_must_be_importable():
+    functions = LlamdaFunctions()
+    with pytest.raises(ValueError):
+
+        @functions.llamdafy(executor="process")
+        def local_tool() -> None:
+            """Not reachable from a worker process."""
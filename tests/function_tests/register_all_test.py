@@ -0,0 +1,182 @@
+import sys
+import textwrap
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import pytest
+
+from llamda_fn.functions import LlamdaFunctions, ToolRegistrationError
+
+
+@pytest.fixture
+def tool_package(tmp_path: Path) -> Iterator[str]:
+    package = tmp_path / "bulk_tools"
+    package.mkdir()
+    (package / "__init__.py").write_text(textwrap.dedent('''
+            def ping() -> str:
+                """Reply with pong."""
+                return "pong"
+            '''))
+    (package / "maths.py").write_text(textwrap.dedent('''
+            from math import floor
+
+            __all__ = ["add", "mul"]
+
+            def add(a: int, b: int) -> int:
+                """Add two numbers."""
+                return a + b
+
+            def mul(a: int, b: int) -> int:
+                """Multiply two numbers."""
+                return a * b
+
+            def hidden(a: int) -> int:
+                return a
+            '''))
+    (package / "text.py").write_text(textwrap.dedent('''
+            def shout(text: str) -> str:
+                """Shout some text."""
+                return text.upper()
+
+            def _helper() -> None:
+                pass
+            '''))
+    sys.path.insert(0, str(tmp_path))
+    yield "bulk_tools"
+    sys.path.remove(str(tmp_path))
+    for name in [m for m in sys.modules if m.startswith("bulk_tools")]:
+        del sys.modules[name]
+
+
+def test_register_package(tool_package: str):
+    import importlib
+
+    functions = LlamdaFunctions()
+    report = functions.register_all(importlib.import_module(tool_package))
+
+    assert sorted(functions) == ["add", "mul", "ping", "shout"]
+    assert sorted(report.timings) == ["add", "mul", "ping", "shout"]
+    assert report.total >= max(report.timings.values())
+    assert functions["add"].run(a=2, b=3) == 5
+
+    functions.get()
+    assert functions.schema_cache_info().hits == 4
+
+
+def test_reexported_tools_are_registered_once(tmp_path: Path):
+    package = tmp_path / "reexported_tools"
+    package.mkdir()
+    (package / "__init__.py").write_text("from .maths import add, registry\n")
+    (package / "maths.py").write_text(textwrap.dedent('''
+            from llamda_fn.functions import LlamdaFunctions
+
+            registry = LlamdaFunctions()
+
+            @registry.llamdafy()
+            def add(a: int, b: int) -> int:
+                """Add two numbers."""
+                return a + b
+            '''))
+    sys.path.insert(0, str(tmp_path))
+    try:
+        import reexported_tools
+
+        functions = LlamdaFunctions()
+        functions.register_all(reexported_tools)
+        functions.register_all([reexported_tools.add, reexported_tools.add])
+    finally:
+        sys.path.remove(str(tmp_path))
+        for name in [m for m in sys.modules if m.startswith("reexported_tools")]:
+            del sys.modules[name]
+
+    assert list(functions) == ["add"]
+    assert functions["add"].run(a=2, b=3) == 5
+
+
+def test_register_iterable_lazily():
+    def one() -> int:
+        return 1
+
+    def two() -> int:
+        return 2
+
+    functions = LlamdaFunctions()
+    functions.register_all([one, two], lazy=True)
+    assert sorted(functions) == ["one", "two"]
+    assert not functions["one"].is_built
+
+
+def test_register_errors_are_aggregated():
+    class NotAType:
+        pass
+
+    def broken(x: NotAType()) -> None:  # type: ignore[valid-type]
+        pass
+
+    def also_broken(y: NotAType()) -> None:  # type: ignore[valid-type]
+        pass
+
+    def fine() -> None:
+        pass
+
+    def duplicate() -> None:
+        pass
+
+    duplicate.__name__ = "fine"
+
+    functions = LlamdaFunctions()
+    with pytest.raises(ToolRegistrationError) as error:
+        functions.register_all([broken, fine, also_broken, duplicate])
+
+    names = [name for name, _ in error.value.errors]
+    assert len(names) == 3
+    assert any("broken" in name for name in names)
+    assert any("also_broken" in name for name in names)
+    assert len(functions) == 0
+
+
+def test_fail_fast_stops_at_the_first_error(tool_package: str):
+    package = sys.modules.get(tool_package) or __import__(tool_package)
+    root = Path(package.__file__).parent
+    (root / "a_broken.py").write_text("raise RuntimeError('boom')\n")
+    (root / "z_later.py").write_text("IMPORTED = True\n")
+
+    functions = LlamdaFunctions()
+    with pytest.raises(ToolRegistrationError) as error:
+        functions.register_all(package, fail_fast=True)
+
+    assert [name for name, _ in error.value.errors] == [f"{tool_package}.a_broken"]
+    assert f"{tool_package}.z_later" not in sys.modules
+    assert len(functions) == 0
+
+
+def test_fail_fast_skips_pending_tools():
+    class NotAType:
+        pass
+
+    def broken(x: NotAType()) -> None:  # type: ignore[valid-type]
+        pass
+
+    def tool(i: int) -> Callable[[], None]:
+        def made() -> None:
+            pass
+
+        made.__name__ = made.__qualname__ = f"tool_{i}"
+        return made
+
+    functions = LlamdaFunctions()
+    created = []
+    original = functions._create
+
+    def counting_create(func: Any, *args: Any, **kwargs: Any) -> Any:
+        created.append(func.__name__)
+        return original(func, *args, **kwargs)
+
+    functions._create = counting_create  # type: ignore[method-assign]
+    tools = [broken, *(tool(i) for i in range(50))]
+    with pytest.raises(ToolRegistrationError) as error:
+        functions.register_all(tools, max_workers=1, fail_fast=True)
+
+    assert len(error.value.errors) == 1
+    assert len(created) < len(tools)
+    assert len(functions) == 0
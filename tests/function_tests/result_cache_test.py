@@ -0,0 +1,103 @@
+import json
+from pathlib import Path
+
+from llamda_fn.functions import LlamdaFunctions
+from llamda_fn.llms.api_types import LlToolCall
+from llamda_fn.utils.cache import LRUCache, SQLiteCache
+
+
+def call(arguments: str, name: str = "convert") -> LlToolCall:
+    return LlToolCall(id="c", name=name, arguments=arguments)
+
+
+def test_results_are_cached_by_canonical_arguments():
+    functions = LlamdaFunctions()
+    calls = []
+
+    @functions.llamdafy(cache=True)
+    def convert(amount: float, currency: str) -> float:
+        """Convert an amount to a currency."""
+        calls.append((amount, currency))
+        return amount * 2
+
+    first = functions.execute_function(call('{"amount": 1, "currency": "EUR"}'))
+    second = functions.execute_function(call('{"currency":"EUR","amount":1}'))
+    assert first.result == second.result == "2.0"
+    assert len(calls) == 1
+
+    info = functions.result_cache_info()["convert"]
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+
+def test_errors_are_not_cached():
+    functions = LlamdaFunctions()
+
+    @functions.llamdafy(cache=LRUCache(8, ttl=60))
+    def convert(amount: float) -> float:
+        """Convert an amount."""
+        return amount
+
+    for _ in range(2):
+        result = functions.execute_function(call('{"amount": "lots"}'))
+        assert "error" in json.loads(result.result)
+    assert functions.result_cache_info()["convert"].currsize == 0
+
+
+def test_uncached_tools_always_run():
+    functions = LlamdaFunctions()
+    calls = []
+
+    @functions.llamdafy()
+    def convert(amount: float) -> float:
+        """Convert an amount."""
+        calls.append(amount)
+        return amount
+
+    functions.execute_function(call('{"amount": 1}'))
+    functions.execute_function(call('{"amount": 1}'))
+    assert len(calls) == 2
+    assert functions.result_cache_info() == {}
+
+
+def test_sqlite_store_survives_the_registry(tmp_path: Path):
+    def make() -> tuple[LlamdaFunctions, list[int]]:
+        functions = LlamdaFunctions()
+        calls: list[int] = []
+
+        @functions.llamdafy(cache=SQLiteCache(tmp_path / "results.db"))
+        def square(x: int) -> int:
+            """Square a number."""
+            calls.append(x)
+            return x * x
+
+        return functions, calls
+
+    functions, calls = make()
+    assert functions.execute_function(call('{"x": 3}', "square")).result == "9"
+    functions, calls = make()
+    assert functions.execute_function(call('{"x": 3}', "square")).result == "9"
+    assert calls == []
+    assert functions.result_cache_info()["square"].hits == 1
+
+
+def test_clearing_one_tool_keeps_the_others_in_a_shared_store(tmp_path: Path):
+    for store in (LRUCache(16), SQLiteCache(tmp_path / "shared.db")):
+        functions = LlamdaFunctions()
+
+        @functions.llamdafy(cache=store)
+        def double(x: int) -> int:
+            """Double a number."""
+            return x * 2
+
+        @functions.llamdafy(cache=store)
+        def triple(x: int) -> int:
+            """Triple a number."""
+            return x * 3
+
+        for name in ("double", "triple"):
+            functions.execute_function(call('{"x": 2}', name))
+        functions.clear_result_cache("double")
+
+        functions.execute_function(call('{"x": 2}', "triple"))
+        assert functions.result_cache_info()["triple"].hits == 1
+        assert store.info().currsize == 1
@@ -0,0 +1,103 @@
+import json
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from llamda_fn.functions import LlamdaFunctions, SchemaStore
+from llamda_fn.functions.schema_store import main, tool_fingerprint
+
+
+class Address(BaseModel):
+    street: str
+    city: str
+
+
+def register(functions: LlamdaFunctions) -> None:
+    @functions.llamdafy()
+    def add(a: int, b: int = 0) -> int:
+        """Add two numbers."""
+        return a + b
+
+    @functions.llamdafy()
+    def geocode(address: Address) -> str:
+        """Geocode an address."""
+        return address.city
+
+
+def test_schemas_are_reused_across_registries(tmp_path: Path):
+    path = tmp_path / "schemas.json"
+
+    first = LlamdaFunctions(schema_store=SchemaStore(path))
+    register(first)
+    expected = first.get()
+    first.schema_store.save()
+    assert first.schema_store.info().misses == 2
+
+    second = LlamdaFunctions(lazy=True, schema_store=SchemaStore(path))
+    register(second)
+    assert second.get() == expected
+    assert not second["add"].is_built
+    assert second.schema_store.info().hits == 2
+    assert second.schema_store.info().misses == 0
+
+
+def test_fingerprint_tracks_changes():
+    functions = LlamdaFunctions()
+    register(functions)
+    before = tool_fingerprint(functions["add"])
+    assert before == tool_fingerprint(functions["add"])
+
+    functions["add"].description = "Sum two numbers."
+    assert tool_fingerprint(functions["add"]) != before
+
+    @functions.llamdafy(name="add")
+    def add(a: int, b: int = 1) -> int:
+        """Add two numbers."""
+        return a + b
+
+    assert tool_fingerprint(functions["add"]) not in (before, None)
+
+
+def test_unreadable_store_is_ignored(tmp_path: Path):
+    path = tmp_path / "schemas.json"
+    path.write_text("{not json")
+    store = SchemaStore(path)
+    assert len(store) == 0
+
+    functions = LlamdaFunctions(schema_store=store)
+    register(functions)
+    functions.get()
+    store.save()
+    assert json.loads(path.read_text())["version"] == 1
+
+
+def test_prune(tmp_path: Path):
+    path = tmp_path / "schemas.json"
+    store = SchemaStore(path)
+    store.put("stale", {"type": "function", "function": {"name": "stale"}})
+    store.save()
+
+    functions = LlamdaFunctions(schema_store=SchemaStore(path))
+    register(functions)
+    functions.get()
+    functions.schema_store.save(prune=True)
+    assert len(SchemaStore(path)) == 2
+
+
+def test_cli_prebuild(tmp_path: Path, monkeypatch, capsys):
+    (tmp_path / "prebuilt_tools.py").write_text(
+        "def ping() -> str:\n"
+        '    """Reply with pong."""\n'
+        '    return "pong"\n'
+        "\n"
+        "def echo(text: str) -> str:\n"
+        "    return text\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    path = tmp_path / "schemas.json"
+
+    main([str(path), "prebuilt_tools"])
+    assert "2 tools: 0 schemas reused, 2 generated" in capsys.readouterr().out
+
+    main([str(path), "prebuilt_tools"])
+    assert "2 tools: 2 schemas reused, 0 generated" in capsys.readouterr().out
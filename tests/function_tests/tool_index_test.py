@@ -0,0 +1,70 @@
+import pytest
+
+from llamda_fn.functions import LlamdaFunctions, ToolIndex
+from llamda_fn.functions.tool_index import tokenize
+
+
+def test_tokenize():
+    assert tokenize("get_weather forCity HTTPServer v2") == [
+        "get",
+        "weather",
+        "for",
+        "city",
+        "http",
+        "server",
+        "v",
+        "2",
+    ]
+
+
+class TestToolIndex:
+    @pytest.fixture
+    def index(self) -> ToolIndex:
+        index = ToolIndex()
+        index.add("get_weather", "get_weather Get the weather forecast for a city city")
+        index.add("convert_currency", "convert_currency Convert an amount amount")
+        index.add("send_email", "send_email Send an email to a recipient body")
+        return index
+
+    def test_search_ranks_relevant_tools(self, index: ToolIndex):
+        assert index.search("what's the weather in Paris?", 2) == ["get_weather"]
+        assert index.search("convert 10 euros to another currency", 1) == [
+            "convert_currency"
+        ]
+
+    def test_search_within_names(self, index: ToolIndex):
+        assert index.search("weather email", 3, names=["send_email"]) == ["send_email"]
+
+    def test_incremental_updates(self, index: ToolIndex):
+        index.add("get_weather", "get_weather Look up stock prices")
+        assert index.search("weather forecast", 3) == ["get_weather"]
+        assert index.search("stock prices", 3) == ["get_weather"]
+
+        index.remove("get_weather")
+        assert "get_weather" not in index
+        assert index.search("weather", 3) == []
+        assert len(index) == 2
+
+
+def test_llamda_functions_search():
+    functions = LlamdaFunctions()
+
+    @functions.llamdafy()
+    def get_weather(city: str) -> str:
+        """Get the weather forecast for a city."""
+        return "sunny"
+
+    @functions.llamdafy()
+    def convert_currency(amount: float, currency: str) -> float:
+        """Convert money between currencies."""
+        return amount
+
+    assert functions.search("forecast for Rome", 5) == ["get_weather"]
+
+    @functions.llamdafy()
+    def get_time(city: str) -> str:
+        """Get the local time in a city."""
+        return "noon"
+
+    assert functions.search("local time in Rome", 1) == ["get_time"]
+    assert set(functions.search("city", 5)) == {"get_weather", "get_time"}
@@ -0,0 +1,109 @@
+import asyncio
+import json
+from typing import AsyncIterator, Iterator
+
+import pytest
+
+from llamda_fn.functions import LlamdaFunctions
+from llamda_fn.functions.tool_output import collect_output
+from llamda_fn.llms.api_types import LlToolCall
+
+
+def call(name: str, arguments: str = "{}") -> LlToolCall:
+    return LlToolCall(id="c1", name=name, arguments=arguments)
+
+
+def test_collect_output_keeps_a_bounded_prefix():
+    output = collect_output((f"line {i}" for i in range(1000)), max_output=40)
+    assert output.truncated
+    assert "".join(output.chunks).startswith("line 0line 1")
+    assert sum(len(json.dumps(chunk)) for chunk in output.chunks) <= 40
+    assert output.omitted_chunks > 990
+    assert output.omitted_chars > 0
+
+
+def test_collect_output_cuts_an_oversized_string_chunk():
+    output = collect_output(["x" * 100], max_output=12)
+    assert output.chunks == ["x" * 10]
+    assert output.omitted_chars == 90 and output.omitted_chunks == 0
+
+
+def test_collect_output_cuts_by_encoded_size():
+    for text in ['"' * 100, "\n" * 100, "é" * 100, "😀" * 100]:
+        output = collect_output([text], max_output=32)
+        assert 0 < len(json.dumps(output.chunks[0])) <= 32
+        assert output.omitted_chars == len(json.dumps(text)) - len(
+            json.dumps(output.chunks[0])
+        )
+
+
+def test_collect_output_keeps_nothing_after_the_first_overflow():
+    output = collect_output([{"a": "x" * 100}, "hello"], max_output=50)
+    assert output.chunks == []
+    assert output.truncated and output.omitted_chunks == 2
+
+
+def test_generator_tools_are_consumed_incrementally():
+    functions = LlamdaFunctions()
+    produced = []
+
+    @functions.llamdafy(max_output=50)
+    def search_logs(pattern: str) -> Iterator[dict]:
+        """Search the logs for a pattern."""
+        for i in range(10_000):
+            produced.append(i)
+            yield {"line": i, "match": pattern}
+
+    result = json.loads(
+        functions.execute_function(call("search_logs", '{"pattern": "err"}')).result
+    )
+    assert len(produced) == 10_000
+    assert result["chunks"] == [{"line": 0, "match": "err"}]
+    assert result["truncated"] is True
+    assert result["omitted_chunks"] == 9_999
+
+
+def test_a_zero_max_output_keeps_no_chunks():
+    functions = LlamdaFunctions()
+
+    @functions.llamdafy(max_output=0)
+    def stream() -> Iterator[str]:
+        """Stream a few lines."""
+        yield from ("a", "b")
+
+    result = json.loads(functions.execute_function(call("stream")).result)
+    assert result["chunks"] == []
+    assert result["truncated"] is True and result["omitted_chunks"] == 2
+
+
+def test_async_generator_tools_in_both_paths():
+    functions = LlamdaFunctions()
+
+    @functions.llamdafy()
+    async def read_file() -> AsyncIterator[str]:
+        """Read a file in chunks."""
+        for chunk in ("a", "b", "c"):
+            await asyncio.sleep(0)
+            yield chunk
+
+    assert functions["read_file"].is_async_generator
+    expected = {
+        "chunks": ["a", "b", "c"],
+        "truncated": False,
+        "omitted_chunks": 0,
+        "omitted_chars": 0,
+    }
+    sync_result = functions.execute_function(call("read_file"))
+    async_result = asyncio.run(functions.aexecute_function(call("read_file")))
+    assert json.loads(sync_result.result) == json.loads(async_result.result) == expected
+
+
+def test_generator_tools_cannot_run_in_a_process_pool():
+    functions = LlamdaFunctions()
+    with pytest.raises(ValueError, match="generator"):
+        functions.llamdafy(executor="process")(numbers)
+
+
+def numbers() -> Iterator[int]:
+    """A module-level generator."""
+    yield 1
@@ -0,0 +1,54 @@
+"""
+Import-time regression checks for `import llamda_fn`.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Cumulative microseconds `python -X importtime` may report for llamda_fn.
+IMPORT_BUDGET_US = 500_000
+
+HEAVY_MODULES = ["openai", "httpx", "rich", "dotenv"]
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _run(*args: str) -> "subprocess.CompletedProcess[str]":
+    """Run the interpreter on this checkout, wherever pytest was started."""
+    path = os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")]))
+    return subprocess.run(
+        [sys.executable, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=REPO_ROOT,
+        env={**os.environ, "PYTHONPATH": path},
+    )
+
+
+def _import_time_us() -> int:
+    completed = _run("-X", "importtime", "-c", "import llamda_fn")
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == "llamda_fn":
+            return int(parts[1])
+    raise AssertionError(
+        f"llamda_fn not found in importtime output:\n{completed.stderr}"
+    )
+
+
+def test_heavy_dependencies_are_not_imported():
+    completed = _run(
+        "-c",
+        "import sys, llamda_fn; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))",
+    )
+    assert completed.stdout.strip() == ""
+
+
+def test_import_time_budget():
+    best = min(_import_time_us() for _ in range(3))
+    assert best < IMPORT_BUDGET_US, f"import llamda_fn took {best}us"
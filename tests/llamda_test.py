@@ -1,6 +1,14 @@
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
 from typing import Any
 from llamda_fn.functions import LlamdaFunctions
 from llamda_fn.llms.api_types import LLMessage, ToolResponse, LlToolCall
+from llamda_fn.utils.concurrency import SingleFlight
+from llamda_fn.utils.logger import logger
+from conftest import assistant
 
 
 def test_llamda_function_execution_with_tool_calls(
@@ -53,3 +61,415 @@ def test_llamda_function_execution_without_tool_calls(
     assert mock_ll_manager.call_count == 1
 
     # No need to reset call_count here, as it should be reset in the fixture for each test
+
+
+def test_llamda_run_with_max_tools(make_llamda: Any):
+    ll = make_llamda(assistant("It is sunny."))
+
+    @ll.fy()
+    def get_weather(city: str) -> str:
+        """Get the weather forecast for a city."""
+        return "sunny"
+
+    @ll.fy()
+    def send_email(to: str, body: str) -> None:
+        """Send an email."""
+
+    @ll.fy()
+    def convert_currency(amount: float, currency: str) -> float:
+        """Convert money between currencies."""
+        return amount
+
+    response = ll("What's the weather forecast in Rome?", max_tools=2)
+    assert response.content == "It is sunny."
+
+    tools = ll.api.requests[0]["tools"]
+    assert [tool["function"]["name"] for tool in tools] == ["get_weather"]
+
+
+def test_llamda_run_tool_loop(make_llamda: Any):
+    ll = make_llamda(
+        assistant("", LlToolCall(id="c1", name="add", arguments='{"x": 2, "y": 3}')),
+        assistant("The answer is 5."),
+    )
+
+    @ll.fy()
+    def add(x: int, y: int) -> int:
+        """Add two numbers."""
+        return x + y
+
+    response = ll("What is 2 + 3?")
+    assert response.content == "The answer is 5."
+    assert [message.role for message in ll.exchange] == [
+        "user",
+        "assistant",
+        "tool",
+        "assistant",
+    ]
+    assert ll.exchange[2].content == "5"
+    assert len(ll.api.requests) == 2
+
+
+def test_llamda_arun_async_tools(make_llamda: Any):
+    calls = [
+        LlToolCall(id=f"c{i}", name="fetch", arguments=f'{{"i": {i}}}')
+        for i in range(100)
+    ]
+    ll = make_llamda(
+        assistant("", *calls, LlToolCall(id="s", name="square", arguments='{"x": 4}')),
+        assistant("Done."),
+    )
+
+    @ll.fy()
+    async def fetch(i: int) -> int:
+        """Fetch a number, slowly."""
+        await asyncio.sleep(0.2)
+        return i
+
+    @ll.fy()
+    def square(x: int) -> int:
+        """Square a number."""
+        return x * x
+
+    assert ll.functions["fetch"].is_async
+    assert not ll.functions["square"].is_async
+
+    threads_before = threading.active_count()
+    started = time.perf_counter()
+    response = asyncio.run(ll.acall("Fetch everything"))
+    elapsed = time.perf_counter() - started
+
+    assert response.content == "Done."
+    assert elapsed < 2
+    assert threading.active_count() - threads_before < 10
+    results = [message.content for message in ll.exchange if message.role == "tool"]
+    assert sorted(results) == sorted([str(i) for i in range(100)] + ["16"])
+
+
+def test_execute_async_tool_synchronously():
+    functions = LlamdaFunctions()
+
+    @functions.llamdafy()
+    async def double(x: int) -> int:
+        """Double a number."""
+        await asyncio.sleep(0)
+        return 2 * x
+
+    call = LlToolCall(id="1", name="double", arguments='{"x": 21}')
+    assert functions.execute_function(call).result == "42"
+
+
+def test_llamda_tool_timeout_does_not_stall_the_exchange(make_llamda: Any):
+    ll = make_llamda(
+        assistant(
+            "",
+            LlToolCall(id="slow", name="slow", arguments="{}"),
+            LlToolCall(id="fast", name="fast", arguments="{}"),
+        ),
+        assistant("Done."),
+    )
+    release = threading.Event()
+
+    @ll.fy(timeout=0.05)
+    def slow() -> str:
+        """Wait for a release that does not come in time."""
+        release.wait(5)
+        return "late"
+
+    @ll.fy()
+    def fast() -> str:
+        """Answer immediately."""
+        return "ok"
+
+    start = time.monotonic()
+    assert ll("Go").content == "Done."
+    assert time.monotonic() - start < 1
+    release.set()
+
+    results = {m.id: json.loads(m.content) for m in (ll.exchange[2], ll.exchange[3])}
+    assert results["fast"] == "ok"
+    assert results["slow"]["timed_out"] is True
+    ll.close()
+
+
+def queued_behind_busy_worker(make_llamda: Any) -> Any:
+    ll = make_llamda(
+        assistant(
+            "",
+            LlToolCall(id="busy", name="busy", arguments="{}"),
+            LlToolCall(id="quick", name="quick", arguments="{}"),
+        ),
+        assistant("Done."),
+        max_workers=1,
+    )
+
+    @ll.fy()
+    def busy() -> str:
+        """Hold the only worker for longer than quick's timeout."""
+        time.sleep(0.3)
+        return "done"
+
+    @ll.fy(timeout=0.1)
+    def quick() -> str:
+        """Answer immediately once running."""
+        return "ok"
+
+    return ll
+
+
+def test_tool_timeouts_start_when_the_call_runs(make_llamda: Any):
+    ll = queued_behind_busy_worker(make_llamda)
+    assert ll("Go").content == "Done."
+    results = {m.id: json.loads(m.content) for m in (ll.exchange[2], ll.exchange[3])}
+    assert results == {"busy": "done", "quick": "ok"}
+    ll.close()
+
+
+def test_async_tool_timeouts_start_when_the_call_runs(make_llamda: Any):
+    ll = queued_behind_busy_worker(make_llamda)
+    assert asyncio.run(ll.acall("Go")).content == "Done."
+    results = {m.id: json.loads(m.content) for m in (ll.exchange[2], ll.exchange[3])}
+    assert results == {"busy": "done", "quick": "ok"}
+    ll.close()
+
+
+def test_limited_tools_wait_without_holding_workers(make_llamda: Any):
+    ll = make_llamda(
+        assistant(
+            "",
+            *(
+                LlToolCall(id=f"f{i}", name="fragile", arguments=f'{{"i": {i}}}')
+                for i in range(3)
+            ),
+            LlToolCall(id="free", name="free", arguments="{}"),
+        ),
+        assistant("Done."),
+        max_workers=2,
+    )
+    ran = {}
+    start = time.monotonic()
+
+    @ll.fy(max_concurrency=1)
+    def fragile(i: int) -> int:
+        """Call a service that takes one caller at a time."""
+        time.sleep(0.15)
+        return i
+
+    @ll.fy()
+    def free() -> str:
+        """Answer immediately."""
+        ran["free"] = time.monotonic() - start
+        return "ok"
+
+    assert ll("Go").content == "Done."
+    assert ran["free"] < 0.1
+    ll.close()
+
+
+def test_calls_waiting_on_a_limit_are_dropped_at_the_deadline(make_llamda: Any):
+    ll = make_llamda(
+        assistant(
+            "",
+            *(
+                LlToolCall(id=f"f{i}", name="fragile", arguments=f'{{"i": {i}}}')
+                for i in range(2)
+            ),
+        ),
+        assistant("Gave up."),
+    )
+    ran = []
+
+    @ll.fy(max_concurrency=1)
+    def fragile(i: int) -> int:
+        """Call a service that takes one caller at a time."""
+        ran.append(i)
+        time.sleep(0.2)
+        return i
+
+    assert ll("Go", deadline=0.05).content == "Gave up."
+    time.sleep(0.3)
+    assert ran == [0]
+    assert ll.functions.limit_stats()["fragile"].active == 0
+    ll.close()
+
+
+def test_llamda_run_deadline(make_llamda: Any):
+    ll = make_llamda(
+        assistant("", LlToolCall(id="c1", name="wait", arguments="{}")),
+        assistant("Gave up."),
+    )
+    release = threading.Event()
+
+    @ll.fy()
+    def wait() -> None:
+        """Wait for a release."""
+        release.wait(5)
+
+    assert ll("Go", deadline=0.05).content == "Gave up."
+    release.set()
+    assert json.loads(ll.exchange[2].content)["timed_out"] is True
+    ll.close()
+
+
+def test_llamda_arun_cancels_timed_out_async_tools(make_llamda: Any):
+    ll = make_llamda(
+        assistant("", LlToolCall(id="c1", name="sleepy", arguments="{}")),
+        assistant("Done."),
+    )
+    cancelled = []
+
+    @ll.fy(timeout=0.05)
+    async def sleepy() -> None:
+        """Sleep for a long time."""
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    assert asyncio.run(ll.acall("Go")).content == "Done."
+    assert cancelled == [True]
+    assert json.loads(ll.exchange[2].content)["timed_out"] is True
+
+
+def test_llamda_deduplicates_identical_tool_calls(make_llamda: Any):
+    ll = make_llamda(
+        assistant(
+            "",
+            LlToolCall(id="a", name="lookup", arguments='{"key": "x", "n": 1}'),
+            LlToolCall(id="b", name="lookup", arguments='{"n": 1, "key": "x"}'),
+            LlToolCall(id="c", name="lookup", arguments='{"key": "y", "n": 1}'),
+        ),
+        assistant("Done."),
+    )
+    calls = []
+
+    @ll.fy()
+    def lookup(key: str, n: int) -> str:
+        """Look up a key."""
+        calls.append(key)
+        return key * n
+
+    ll("Go")
+    assert sorted(calls) == ["x", "y"]
+    results = {ll.exchange[i].id: ll.exchange[i].content for i in (2, 3, 4)}
+    assert results == {"a": '"x"', "b": '"x"', "c": '"y"'}
+
+
+def test_tools_can_opt_out_of_deduplication(make_llamda: Any):
+    ll = make_llamda(
+        assistant(
+            "",
+            LlToolCall(id="a", name="send", arguments='{"text": "hi"}'),
+            LlToolCall(id="b", name="send", arguments='{"text": "hi"}'),
+        ),
+        assistant("Done."),
+    )
+    sent = []
+
+    @ll.fy(dedupe=False)
+    def send(text: str) -> int:
+        """Send a message."""
+        sent.append(text)
+        return len(sent)
+
+    ll("Go")
+    assert sent == ["hi", "hi"]
+    assert sorted(ll.exchange[i].content for i in (2, 3)) == ["1", "2"]
+
+
+def test_llamda_shares_in_flight_calls_across_exchanges(make_llamda: Any):
+    flight: SingleFlight[Any, Any] = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def tool_call(id: str) -> LLMessage:
+        return assistant("", LlToolCall(id=id, name="slow", arguments="{}"))
+
+    def make(id: str) -> Any:
+        ll = make_llamda(tool_call(id), assistant("Done."), dedupe=flight)
+
+        @ll.fy()
+        def slow() -> int:
+            """Run slowly."""
+            calls.append(1)
+            release.wait(5)
+            return 7
+
+        return ll
+
+    first, second = make("a"), make("b")
+    threads = [threading.Thread(target=ll, args=("Go",)) for ll in (first, second)]
+    for thread in threads:
+        thread.start()
+    while flight.stats().executed + flight.stats().shared < 2:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert first.exchange[2].id == "a" and second.exchange[2].id == "b"
+    assert first.exchange[2].content == second.exchange[2].content == "7"
+
+
+def count_call(i: int) -> LLMessage:
+    return assistant("", LlToolCall(id=f"c{i}", name="count", arguments="{}"))
+
+
+def test_llamda_run_loop_is_iterative(make_llamda: Any, monkeypatch: Any):
+    monkeypatch.setattr(logger, "_console", SimpleNamespace(log=lambda *a, **k: None))
+    steps = 1200
+    ll = make_llamda(*map(count_call, range(steps)), assistant("Counted."))
+    counted = []
+
+    @ll.fy()
+    def count() -> int:
+        """Count a call."""
+        counted.append(1)
+        return len(counted)
+
+    summary = ll.run_loop()
+    assert summary.message.content == "Counted."
+    assert summary.stop_reason == "done"
+    assert len(summary.steps) == steps + 1
+    assert summary.tool_calls == len(counted) == steps
+    assert all(step.completion >= 0 for step in summary.steps)
+    assert ll.last_summary is summary
+
+
+def test_llamda_run_stops_at_max_steps(make_llamda: Any):
+    ll = make_llamda(*map(count_call, range(5)))
+
+    @ll.fy()
+    def count() -> int:
+        """Count a call."""
+        return 1
+
+    message = ll("Count forever", max_steps=3)
+    summary = ll.last_summary
+    assert summary is not None and summary.stop_reason == "max_steps"
+    assert message.tool_calls and message.tool_calls[0].id == "c2"
+    assert summary.tool_calls == 2 and len(ll.api.requests) == 3
+    assert json.loads(ll.exchange[-1].content)["skipped"] is True
+
+
+def test_llamda_arun_stops_at_max_tool_calls(make_llamda: Any):
+    ll = make_llamda(
+        *map(count_call, range(2)),
+        assistant(
+            "",
+            LlToolCall(id="c3", name="count", arguments="{}"),
+            LlToolCall(id="c4", name="count", arguments="{}"),
+        ),
+    )
+
+    @ll.fy()
+    async def count() -> int:
+        """Count a call."""
+        return 1
+
+    summary = asyncio.run(ll.arun_loop(max_tool_calls=2))
+    assert summary.stop_reason == "max_tool_calls"
+    assert summary.tool_calls == 2
+    assert summary.steps[-1].tool_calls == 0
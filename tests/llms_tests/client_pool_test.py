@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from llamda_fn import Llamda
+from llamda_fn.llms.api import LlmApiConfig
+from llamda_fn.llms.client_pool import ClientRegistry
+from llamda_fn.llms.exchange import Exchange
+from llamda_fn.llms.llm_manager import AsyncLLManager, LLManager
+from fake_openai import FakeOpenAI
+
+
+@pytest.fixture
+def server():
+    with FakeOpenAI() as fake:
+        yield fake
+
+
+@pytest.fixture
+def registry():
+    clients = ClientRegistry()
+    yield clients
+    clients.close()
+
+
+def ask(text: str) -> Exchange:
+    exchange = Exchange()
+    exchange.ask(text)
+    return exchange
+
+
+def test_managers_reuse_one_connection(server: FakeOpenAI, registry: ClientRegistry):
+    for i in range(10):
+        with LLManager(
+            llm_name="gpt-test",
+            shared_client=registry,
+            base_url=server.base_url,
+            api_key="test",
+        ) as api:
+            api.chat_completion(ask(f"question {i}"), "")
+
+    assert server.connections == 1
+    [stats] = registry.stats()
+    assert (stats.leases, stats.users) == (10, 0)
+    assert (stats.requests, stats.connections, stats.reused) == (10, 1, 9)
+
+
+def test_clients_are_keyed_by_endpoint_and_credentials(registry: ClientRegistry):
+    config = LlmApiConfig(base_url="http://a.test/v1", api_key="one")
+    same = registry.client(config)
+    assert registry.client(config) is same
+    assert registry.client(config.model_copy(update={"api_key": "two"})) is not same
+    assert registry.client(config.model_copy(update={"timeout": 5.0})) is not same
+    assert registry.client(LlmApiConfig(base_url="http://b.test/v1")) is not same
+    assert len(registry.stats()) == 4
+
+
+def test_closing_a_manager_keeps_the_shared_client_open(
+    server: FakeOpenAI, registry: ClientRegistry
+):
+    first = LLManager(shared_client=registry, base_url=server.base_url, api_key="x")
+    second = LLManager(shared_client=registry, base_url=server.base_url, api_key="x")
+    first.close()
+    first.close()
+    assert registry.stats()[0].users == 1
+    second.chat_completion(ask("still open?"), "gpt-test")
+    second.close()
+
+    registry.close()
+    assert registry.stats() == []
+    unshared = LLManager(base_url=server.base_url, api_key="x")
+    unshared.close()
+    assert unshared.is_closed()
+
+
+def test_async_clients_are_shared_per_event_loop(
+    server: FakeOpenAI, registry: ClientRegistry
+):
+    async def main() -> None:
+        managers = [
+            AsyncLLManager(
+                llm_name="gpt-test",
+                shared_client=registry,
+                base_url=server.base_url,
+                api_key="test",
+            )
+            for _ in range(5)
+        ]
+        await asyncio.gather(*(api.chat_completion(ask("hi"), "") for api in managers))
+        for api in managers:
+            await api.close()
+        await registry.aclose()
+
+    asyncio.run(main())
+    asyncio.run(main())
+    assert server.connections <= 10
+    assert len(server.requests) == 10
+
+
+def test_async_managers_made_outside_a_loop_lease_per_loop(
+    server: FakeOpenAI, registry: ClientRegistry
+):
+    api = AsyncLLManager(
+        llm_name="gpt-test",
+        shared_client=registry,
+        base_url=server.base_url,
+        api_key="test",
+        max_retries=0,
+    )
+
+    async def ask_twice() -> None:
+        for i in range(2):
+            await api.chat_completion(ask(f"question {i}"), "")
+
+    asyncio.run(ask_twice())
+    asyncio.run(ask_twice())
+    stats = registry.stats()
+    assert [(s.requests, s.reused, s.users) for s in stats] == [(2, 1, 1)] * 2
+
+    asyncio.run(api.close())
+    assert all(s.users == 0 for s in registry.stats())
+
+
+def test_llamda_instances_share_the_pool(server: FakeOpenAI, registry: ClientRegistry):
+    for i in range(3):
+        with Llamda(
+            llm_name="gpt-test",
+            shared_client=registry,
+            base_url=server.base_url,
+            api_key="test",
+        ) as ll:
+            assert ll(f"question {i}").content == "ok"
+    assert server.connections == 1
+    assert registry.stats()[0].reused == 2
@@ -0,0 +1,133 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from llamda_fn import Llamda
+from llamda_fn.llms.completion_cache import CompletionCache, request_key
+from llamda_fn.llms.exchange import Exchange
+from llamda_fn.llms.llm_manager import AsyncLLManager, LLManager
+from llamda_fn.llms.resilience import CompletionError
+from fake_openai import FakeOpenAI
+
+
+def call_tool(request: Dict[str, Any]) -> Dict[str, Any]:
+    arguments = json.dumps({"a": 2, "b": 3})
+    tool_call = {
+        "id": f"call_{len(request['messages'])}",
+        "type": "function",
+        "function": {"name": "multiply", "arguments": arguments},
+    }
+    return {"role": "assistant", "content": None, "tool_calls": [tool_call]}
+
+
+@pytest.fixture
+def server():
+    with FakeOpenAI(responder=call_tool) as fake:
+        yield fake
+
+
+def manager(server: FakeOpenAI, cache: Any) -> LLManager:
+    return LLManager(
+        llm_name="gpt-test",
+        completion_cache=cache,
+        base_url=server.base_url,
+        api_key="test",
+        max_retries=0,
+    )
+
+
+def ask(text: str = "hi") -> Exchange:
+    exchange = Exchange()
+    exchange.ask(text)
+    return exchange
+
+
+def test_identical_requests_are_answered_from_the_cache(server: FakeOpenAI):
+    with manager(server, True) as api:
+        first = api.chat_completion(ask(), "", temperature=0)
+        second = api.chat_completion(ask(), "", temperature=0)
+        api.chat_completion(ask(), "", temperature=1)
+    assert len(server.requests) == 2
+    assert first.message.meta and first.message.meta.cache == "miss"
+    assert second.message.meta and second.message.meta.cache == "hit"
+    assert second.message.tool_calls == first.message.tool_calls
+    assert second.message.id == first.message.id
+
+
+def test_request_keys_ignore_key_order():
+    one = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "seed": 1}
+    other = {"seed": 1, "messages": [{"content": "hi", "role": "user"}], "model": "m"}
+    assert request_key(one) == request_key(other)
+    assert request_key(one) != request_key({**one, "seed": 2})
+
+
+def test_disk_cache_is_shared_between_managers(server: FakeOpenAI, tmp_path: Path):
+    path = tmp_path / "completions.sqlite"
+    with manager(server, CompletionCache(path=path)) as api:
+        api.chat_completion(ask(), "")
+    with manager(server, CompletionCache(path=path)) as api:
+        completion = api.chat_completion(ask(), "")
+    assert completion.message.meta and completion.message.meta.cache == "hit"
+    assert len(server.requests) == 1
+
+
+def test_failures_are_not_cached(server: FakeOpenAI):
+    cache = CompletionCache()
+    server.fail_next(500)
+    with manager(server, cache) as api:
+        with pytest.raises(CompletionError):
+            api.chat_completion(ask(), "")
+        assert api.chat_completion(ask(), "").message.tool_calls
+    assert cache.info().currsize == 1
+
+
+def test_concurrent_identical_requests_share_one_call(server: FakeOpenAI):
+    server.latency = 0.05
+    cache = CompletionCache()
+
+    async def main() -> list[str]:
+        api = AsyncLLManager(
+            llm_name="gpt-test",
+            completion_cache=cache,
+            base_url=server.base_url,
+            api_key="test",
+        )
+        async with api:
+            completions = await asyncio.gather(
+                *(api.chat_completion(ask(), "") for _ in range(5))
+            )
+        return [c.message.meta.cache for c in completions if c.message.meta]
+
+    statuses = asyncio.run(main())
+    assert sorted(statuses) == ["hit"] * 4 + ["miss"]
+    assert len(server.requests) == 1
+
+
+def test_llamda_replays_whole_runs(server: FakeOpenAI):
+    def tool_then_answer(request: Dict[str, Any]) -> Dict[str, Any]:
+        if request["messages"][-1]["role"] == "tool":
+            return {"role": "assistant", "content": request["messages"][-1]["content"]}
+        return call_tool(request)
+
+    server.responder = tool_then_answer
+    cache = CompletionCache()
+    answers = []
+    for _ in range(2):
+        with Llamda(
+            llm_name="gpt-test",
+            completion_cache=cache,
+            base_url=server.base_url,
+            api_key="test",
+        ) as ll:
+
+            @ll.fy()
+            def multiply(a: int, b: int) -> int:
+                """Multiply two numbers."""
+                return a * b
+
+            answers.append(ll("what is 2 times 3?").content)
+    assert answers == ["6", "6"]
+    assert len(server.requests) == 2
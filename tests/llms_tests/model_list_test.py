@@ -0,0 +1,140 @@
+import asyncio
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pytest
+
+from llamda_fn import Llamda
+from llamda_fn.llms.exchange import Exchange
+from llamda_fn.llms.llm_manager import AsyncLLManager, LLManager
+from llamda_fn.llms.model_list import ModelListCache
+from fake_openai import FakeOpenAI
+
+
+@pytest.fixture
+def server():
+    with FakeOpenAI(models=("gpt-test", "gpt-other")) as fake:
+        yield fake
+
+
+def ask(text: str) -> Exchange:
+    exchange = Exchange()
+    exchange.ask(text)
+    return exchange
+
+
+def test_construction_makes_no_requests(server: FakeOpenAI):
+    cache = ModelListCache()
+    for _ in range(5):
+        LLManager(
+            llm_name="gpt-test",
+            validate_llm=True,
+            model_cache=cache,
+            base_url=server.base_url,
+            api_key="test",
+        ).close()
+    with Llamda(llm_name="gpt-test", base_url=server.base_url, api_key="test"):
+        pass
+    assert server.model_list_requests == 0
+    assert server.requests == []
+
+
+def test_validation_lists_models_once_for_all_managers(server: FakeOpenAI):
+    cache = ModelListCache()
+    for _ in range(3):
+        with LLManager(
+            llm_name="gpt-test",
+            validate_llm=True,
+            model_cache=cache,
+            base_url=server.base_url,
+            api_key="test",
+        ) as api:
+            api.chat_completion(ask("hi"), "")
+            api.chat_completion(ask("again"), "gpt-other")
+    assert server.model_list_requests == 1
+    assert len(server.requests) == 6
+
+
+def test_unknown_models_fail_before_the_request(server: FakeOpenAI):
+    with LLManager(
+        llm_name="gpt-missing",
+        validate_llm=True,
+        model_cache=ModelListCache(),
+        base_url=server.base_url,
+        api_key="test",
+    ) as api:
+        with pytest.raises(ValueError, match="gpt-missing"):
+            api.chat_completion(ask("hi"), "")
+    assert server.requests == []
+
+
+def test_async_validation_shares_one_listing(server: FakeOpenAI):
+    cache = ModelListCache()
+
+    async def main() -> None:
+        api = AsyncLLManager(
+            llm_name="gpt-test",
+            validate_llm=True,
+            model_cache=cache,
+            base_url=server.base_url,
+            api_key="test",
+        )
+        async with api:
+            await asyncio.gather(
+                *(api.chat_completion(ask("hi"), "") for _ in range(8))
+            )
+
+    asyncio.run(main())
+    assert server.model_list_requests == 1
+
+
+def test_model_lists_expire_after_the_ttl():
+    fetched: List[int] = []
+
+    def fetch() -> List[str]:
+        fetched.append(1)
+        return ["gpt-test"]
+
+    cache = ModelListCache(ttl=0.05)
+    key = ModelListCache.key("http://example.test/v1", "secret")
+    assert cache.models(key, fetch) == ("gpt-test",)
+    assert cache.models(key, fetch) == ("gpt-test",)
+    time.sleep(0.06)
+    cache.models(key, fetch)
+    assert len(fetched) == 2
+    assert "secret" not in key
+
+
+def test_empty_model_lists_are_cached(monkeypatch: pytest.MonkeyPatch):
+    cache = ModelListCache()
+    key = ModelListCache.key("http://example.test/v1", "secret")
+    assert cache.models(key, lambda: []) == ()
+
+    def fail() -> List[str]:
+        raise AssertionError("an empty model list should come from the cache")
+
+    get = cache.get
+    lookups: List[str] = []
+
+    def racing_get(key: str) -> Optional[Tuple[str, ...]]:
+        # The first lookup misses, as if another caller filled the cache
+        # just before this one entered the single flight.
+        lookups.append(key)
+        return None if len(lookups) == 1 else get(key)
+
+    monkeypatch.setattr(cache, "get", racing_get)
+    assert cache.models(key, fail) == ()
+    lookups.clear()
+    assert asyncio.run(cache.amodels(key, fail)) == ()
+
+
+def test_file_cache_survives_new_instances(tmp_path: Path):
+    path = tmp_path / "models.sqlite"
+    key = ModelListCache.key("http://example.test/v1", "secret")
+    ModelListCache(path=path).models(key, lambda: ["gpt-test", "gpt-other"])
+
+    def fail() -> List[str]:
+        raise AssertionError("the model list should come from the file")
+
+    assert ModelListCache(path=path).models(key, fail) == ("gpt-test", "gpt-other")
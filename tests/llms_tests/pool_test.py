@@ -0,0 +1,138 @@
+import asyncio
+import json
+from typing import Any, Dict
+
+import pytest
+
+from llamda_fn import Llamda
+from llamda_fn.llms.api import PoolConfig
+from llamda_fn.llms.exchange import Exchange
+from llamda_fn.llms.llm_manager import AsyncLLManager, LLManager
+from fake_openai import FakeOpenAI
+
+
+@pytest.fixture
+def server():
+    with FakeOpenAI(latency=0.02) as fake:
+        yield fake
+
+
+def test_async_manager_shares_a_bounded_pool(server: FakeOpenAI):
+    pool = PoolConfig(max_connections=4, max_keepalive_connections=4)
+
+    async def main() -> list[str]:
+        api = AsyncLLManager(
+            llm_name="gpt-test", pool=pool, base_url=server.base_url, api_key="test"
+        )
+        async with api:
+            exchanges = [Exchange(system="test") for _ in range(40)]
+            for exchange in exchanges:
+                exchange.ask("hello")
+            completions = await asyncio.gather(
+                *(api.chat_completion(exchange, "gpt-test") for exchange in exchanges)
+            )
+        return [completion.message.content for completion in completions]
+
+    assert asyncio.run(main()) == ["ok"] * 40
+    assert server.connections <= 4
+    assert server.peak_active <= 4
+
+
+def test_async_streams_hold_a_pool_slot_until_read(server: FakeOpenAI):
+    pool = PoolConfig(max_connections=2, max_keepalive_connections=2)
+
+    async def main() -> list[str]:
+        api = AsyncLLManager(
+            llm_name="gpt-test", pool=pool, base_url=server.base_url, api_key="test"
+        )
+        async with api:
+
+            async def read() -> str:
+                exchange = Exchange()
+                exchange.ask("hello")
+                stream = await api.stream_completion(exchange, "gpt-test")
+                return (await stream.completion()).message.content
+
+            replies = await asyncio.gather(*(read() for _ in range(10)))
+            exchange = Exchange()
+            exchange.ask("hello")
+            streams = [
+                await api.stream_completion(exchange, "gpt-test") for _ in range(2)
+            ]
+            assert api._slots is not None and api._slots.locked()
+            for stream in streams:
+                await stream.close()
+            assert not api._slots.locked()
+        return replies
+
+    assert asyncio.run(main()) == ["ok"] * 10
+    assert server.peak_active <= 2
+
+
+def test_async_pool_without_a_connection_limit(server: FakeOpenAI):
+    pool = PoolConfig(max_connections=None)
+
+    async def main() -> str:
+        async with AsyncLLManager(
+            llm_name="gpt-test", pool=pool, base_url=server.base_url, api_key="test"
+        ) as api:
+            exchange = Exchange()
+            exchange.ask("hello")
+            return (await api.chat_completion(exchange, "gpt-test")).message.content
+
+    assert asyncio.run(main()) == "ok"
+
+
+def test_sync_manager_pool(server: FakeOpenAI):
+    api = LLManager(
+        llm_name="gpt-test",
+        pool=PoolConfig(max_connections=1),
+        base_url=server.base_url,
+        api_key="test",
+    )
+    exchange = Exchange()
+    exchange.ask("hello")
+    for _ in range(3):
+        assert api.chat_completion(exchange, "gpt-test").message.content == "ok"
+    assert server.connections == 1
+    api.close()
+
+
+def test_llamda_tool_loop_against_the_fake_server():
+    def responder(request: Dict[str, Any]) -> Dict[str, Any]:
+        if request["messages"][-1]["role"] == "tool":
+            return {"role": "assistant", "content": request["messages"][-1]["content"]}
+        arguments = json.dumps({"x": 6, "y": 7})
+        tool_call = {
+            "id": "call_1",
+            "type": "function",
+            "function": {"name": "multiply", "arguments": arguments},
+        }
+        return {"role": "assistant", "content": None, "tool_calls": [tool_call]}
+
+    with FakeOpenAI(responder=responder) as server:
+        ll = Llamda(
+            llm_name="gpt-test",
+            pool=PoolConfig(max_connections=2),
+            base_url=server.base_url,
+            api_key="test",
+        )
+
+        @ll.fy()
+        def multiply(x: int, y: int) -> int:
+            """Multiply two numbers."""
+            return x * y
+
+        async def main() -> tuple[str, str]:
+            async with ll:
+                first = await ll.acall("What is 6 * 7?")
+                streamed = "".join([t async for t in ll.astream("Again?")])
+            return first.content, streamed
+
+        assert asyncio.run(main()) == ("42", "42")
+        tool_message = server.requests[1]["messages"][-1]
+        assert tool_message == {
+            "role": "tool",
+            "content": "42",
+            "tool_call_id": "call_1",
+        }
@@ -0,0 +1,184 @@
+import asyncio
+import time
+from email.utils import formatdate
+from typing import Any
+
+import httpx
+import openai
+import pytest
+
+from llamda_fn.llms.exchange import Exchange
+from llamda_fn.llms.llm_manager import AsyncLLManager, LLManager
+from llamda_fn.llms.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CompletionError,
+    HedgePolicy,
+    Resilience,
+    RetryPolicy,
+)
+from fake_openai import FakeOpenAI
+
+FAST_RETRIES = RetryPolicy(base_delay=0.01, max_delay=0.05)
+
+
+@pytest.fixture
+def server():
+    with FakeOpenAI() as fake:
+        yield fake
+
+
+def manager(server: FakeOpenAI, resilience: Resilience) -> LLManager:
+    return LLManager(
+        llm_name="gpt-test",
+        resilience=resilience,
+        base_url=server.base_url,
+        api_key="test",
+    )
+
+
+def ask(text: str = "hi") -> Exchange:
+    exchange = Exchange()
+    exchange.ask(text)
+    return exchange
+
+
+def status_error(status: int, headers: dict[str, str]) -> openai.APIStatusError:
+    request = httpx.Request("POST", "http://test/v1/chat/completions")
+    response = httpx.Response(status, headers=headers, request=request)
+    return openai.APIStatusError("error", response=response, body=None)
+
+
+def test_server_errors_are_retried(server: FakeOpenAI):
+    resilience = Resilience(retry=FAST_RETRIES)
+    server.fail_next(503, count=2)
+    with manager(server, resilience) as api:
+        assert api.chat_completion(ask(), "").message.content == "ok"
+    [stats] = resilience.stats().values()
+    assert (stats.calls, stats.attempts, stats.retries) == (1, 3, 2)
+
+
+def test_retry_after_is_honoured(server: FakeOpenAI):
+    server.fail_next(429, headers={"retry-after": "0.3"})
+    with manager(server, Resilience(retry=FAST_RETRIES)) as api:
+        start = time.monotonic()
+        api.chat_completion(ask(), "")
+    assert time.monotonic() - start >= 0.3
+
+
+def test_client_errors_are_not_retried(server: FakeOpenAI):
+    resilience = Resilience(retry=FAST_RETRIES)
+    server.fail_next(400, count=3)
+    with manager(server, resilience) as api:
+        with pytest.raises(CompletionError) as raised:
+            api.chat_completion(ask(), "")
+    assert raised.value.status_code == 400
+    assert resilience.stats()[str(api.base_url)].attempts == 1
+
+
+def test_backoff_grows_and_reads_http_dates():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.3, jitter=False)
+    error = status_error(503, {})
+    assert [policy.delay(n, error) for n in (1, 2, 3)] == [0.1, 0.2, 0.3]
+    assert policy.delay(1, status_error(429, {"retry-after-ms": "250"})) == 0.25
+    later = status_error(503, {"retry-after": formatdate(time.time() + 30)})
+    assert 25 < policy.delay(1, later) <= 30
+
+
+def test_circuit_opens_then_probes(server: FakeOpenAI):
+    resilience = Resilience(
+        retry=RetryPolicy(max_attempts=1),
+        breaker=lambda: CircuitBreaker(failure_threshold=2, reset_timeout=0.2),
+    )
+    server.fail_next(500, count=2)
+    with manager(server, resilience) as api:
+        for _ in range(2):
+            with pytest.raises(CompletionError):
+                api.chat_completion(ask(), "")
+        with pytest.raises(CompletionError) as raised:
+            api.chat_completion(ask(), "")
+        assert isinstance(raised.value.__cause__, CircuitOpenError)
+        assert server.requests == []
+
+        time.sleep(0.25)
+        assert resilience.breaker(str(api.base_url)).state == "half_open"
+        api.chat_completion(ask(), "")
+    stats = resilience.stats()[str(api.base_url)]
+    assert (stats.state, stats.rejected, stats.failures) == ("closed", 1, 2)
+
+
+def test_slow_requests_are_hedged(server: FakeOpenAI):
+    resilience = Resilience(hedge=HedgePolicy(delay=0.05))
+    server.delay_next(1.0)
+    with manager(server, resilience) as api:
+        start = time.monotonic()
+        api.chat_completion(ask(), "")
+        assert time.monotonic() - start < 0.5
+    stats = resilience.stats()[str(api.base_url)]
+    assert (stats.hedges, stats.hedge_wins) == (1, 1)
+    resilience.close()
+
+
+def test_hedge_threshold_follows_recent_latencies():
+    resilience = Resilience(hedge=HedgePolicy(quantile=0.9, min_samples=10))
+    for latency in range(1, 11):
+        resilience.call("endpoint", lambda: time.sleep(latency / 1000))
+    assert 0.009 <= resilience.stats()["endpoint"].hedge_after < 0.02
+
+
+def test_async_hedges_cancel_the_slower_request(server: FakeOpenAI):
+    resilience = Resilience(hedge=HedgePolicy(delay=0.05))
+    server.delay_next(1.0)
+
+    async def main() -> Any:
+        api = AsyncLLManager(
+            llm_name="gpt-test",
+            resilience=resilience,
+            base_url=server.base_url,
+            api_key="test",
+        )
+        async with api:
+            start = time.monotonic()
+            await api.chat_completion(ask(), "")
+            return time.monotonic() - start
+
+    assert asyncio.run(main()) < 0.5
+    assert resilience.stats()[f"{server.base_url}/"].hedge_wins == 1
+
+
+def test_a_cancelled_probe_does_not_keep_the_circuit_open():
+    resilience = Resilience(
+        retry=RetryPolicy(max_attempts=1),
+        breaker=lambda: CircuitBreaker(failure_threshold=1, reset_timeout=0.01),
+    )
+    request = httpx.Request("POST", "http://test/v1/chat/completions")
+
+    async def lost() -> str:
+        raise openai.APIConnectionError(request=request)
+
+    async def hang() -> str:
+        await asyncio.sleep(10)
+        return "late"
+
+    async def ok() -> str:
+        return "ok"
+
+    async def main() -> str:
+        with pytest.raises(openai.APIConnectionError):
+            await resilience.acall("endpoint", lost)
+        await asyncio.sleep(0.02)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(resilience.acall("endpoint", hang), 0.01)
+        return await resilience.acall("endpoint", ok)
+
+    assert asyncio.run(main()) == "ok"
+    assert resilience.stats()["endpoint"].state == "closed"
+
+
+def test_half_open_rejections_explain_the_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    resilience = Resilience(breaker=lambda: breaker)
+    breaker.record_failure()
+    assert breaker.allow()
+    with pytest.raises(CircuitOpenError, match="probe is in flight"):
+        resilience.call("endpoint", lambda: "ok")
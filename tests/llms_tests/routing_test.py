@@ -0,0 +1,124 @@
+import asyncio
+from typing import Iterator, List
+
+import pytest
+
+from llamda_fn import Llamda
+from llamda_fn.llms.api import LlmApiConfig
+from llamda_fn.llms.exchange import Exchange
+from llamda_fn.llms.resilience import CompletionError
+from llamda_fn.llms.routing import AsyncRoutingManager, RoutingManager
+from fake_openai import FakeOpenAI
+
+
+@pytest.fixture
+def servers() -> Iterator[List[FakeOpenAI]]:
+    with FakeOpenAI(reply="a") as a, FakeOpenAI(reply="b") as b:
+        yield [a, b]
+
+
+def endpoints(servers: List[FakeOpenAI]) -> List[LlmApiConfig]:
+    return [
+        LlmApiConfig(base_url=s.base_url, api_key="test", max_retries=0)
+        for s in servers
+    ]
+
+
+def ask(text: str = "hi") -> Exchange:
+    exchange = Exchange()
+    exchange.ask(text)
+    return exchange
+
+
+def test_requests_spread_across_idle_endpoints(servers: List[FakeOpenAI]):
+    with RoutingManager(endpoints(servers), llm_name="gpt-test") as api:
+        for _ in range(10):
+            api.chat_completion(ask(), "")
+    assert [len(s.requests) for s in servers] == [5, 5]
+    assert [stats.outstanding for stats in api.stats()] == [0, 0]
+
+
+def test_failed_endpoints_fail_over_and_cool_down(servers: List[FakeOpenAI]):
+    servers[0].fail_next(500)
+    with RoutingManager(endpoints(servers), llm_name="gpt-test") as api:
+        replies = [api.chat_completion(ask(), "").message.content for _ in range(4)]
+    assert replies == ["b"] * 4
+    down, up = api.stats()
+    assert (down.healthy, down.failures, down.failovers) == (False, 1, 1)
+    assert "500" in (down.last_error or "")
+    assert (up.healthy, up.requests) == (True, 4)
+
+
+def test_request_errors_do_not_fail_over(servers: List[FakeOpenAI]):
+    servers[0].fail_next(400)
+    with RoutingManager(endpoints(servers), llm_name="gpt-test") as api:
+        with pytest.raises(CompletionError):
+            api.chat_completion(ask(), "")
+    assert servers[1].requests == []
+    assert api.stats()[0].healthy
+
+
+def test_ewma_prefers_the_faster_endpoint(servers: List[FakeOpenAI]):
+    servers[0].latency = 0.2
+    with RoutingManager(
+        endpoints(servers), llm_name="gpt-test", strategy="ewma"
+    ) as api:
+        for _ in range(10):
+            api.chat_completion(ask(), "")
+    slow, fast = api.stats()
+    assert slow.requests == 1
+    assert fast.requests == 9
+    assert (slow.ewma_latency or 0) > (fast.ewma_latency or 0)
+
+
+def test_health_checks_mark_unreachable_endpoints(servers: List[FakeOpenAI]):
+    with RoutingManager(endpoints(servers), llm_name="gpt-test") as api:
+        servers[0].stop()
+        assert [stats.healthy for stats in api.check_health(timeout=1)] == [False, True]
+        assert api.chat_completion(ask(), "").message.content == "b"
+
+
+def test_async_routing_balances_outstanding_requests(servers: List[FakeOpenAI]):
+    for server in servers:
+        server.latency = 0.05
+
+    async def main() -> List[str]:
+        async with AsyncRoutingManager(endpoints(servers), llm_name="gpt-test") as api:
+            completions = await asyncio.gather(
+                *(api.chat_completion(ask(), "") for _ in range(8))
+            )
+        return sorted(completion.message.content for completion in completions)
+
+    assert asyncio.run(main()) == ["a"] * 4 + ["b"] * 4
+
+
+def test_async_health_checks_run_in_the_background(servers: List[FakeOpenAI]):
+    async def main() -> List[bool]:
+        async with AsyncRoutingManager(
+            endpoints(servers), llm_name="gpt-test", health_interval=0.05
+        ) as api:
+            servers[0].stop()
+            await asyncio.sleep(0.3)
+            return [stats.healthy for stats in api.stats()]
+
+    assert asyncio.run(main()) == [False, True]
+
+
+def test_cancelled_requests_are_no_longer_outstanding(servers: List[FakeOpenAI]):
+    servers[0].latency = servers[1].latency = 1.0
+
+    async def main() -> List[int]:
+        async with AsyncRoutingManager(endpoints(servers), llm_name="gpt-test") as api:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(api.chat_completion(ask(), ""), 0.05)
+            return [stats.outstanding for stats in api.stats()]
+
+    assert asyncio.run(main()) == [0, 0]
+
+
+def test_llamda_routes_transparently(servers: List[FakeOpenAI]):
+    servers[1].fail_next(503, count=2)
+    with Llamda(endpoints=endpoints(servers), llm_name="gpt-test") as ll:
+        assert isinstance(ll.api, RoutingManager)
+        assert {ll("one").content, ll("two").content} == {"a"}
+        assert asyncio.run(ll.acall("three")).content in ("a", "b")
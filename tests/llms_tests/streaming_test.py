@@ -0,0 +1,211 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List
+
+import llamda_fn.llamda as llamda_module
+from llamda_fn.llms.api_types import LlToolCall
+from llamda_fn.llms.streaming import CompletionStream
+from conftest import assistant, to_chunks
+
+
+def test_stream_assembles_text_and_tool_calls():
+    message = assistant(
+        "Checking both cities.",
+        LlToolCall(id="a", name="weather", arguments='{"city": "Rome"}'),
+        LlToolCall(id="b", name="weather", arguments='{"city": "Oslo"}'),
+    )
+    completed: List[LlToolCall] = []
+    stream = CompletionStream(to_chunks(message, size=3), completed.append)
+
+    assert "".join(stream) == "Checking both cities."
+    result = stream.completion().message
+    assert result.content == message.content
+    assert result.tool_calls == message.tool_calls
+    assert completed == message.tool_calls
+    assert result.meta is not None and result.meta.choice == {
+        "index": 0,
+        "finish_reason": "tool_calls",
+    }
+
+
+def test_tool_calls_are_handed_off_once_their_arguments_complete():
+    message = assistant(
+        "",
+        LlToolCall(id="a", name="search", arguments='{"q": "x"}'),
+        LlToolCall(id="b", name="search", arguments='{"q": "y"}'),
+    )
+    chunks = list(to_chunks(message))
+    completed: List[str] = []
+    seen = 0
+
+    def replay() -> Iterator[Any]:
+        nonlocal seen
+        for chunk in chunks:
+            seen += 1
+            yield chunk
+
+    def on_tool_call(tool_call: LlToolCall) -> None:
+        completed.append(tool_call.id)
+        if tool_call.id == "a":
+            assert seen < len(chunks) - 3
+
+    CompletionStream(replay(), on_tool_call).completion()
+    assert completed == ["a", "b"]
+
+
+def stream_loop_responses() -> List[Any]:
+    return [
+        assistant(
+            "",
+            LlToolCall(id="a", name="slow_lookup", arguments='{"key": "first"}'),
+            LlToolCall(id="b", name="slow_lookup", arguments='{"key": "second"}'),
+        ),
+        assistant("Both lookups are done."),
+    ]
+
+
+def record_dispatches(ll: Any) -> Dict[str, "Future[Any]"]:
+    """Record the work started for each tool call, by call id."""
+    dispatched: Dict[str, "Future[Any]"] = {}
+    submit = ll._submit
+
+    def recording_submit(tool_call: LlToolCall, *args: Any) -> "Future[Any]":
+        dispatched[tool_call.id] = submit(tool_call, *args)
+        return dispatched[tool_call.id]
+
+    ll._submit = recording_submit
+    return dispatched
+
+
+def test_llamda_dispatches_tools_while_streaming(make_llamda: Any):
+    ll = make_llamda(*stream_loop_responses())
+    first_started = threading.Event()
+    chunks_after_start = []
+    next_chunks = ll.api.next_chunks
+    dispatched = record_dispatches(ll)
+
+    def watched_chunks(*args: Any, **kwargs: Any) -> Iterator[Any]:
+        for chunk in next_chunks(*args, **kwargs):
+            if first_started.is_set():
+                chunks_after_start.append(chunk)
+            yield chunk
+            if "a" in dispatched:
+                first_started.wait(5)
+
+    ll.api.next_chunks = watched_chunks
+
+    @ll.fy()
+    def slow_lookup(key: str) -> str:
+        """Look up a key slowly."""
+        if key == "first":
+            first_started.set()
+        return key.upper()
+
+    tokens = list(ll.stream("Look up both keys"))
+    assert "".join(tokens) == "Both lookups are done."
+    assert chunks_after_start, "the first tool ran only after the stream ended"
+    assert {ll.exchange[i].content for i in (2, 3)} == {'"FIRST"', '"SECOND"'}
+    assert ll.last_summary is not None and ll.last_summary.tool_calls == 2
+
+
+def test_llamda_astream(make_llamda: Any):
+    ll = make_llamda(*stream_loop_responses())
+
+    @ll.fy()
+    async def slow_lookup(key: str) -> str:
+        """Look up a key slowly."""
+        await asyncio.sleep(0.01)
+        return key.upper()
+
+    async def main() -> List[str]:
+        return [token async for token in ll.astream("Look up both keys")]
+
+    assert "".join(asyncio.run(main())) == "Both lookups are done."
+    assert {ll.exchange[i].content for i in (2, 3)} == {'"FIRST"', '"SECOND"'}
+    assert all(request.get("stream") for request in ll.aapi.requests)
+
+
+def two_sends() -> Any:
+    return assistant(
+        "",
+        LlToolCall(id="a", name="send", arguments='{"n": 1}'),
+        LlToolCall(id="b", name="send", arguments='{"n": 2}'),
+    )
+
+
+def test_started_calls_report_their_results_when_a_limit_stops_the_run(
+    make_llamda: Any,
+):
+    ll = make_llamda(two_sends())
+    sent: List[int] = []
+
+    @ll.fy()
+    def send(n: int) -> str:
+        """Send a message."""
+        sent.append(n)
+        return f"sent {n}"
+
+    summary = ll.run_loop(stream=True, max_tool_calls=1)
+    assert summary.stop_reason == "max_tool_calls"
+    assert sent == [1]
+    assert ll.exchange[-2].content == '"sent 1"'
+    assert json.loads(ll.exchange[-1].content)["skipped"] is True
+    assert summary.tool_calls == summary.steps[-1].tool_calls == 1
+
+
+def test_no_calls_start_after_the_deadline_passes_mid_stream(
+    make_llamda: Any, monkeypatch: Any
+):
+    ll = make_llamda(two_sends())
+    next_chunks = ll.api.next_chunks
+    dispatched = record_dispatches(ll)
+    skipped = 0.0
+    monkeypatch.setattr(
+        llamda_module,
+        "time",
+        SimpleNamespace(monotonic=lambda: time.monotonic() + skipped),
+    )
+
+    def chunks_past_the_deadline(*args: Any, **kwargs: Any) -> Iterator[Any]:
+        nonlocal skipped
+        for chunk in next_chunks(*args, **kwargs):
+            yield chunk
+            if "a" in dispatched and not skipped:
+                dispatched["a"].result(5)
+                skipped = 60.0
+
+    ll.api.next_chunks = chunks_past_the_deadline
+    sent: List[int] = []
+
+    @ll.fy()
+    def send(n: int) -> str:
+        """Send a message."""
+        sent.append(n)
+        return f"sent {n}"
+
+    summary = ll.run_loop(stream=True, deadline=30)
+    assert summary.stop_reason == "deadline"
+    assert sent == [1]
+    assert ll.exchange[-2].content == '"sent 1"'
+    assert json.loads(ll.exchange[-1].content)["skipped"] is True
+
+
+def test_astream_reports_started_calls_at_a_limit(make_llamda: Any):
+    ll = make_llamda(two_sends())
+    sent: List[int] = []
+
+    @ll.fy()
+    async def send(n: int) -> str:
+        """Send a message."""
+        sent.append(n)
+        return f"sent {n}"
+
+    summary = asyncio.run(ll.arun_loop(stream=True, max_tool_calls=1))
+    assert sent == [1]
+    assert ll.exchange[-2].content == '"sent 1"'
+    assert json.loads(ll.exchange[-1].content)["skipped"] is True
+    assert summary.tool_calls == 1
@@ -0,0 +1,57 @@
+import multiprocessing
+import time
+from pathlib import Path
+
+from llamda_fn.utils.cache import LRUCache, SQLiteCache
+
+
+def test_lru_entries_expire_after_ttl():
+    cache: LRUCache[str, int] = LRUCache(maxsize=2, ttl=0.05)
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+    info = cache.info()
+    assert (info.hits, info.misses, info.invalidations) == (1, 1, 1)
+    assert len(cache) == 0
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = SQLiteCache(tmp_path / "cache.db", maxsize=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+
+    assert "b" not in cache
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    info = cache.info()
+    assert (info.hits, info.evictions, info.currsize) == (3, 1, 2)
+    cache.close()
+
+
+def test_sqlite_cache_ttl(tmp_path: Path):
+    cache = SQLiteCache(tmp_path / "cache.db", ttl=0.05)
+    cache.put("a", "1")
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.info().invalidations == 1
+    cache.close()
+
+
+def _fill(path: str, key: str) -> None:
+    SQLiteCache(path).put(key, key.upper())
+
+
+def test_sqlite_cache_is_shared_between_processes(tmp_path: Path):
+    path = str(tmp_path / "shared.db")
+    cache = SQLiteCache(path)
+    workers = [multiprocessing.Process(target=_fill, args=(path, key)) for key in "xyz"]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert [cache.get(key) for key in "xyz"] == ["X", "Y", "Z"]
+    cache.close()
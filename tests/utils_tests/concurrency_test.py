@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+
+import pytest
+
+from llamda_fn.utils.concurrency import (
+    FlightCancelled,
+    Limiter,
+    SingleFlight,
+    TokenBucket,
+)
+
+
+def test_concurrent_calls_share_one_execution():
+    flight: SingleFlight[str, int] = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def work() -> int:
+        calls.append(1)
+        release.wait(5)
+        return 42
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(flight.do, "key", work)
+        while flight.stats().in_flight == 0:
+            pass
+        followers = [pool.submit(flight.do, "key", work) for _ in range(3)]
+        while flight.stats().shared < 3:
+            pass
+        release.set()
+        results = [leader.result(), *(f.result() for f in followers)]
+
+    assert results == [42] * 4
+    assert len(calls) == 1
+    stats = flight.stats()
+    assert (stats.executed, stats.shared, stats.in_flight) == (1, 3, 0)
+
+
+def test_exceptions_are_shared_and_the_key_is_released():
+    flight: SingleFlight[str, int] = SingleFlight()
+
+    def fail() -> int:
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: 1) == 1
+
+
+def test_async_followers_of_a_cancelled_leader():
+    flight: SingleFlight[str, int] = SingleFlight()
+
+    async def slow() -> int:
+        await asyncio.sleep(5)
+        return 1
+
+    async def main() -> None:
+        leader = asyncio.ensure_future(flight.ado("key", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.ado("key", slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(FlightCancelled):
+            await follower
+
+    asyncio.run(main())
+
+
+def test_token_bucket_spaces_calls_after_the_burst():
+    bucket = TokenBucket(rate=10, burst=2)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.1, abs=0.02)
+    assert waits[3] == pytest.approx(0.2, abs=0.02)
+
+
+def test_limiter_bounds_threads_and_tasks_together():
+    limiter = Limiter(max_concurrency=2)
+    peak = 0
+    lock = threading.Lock()
+
+    def track() -> None:
+        nonlocal peak
+        with lock:
+            peak = max(peak, limiter.stats().active)
+
+    def sync_call() -> None:
+        with limiter:
+            track()
+            time.sleep(0.02)
+
+    async def async_call() -> None:
+        async with limiter:
+            track()
+            await asyncio.sleep(0.02)
+
+    async def main() -> None:
+        await asyncio.gather(*(async_call() for _ in range(4)))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(sync_call) for _ in range(4)]
+        asyncio.run(main())
+        for future in futures:
+            future.result()
+
+    stats = limiter.stats()
+    assert peak <= 2
+    assert stats.calls == 8
+    assert stats.active == stats.waiting == 0
+    assert stats.max_wait > 0
+
+
+def test_limiter_acquire_gives_up_after_its_timeout():
+    limiter = Limiter(max_concurrency=1)
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0.01)
+    limiter.release()
+    assert limiter.acquire(timeout=0)
+    limiter.release()
+    stats = limiter.stats()
+    assert stats.calls == 2 and stats.waiting == stats.active == 0
+
+
+def test_async_waiters_are_woken_by_release_without_polling(monkeypatch: Any):
+    limiter = Limiter(max_concurrency=1)
+    sleeps = []
+    sleep = asyncio.sleep
+
+    async def recording_sleep(delay: float, *args: Any) -> Any:
+        sleeps.append(delay)
+        return await sleep(delay, *args)
+
+    async def main() -> List[str]:
+        order = []
+
+        async def waiter(name: str) -> None:
+            async with limiter:
+                order.append(name)
+
+        limiter.acquire()
+        first = asyncio.ensure_future(waiter("first"))
+        second = asyncio.ensure_future(waiter("second"))
+        await sleep(0)
+        threading.Thread(target=limiter.release).start()
+        first.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        return order
+
+    monkeypatch.setattr(asyncio, "sleep", recording_sleep)
+    assert asyncio.run(main()) == ["second"]
+    assert sleeps == []
+    assert limiter.stats().active == limiter.stats().waiting == 0
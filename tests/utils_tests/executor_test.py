@@ -0,0 +1,81 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from llamda_fn.llms.api_types import LlToolCall
+from llamda_fn.utils.executor import ToolExecutor
+from conftest import assistant
+
+
+def test_stats_track_queue_and_workers():
+    executor = ToolExecutor(max_workers=2)
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    def block() -> int:
+        started.release()
+        release.wait()
+        return 1
+
+    futures = [executor.submit(block) for _ in range(5)]
+    started.acquire()
+    started.acquire()
+
+    stats = executor.stats()
+    assert stats.max_workers == 2
+    assert stats.submitted == 5
+    assert stats.active == 2
+    assert stats.queued == 3
+
+    release.set()
+    assert [future.result() for future in futures] == [1] * 5
+    executor.shutdown()
+
+    stats = executor.stats()
+    assert stats.active == stats.queued == 0
+    assert stats.completed == 5
+
+
+def test_cancelled_futures_leave_the_queue():
+    executor = ToolExecutor(max_workers=1)
+    release = threading.Event()
+    running = executor.submit(release.wait)
+    queued = executor.submit(lambda: None)
+    assert queued.cancel()
+    assert executor.stats().queued == 0
+    release.set()
+    running.result()
+    executor.shutdown()
+
+
+def test_injected_executor_is_not_shut_down():
+    pool = ThreadPoolExecutor(max_workers=1)
+    executor = ToolExecutor(executor=pool)
+    assert executor.submit(lambda: 42).result() == 42
+    executor.shutdown()
+    assert pool.submit(lambda: 43).result() == 43
+    pool.shutdown()
+
+
+def test_llamda_reuses_its_executor(make_llamda: Any):
+    ll = make_llamda(
+        assistant("", LlToolCall(id="1", name="who", arguments="{}")),
+        assistant("", LlToolCall(id="2", name="who", arguments="{}")),
+        assistant("Done."),
+        max_workers=3,
+    )
+
+    @ll.fy()
+    def who() -> str:
+        """Name the current thread."""
+        return threading.current_thread().name
+
+    with ll:
+        ll("Who runs the tools?")
+        stats = ll.executor.stats()
+        assert stats.max_workers == 3
+        assert stats.completed == 2
+
+    names = [message.content for message in ll.exchange if message.role == "tool"]
+    assert all("llamda-tool" in name for name in names)
+    assert ll.api.closed